@@ -0,0 +1,3 @@
+"""
+性能基准模块，离线测量各处理阶段的耗时
+"""
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+内容清理器基准：验证ContentCleaner与旧的逐条正则实现结果一致，且耗时随文本长度线性增长
+
+运行: python -m benchmarks.bench_content_cleaner
+"""
+import re
+import sys
+import random
+import timeit
+
+from core.parser.content_cleaner import ContentCleaner
+from utils.helpers import clean_text
+
+# 旧实现的规则，仅用于对比
+LEGACY_PATTERNS = [
+    r"相关[推荐|阅读].*?(?=\n|$)",
+    r"本文来源.*?(?=\n|$)",
+    r"原标题.*?(?=\n|$)",
+    r"编辑.*?(?=\n|$)",
+    r"记者.*?(?=\n|$)",
+    r"点击查看.*?(?=\n|$)",
+    r".*?版权声明.*?(?=\n|$)",
+    r".*?版权所有.*?(?=\n|$)",
+    r".*?责任编辑.*?(?=\n|$)",
+    r".*?文章来源.*?(?=\n|$)"
+]
+
+SIZES_KB = [10, 25, 50, 100]
+# 旧实现是平方复杂度，只在较小的文本上测量
+LEGACY_MAX_KB = 25
+ALPHABET = "新闻内容今日市场经济科技发展报道数据显示公司产品用户增长，。"
+KEYWORDS = ["相关推荐", "相关阅读", "本文来源", "原标题", "编辑", "记者", "点击查看",
+            "版权声明", "版权所有", "责任编辑", "文章来源"]
+
+
+def legacy_clean(content):
+    """旧的清理实现"""
+    content = clean_text(content)
+    for pattern in LEGACY_PATTERNS:
+        content = re.sub(pattern, "", content)
+    if len(content) > 5000:
+        content = content[:5000] + "..."
+    return content.strip()
+
+
+def make_text(size_kb, with_keyword=False, rng=None):
+    """生成指定大小的单行正文，默认不含任何关键词（旧实现的最坏情况）"""
+    rng = rng or random.Random(0)
+    chars = [rng.choice(ALPHABET) for _ in range(size_kb * 1024 // 3)]
+    if with_keyword:
+        for _ in range(rng.randint(1, 3)):
+            chars.insert(rng.randrange(len(chars)), rng.choice(KEYWORDS))
+    return "".join(chars)
+
+
+def check_equivalence(cleaner, samples=300):
+    """随机样本上比较新旧实现的输出"""
+    rng = random.Random(42)
+    for _ in range(samples):
+        text = make_text(rng.choice([1, 2, 4]), with_keyword=rng.random() < 0.8, rng=rng)
+        if cleaner.clean(text) != legacy_clean(text):
+            return False
+    return True
+
+
+def measure(func, text):
+    """返回单次调用的最短耗时（秒）"""
+    timer = timeit.Timer(lambda: func(text))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number
+
+
+def main():
+    cleaner = ContentCleaner()
+
+    equivalent = check_equivalence(cleaner)
+    print(f"与旧实现输出一致: {equivalent}")
+
+    print(f"{'大小':>8} {'新实现(ms)':>12} {'每KB(us)':>10} {'旧实现(ms)':>12}")
+    per_kb = []
+    for size_kb in SIZES_KB:
+        text = make_text(size_kb)
+        new_time = measure(cleaner.clean, text)
+        per_kb.append(new_time / size_kb)
+        legacy = f"{measure(legacy_clean, text) * 1000:12.2f}" if size_kb <= LEGACY_MAX_KB else f"{'-':>12}"
+        print(f"{size_kb:>6}KB {new_time * 1000:12.3f} {new_time / size_kb * 1e6:10.2f} {legacy}")
+
+    # 线性复杂度下每KB耗时应基本不变，留出测量抖动的余量
+    growth = per_kb[-1] / per_kb[0]
+    linear = growth < 2.0
+    print(f"{SIZES_KB[-1]}KB与{SIZES_KB[0]}KB的每KB耗时比: {growth:.2f} ({'线性' if linear else '非线性'})")
+
+    return 0 if equivalent and linear else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
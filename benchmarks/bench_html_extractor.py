@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+正文提取基准：比较lxml快速路径与BeautifulSoup路径的耗时，并验证两者提取的文本一致
+
+运行: python -m benchmarks.bench_html_extractor
+"""
+import sys
+import random
+import timeit
+
+from bs4 import BeautifulSoup
+
+from core.crawler import html_extractor
+
+SELECTORS = [".post_body", ".article-content", "#content"]
+
+
+def make_page(blocks, rng):
+    """生成包含导航、脚本、注释和正文的页面，blocks控制页面大小"""
+    words = ["新闻", "市场", "科技", "发布", "数据", "用户", "增长", "报道", " ", "&nbsp;", "&amp;"]
+    nav = "".join(f'<li><a href="/n/{i}.html">{rng.choice(words)}{i}</a></li>' for i in range(blocks))
+    paragraphs = "".join(
+        f"<p> {''.join(rng.choice(words) for _ in range(30))} <b>重点</b><!-- ad --> 尾部</p>"
+        f"<script>var x{i} = '{i}';</script>"
+        for i in range(blocks)
+    )
+    return (f'<html><head><style>.a{{}}</style></head><body><ul class="nav">{nav}</ul>'
+            f'<div id="content"><div class="article-content"><div class="post_body">{paragraphs}'
+            f'<ruby>漢<rt>han</rt></ruby></div></div></div>'
+            f'<div class="footer">版权所有</div></body></html>')
+
+
+def bs4_extract(html, selector):
+    element = BeautifulSoup(html, "lxml").select_one(selector)
+    return element.get_text(strip=True) if element else None
+
+
+def measure(func, *args):
+    timer = timeit.Timer(lambda: func(*args))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=3, number=number)) / number
+
+
+def main():
+    if not html_extractor.is_available():
+        print("未安装cssselect，lxml快速路径不可用")
+        return 1
+
+    rng = random.Random(0)
+    identical = True
+    print(f"{'页面大小':>10} {'BeautifulSoup(ms)':>18} {'lxml(ms)':>10} {'加速比':>8}")
+    for blocks in [50, 500, 2000]:
+        html = make_page(blocks, rng)
+        for selector in SELECTORS:
+            identical &= bs4_extract(html, selector) == html_extractor.extract_text(html, selector)
+
+        bs4_time = measure(bs4_extract, html, SELECTORS[0])
+        lxml_time = measure(html_extractor.extract_text, html, SELECTORS[0])
+        print(f"{len(html) // 1024:>8}KB {bs4_time * 1000:18.2f} {lxml_time * 1000:10.2f} "
+              f"{bs4_time / lxml_time:7.1f}x")
+
+    print(f"提取文本与BeautifulSoup一致: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
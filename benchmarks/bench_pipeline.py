@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+流水线基准：用本地HTTP服务器提供录制的HTML页面，用模拟耗时的测试AI提供者代替真实API，
+跑完整的爬取→解析→摘要→存储流程，输出吞吐量、各阶段耗时和内存峰值，并可与保存的基线比较
+
+运行: python -m benchmarks.bench_pipeline [--copies 4] [--rounds 2] [--latency 0.5] [--jitter 0.2]
+      保存基线: --save-baseline benchmarks/baseline.json
+      比较基线: --baseline benchmarks/baseline.json
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import argparse
+import tempfile
+import threading
+import posixpath
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from typing import Dict, Any, List
+from urllib.parse import urlparse
+
+from config.site_config import SITES
+from config.settings import SITE_WORKERS, SUMMARY_WORKERS
+from core.ai.providers.dummy_provider import DummyProvider
+from core.ai.summary_cache import CachedAIProvider, SummaryCache
+from core.crawler.driver_pool import DriverPool
+from core.crawler.page_cache import PageCache
+from core.crawler.page_state import FrontPageStateStore
+from core.crawler.rate_limiter import HostRateLimiter
+from core.crawler.selector_profile import SelectorProfileStore
+from core.pipeline.news_pipeline import NewsPipeline
+from core.pipeline.work_queue import WorkQueue
+from core.storage.providers.jsonl_storage import JsonlStorage
+from core.storage.near_duplicate_index import NearDuplicateIndex
+from core.storage.seen_url_index import SeenUrlIndex
+from utils.metrics import metrics
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+# 汉字按副本编号整体平移的步长，不同副本的文章互不相似，不会被近似重复检测合并
+CJK_FIRST, CJK_LAST = 0x4E00, 0x9FFF
+COPY_SHIFT = 97
+
+
+def vary_text(text: str, copy: int) -> str:
+    """把文本中的汉字按副本编号平移，第0份保持原样"""
+    if not copy:
+        return text
+    span = CJK_LAST - CJK_FIRST + 1
+    return "".join(chr(CJK_FIRST + (ord(char) - CJK_FIRST + copy * COPY_SHIFT) % span)
+                   if CJK_FIRST <= ord(char) <= CJK_LAST else char for char in text)
+
+
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """
+    按URL路径的最后两段（主机名/文件名）返回录制的页面，可模拟网络延迟。
+    路径第一段为副本编号，文章页的内容按副本变化，避免各副本的文章被当作近似重复而跳过摘要
+    """
+
+    server_latency = 0.0
+
+    def translate_path(self, path):
+        path = urlparse(path).path
+        if path.endswith("/"):
+            path += "index.html"
+        parts = [part for part in posixpath.normpath(path).split("/") if part]
+        if len(parts) < 2:
+            return os.path.join(FIXTURES_DIR, "missing")
+        return os.path.join(FIXTURES_DIR, parts[-2], parts[-1])
+
+    def do_GET(self):
+        if self.server_latency:
+            time.sleep(self.server_latency)
+
+        path = self.translate_path(self.path)
+        copy = urlparse(self.path).path.strip("/").split("/")[0]
+        if not copy.isdigit() or int(copy) == 0 or os.path.basename(path) == "index.html" \
+                or not os.path.isfile(path):
+            super().do_GET()
+            return
+
+        with open(path, encoding="utf-8") as f:
+            body = vary_text(f.read(), int(copy)).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(server_latency: float) -> ThreadingHTTPServer:
+    """在随机端口启动页面服务器"""
+    FixtureHandler.server_latency = server_latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_sites(port: int, copies: int) -> List[Dict[str, Any]]:
+    """把配置的站点改写为指向本地服务器，每个站点复制copies份以放大负载"""
+    sites = []
+    for copy in range(copies):
+        for site in SITES:
+            host = urlparse(site["url"]).netloc
+            if not os.path.isdir(os.path.join(FIXTURES_DIR, host)):
+                continue
+            local_site = {key: value for key, value in site.items() if key != "rate_limit"}
+            local_site["name"] = f"{site['name']}#{copy}"
+            local_site["url"] = f"http://127.0.0.1:{port}/{copy}/{host}/"
+            local_site["fetch_mode"] = "http"
+            sites.append(local_site)
+    return sites
+
+
+def peak_rss_mb() -> float:
+    """进程内存峰值（MB），不支持的平台返回0"""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS以字节为单位，Linux以KB为单位
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def open_stores(directory: str) -> Dict[str, Any]:
+    """在指定目录中创建流水线使用的索引和记录，不读写data目录"""
+    os.makedirs(directory, exist_ok=True)
+    return {
+        "seen_index": SeenUrlIndex(os.path.join(directory, "seen_urls.db")),
+        "selector_profiles": SelectorProfileStore(os.path.join(directory, "selector_profiles.json")),
+        "page_state": FrontPageStateStore(os.path.join(directory, "front_pages.json")),
+        "duplicate_index": NearDuplicateIndex(os.path.join(directory, "near_duplicates.db")),
+        "work_queue": WorkQueue(os.path.join(directory, "work_queue.db")),
+        "page_cache": PageCache(os.path.join(directory, "page_cache")),
+    }
+
+
+def run_benchmark(args) -> Dict[str, Any]:
+    """按参数运行若干轮流水线，返回结果"""
+    work_dir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    server = start_server(args.server_latency)
+    sites = make_sites(server.server_port, args.copies)
+    if not sites:
+        raise RuntimeError(f"{FIXTURES_DIR} 中没有与SITES匹配的页面")
+
+    provider = DummyProvider({"latency": args.latency, "jitter": args.jitter, "seed": 0})
+    ai_service = CachedAIProvider(provider, SummaryCache(os.path.join(work_dir, "cache.db"))) \
+        if args.cache else provider
+    storage = JsonlStorage({"output_dir": os.path.join(work_dir, "output")})
+    rate_limiter = HostRateLimiter(delay=0, respect_robots=False)
+    driver_pool = DriverPool(size=1)
+
+    rounds = []
+    try:
+        for number in range(1, args.rounds + 1):
+            # 每轮使用新的流水线和索引，保证每轮处理相同的文章；摘要缓存和浏览器池跨轮保留
+            stores = open_stores(os.path.join(work_dir, f"round_{number}"))
+            pipeline = NewsPipeline(storage, ai_service, site_workers=args.site_workers,
+                                    summary_workers=args.summary_workers,
+                                    rate_limiter=rate_limiter, driver_pool=driver_pool, **stores)
+            metrics.reset()
+            start = time.perf_counter()
+            try:
+                saved = pipeline.run(sites)
+            finally:
+                elapsed = time.perf_counter() - start
+                pipeline.close()
+                for store in stores.values():
+                    store.close()
+
+            report = metrics.snapshot()
+            articles = sum(saved.values())
+            rounds.append({
+                "round": number,
+                "articles": articles,
+                "elapsed": round(elapsed, 3),
+                "throughput": round(articles / elapsed, 3) if elapsed else 0.0,
+                "stages": report["stages"],
+            })
+    finally:
+        driver_pool.close()
+        ai_service.close()
+        storage.close()
+        server.shutdown()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "config": {key: value for key, value in vars(args).items()
+                   if key not in ("baseline", "save_baseline", "tolerance")},
+        "sites": len(sites),
+        "rounds": rounds,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def print_result(result: Dict[str, Any]):
+    print(f"站点数: {result['sites']}, 内存峰值: {result['peak_rss_mb']} MB")
+    for round_result in result["rounds"]:
+        print(f"\n第 {round_result['round']} 轮: {round_result['articles']} 篇, "
+              f"{round_result['elapsed']:.2f} 秒, {round_result['throughput']:.2f} 篇/秒")
+        print(f"  {'阶段':<16} {'次数':>6} {'p50(ms)':>10} {'p95(ms)':>10}")
+        for stage, summary in round_result["stages"].items():
+            print(f"  {stage:<16} {summary['count']:>6} {summary['p50'] * 1000:10.1f} "
+                  f"{summary['p95'] * 1000:10.1f}")
+
+
+def compare_with_baseline(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> bool:
+    """与基线比较最后一轮的吞吐量、各阶段p95和内存峰值，吞吐量下降超过容差时返回False"""
+    if baseline.get("config") != result["config"]:
+        print("\n警告: 基线的运行参数与本次不同，比较结果仅供参考")
+
+    current, previous = result["rounds"][-1], baseline["rounds"][-1]
+    rows = [("吞吐量(篇/秒)", previous["throughput"], current["throughput"]),
+            ("内存峰值(MB)", baseline["peak_rss_mb"], result["peak_rss_mb"])]
+    for stage, summary in current["stages"].items():
+        if stage in previous["stages"]:
+            rows.append((f"{stage} p95(ms)", previous["stages"][stage]["p95"] * 1000, summary["p95"] * 1000))
+
+    print(f"\n{'指标':<20} {'基线':>10} {'本次':>10} {'变化':>8}")
+    for name, old, new in rows:
+        change = f"{(new - old) / old:+.1%}" if old else "-"
+        print(f"{name:<20} {old:10.2f} {new:10.2f} {change:>8}")
+
+    if previous["throughput"] and current["throughput"] < previous["throughput"] * (1 - tolerance):
+        print(f"\n吞吐量下降超过 {tolerance:.0%}")
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="流水线基准")
+    parser.add_argument("--copies", type=int, default=4, help="每个站点复制的份数")
+    parser.add_argument("--rounds", type=int, default=2, help="运行轮数，后续轮次可观察缓存效果")
+    parser.add_argument("--latency", type=float, default=0.5, help="模拟的AI调用耗时（秒）")
+    parser.add_argument("--jitter", type=float, default=0.2, help="AI调用耗时的随机波动（秒）")
+    parser.add_argument("--server-latency", type=float, default=0.02, help="模拟的页面响应耗时（秒）")
+    parser.add_argument("--site-workers", type=int, default=SITE_WORKERS)
+    parser.add_argument("--summary-workers", type=int, default=SUMMARY_WORKERS)
+    parser.add_argument("--cache", action="store_true", help="启用摘要缓存")
+    parser.add_argument("--save-baseline", help="把结果保存为基线文件")
+    parser.add_argument("--baseline", help="与基线文件比较")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="允许的吞吐量下降比例")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    result = run_benchmark(args)
+    print_result(result)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\n基线已保存: {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        return 0 if compare_with_baseline(result, baseline, args.tolerance) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
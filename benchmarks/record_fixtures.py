@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+录制基准用的页面：抓取配置站点的首页和前几篇文章，保存到benchmarks/fixtures/<主机名>/，
+首页中的文章链接改写为本地文件名，供bench_pipeline离线回放
+
+运行: python -m benchmarks.record_fixtures [--articles 5]
+"""
+import os
+import sys
+import logging
+import argparse
+from urllib.parse import urljoin, urlparse
+
+import lxml.html
+import requests
+
+from config.site_config import SITES
+from core.crawler.crawler_factory import CrawlerFactory
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def write_page(file_path: str, html: str):
+    """按页面meta中声明的编码保存，回放时才能按同样的编码解码"""
+    declared = requests.utils.get_encodings_from_content(html)
+    with open(file_path, "w", encoding=declared[0] if declared else "utf-8", errors="replace") as f:
+        f.write(html)
+
+
+def record_site(site_config, articles: int) -> int:
+    """录制单个站点，返回保存的文章数"""
+    host = urlparse(site_config["url"]).netloc
+    site_dir = os.path.join(FIXTURES_DIR, host)
+    crawler = CrawlerFactory.create_crawler(site_config)
+    try:
+        index_html = crawler.get_page_content(crawler.url, crawler.get_links_selector())
+        if not index_html:
+            print(f"获取首页失败 - {site_config['name']}")
+            return 0
+
+        local_names = {}
+        os.makedirs(site_dir, exist_ok=True)
+        for link in crawler.extract_links_from_html(index_html)[:articles]:
+            article_html = crawler.get_page_content(link["url"], crawler.get_content_selector())
+            if not article_html:
+                continue
+            local_name = f"article-{len(local_names) + 1}.html"
+            write_page(os.path.join(site_dir, local_name), article_html)
+            local_names[link["url"]] = local_name
+
+        # 已录制文章的链接改为本地文件名，其余链接去掉href，回放时不会被当作新闻链接
+        root = lxml.html.document_fromstring(index_html)
+        for element in root.iter("a"):
+            href = element.get("href")
+            if href is None:
+                continue
+            local_name = local_names.get(urljoin(crawler.url, href))
+            if local_name:
+                element.set("href", local_name)
+            else:
+                del element.attrib["href"]
+        write_page(os.path.join(site_dir, "index.html"),
+                   lxml.html.tostring(root, encoding="unicode", doctype="<!DOCTYPE html>"))
+
+        print(f"已录制 {site_config['name']}: {len(local_names)} 篇文章 -> {site_dir}")
+        return len(local_names)
+    finally:
+        crawler.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="录制基准用的页面")
+    parser.add_argument("--articles", type=int, default=5, help="每个站点录制的文章数")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    recorded = sum(record_site(site_config, args.articles) for site_config in SITES)
+    return 0 if recorded else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
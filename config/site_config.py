@@ -8,12 +8,15 @@ SITES = [
         "url": "https://www.oschina.net",
         "crawler_type": "common",  # 使用通用爬虫
         "parser_type": "common",   # 使用通用解析器
+        "fetch_mode": "auto",      # 页面获取方式: http, browser, auto
         "article_selector": {
             "list": ".news-list .news-item",  # 文章列表选择器
             "title": "h3 a",                 # 标题选择器
             "link": "h3 a[href]",            # 链接选择器
             "content": ".article-content"    # 内容选择器
         },
+        "rate_limit": {"delay": 2},  # 该站点主机的限速，也可写成 {"rate": 0.5, "burst": 2}
+        "refresh_interval": 3600,  # 常驻模式下的爬取间隔（秒），未设置时使用DAEMON_DEFAULT_INTERVAL
         "custom_rules": {}  # 自定义规则（如有）
     },
     {
@@ -21,6 +24,8 @@ SITES = [
         "url": "https://www.163.com",
         "crawler_type": "common",
         "parser_type": "common",
+        "fetch_mode": "auto",
+        "refresh_interval": 600,
         "article_selector": {
             "list": ".news_title",
             "title": "h1",
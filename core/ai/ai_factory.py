@@ -7,6 +7,8 @@ from typing import Dict, Any
 from core.ai.base_ai import BaseAI
 from core.ai.providers.openai_provider import OpenAIProvider
 from core.ai.providers.dummy_provider import DummyProvider
+from core.ai.summary_cache import CachedAIProvider
+from config.settings import SUMMARY_CACHE_ENABLED
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +23,22 @@ class AIFactory:
 
         Args:
             ai_type: AI服务类型
-            config: AI服务配置信息
+            config: AI服务配置信息，cache为False时不启用摘要缓存
 
         Returns:
             AI服务实例
         """
         logger.info(f"创建AI服务 - 类型: {ai_type}")
 
+        provider = AIFactory._create_provider(ai_type, config)
+        if (config or {}).get("cache", SUMMARY_CACHE_ENABLED):
+            return CachedAIProvider(provider)
+        return provider
+
+    @staticmethod
+    def _create_provider(ai_type: str, config: Dict[str, Any] = None) -> BaseAI:
+        """根据类型创建对应的AI提供者"""
+
         # 根据类型创建对应的AI服务
         if ai_type == "openai":
             return OpenAIProvider(config)
@@ -1,11 +1,12 @@
 """
 AI服务基类，定义AI服务的通用接口和方法
 """
+import asyncio
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
 
-from config.settings import TITLE_MAX_LENGTH, CONTENT_MAX_LENGTH
+from config.settings import TITLE_MAX_LENGTH, CONTENT_MAX_LENGTH, SUMMARY_CONCURRENCY, SUMMARY_TIMEOUT
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +14,9 @@ logger = logging.getLogger(__name__)
 class BaseAI(ABC):
     """AI服务基类，定义AI服务的通用接口和方法"""
 
+    # 提示词版本，修改提示词或解析逻辑后需要更新，使旧的摘要缓存失效
+    PROMPT_VERSION = "v1"
+
     def __init__(self, config: Dict[str, Any] = None):
         """
         初始化AI服务
@@ -38,6 +42,81 @@ class BaseAI(ABC):
         """
         pass
 
+    async def asummarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        """
+        异步摘要，默认在线程池中执行summarize并限制超时，支持原生异步的提供者可以覆盖
+
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+
+        Returns:
+            摘要信息，包含title和content，或None（如果摘要失败）
+        """
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(None, self.summarize, title, content), SUMMARY_TIMEOUT)
+        except asyncio.TimeoutError:
+            logger.error(f"摘要超时（{SUMMARY_TIMEOUT}秒） - {title[:30]}")
+            return None
+
+    async def asummarize_many(self, articles: List[Dict[str, Any]],
+                              concurrency: int = SUMMARY_CONCURRENCY) -> List[Optional[Dict[str, str]]]:
+        """
+        并发摘要多篇新闻，同时进行的请求数不超过concurrency
+
+        Args:
+            articles: 新闻列表，每个元素包含title和content
+            concurrency: 最大并发请求数
+
+        Returns:
+            与articles顺序一致的摘要列表，失败的位置为None
+        """
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def summarize_one(article: Dict[str, Any]) -> Optional[Dict[str, str]]:
+            async with semaphore:
+                try:
+                    return await self.asummarize(article['title'], article['content'])
+                except Exception as e:
+                    logger.error(f"摘要失败 - {article['title'][:30]}: {e}")
+                return None
+
+        return list(await asyncio.gather(*(summarize_one(article) for article in articles)))
+
+    def summarize_many(self, articles: List[Dict[str, Any]],
+                       concurrency: int = SUMMARY_CONCURRENCY) -> List[Optional[Dict[str, str]]]:
+        """
+        asummarize_many的同步入口
+
+        Args:
+            articles: 新闻列表，每个元素包含title和content
+            concurrency: 最大并发请求数
+
+        Returns:
+            与articles顺序一致的摘要列表，失败的位置为None
+        """
+        if not articles:
+            return []
+        return asyncio.run(self.asummarize_many(articles, concurrency))
+
+    def classify_links(self, site_name: str, links: List[Dict[str, str]]) -> Optional[List[bool]]:
+        """
+        判断链接是否指向有价值的新闻文章，默认不支持，支持的提供者可以覆盖
+
+        Args:
+            site_name: 站点名称
+            links: 链接列表，每个元素包含title和url
+
+        Returns:
+            与links顺序一致的判断结果，或None（如果不支持或调用失败）
+        """
+        return None
+
+    def close(self):
+        """释放AI服务占用的资源"""
+
     def validate_summary(self, summary: Dict[str, str]) -> bool:
         """
         验证摘要是否符合要求
@@ -1,10 +1,14 @@
 """
 测试用AI提供者，不调用实际API，用于开发和测试
 """
+import time
+import random
+import asyncio
 import logging
 from typing import Dict, Any, Optional
 
 from core.ai.base_ai import BaseAI
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -17,9 +21,13 @@ class DummyProvider(BaseAI):
         初始化测试提供者
 
         Args:
-            config: 配置信息
+            config: 配置信息，latency为模拟的单次调用耗时（秒），jitter为耗时的随机波动范围（秒），
+                seed为随机数种子
         """
         super().__init__(config)
+        self.latency = self.config.get("latency", 0)
+        self.jitter = self.config.get("jitter", 0)
+        self._random = random.Random(self.config.get("seed"))
         logger.info("初始化测试AI提供者")
 
     def summarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
@@ -33,6 +41,39 @@ class DummyProvider(BaseAI):
         Returns:
             测试摘要
         """
+        start = time.perf_counter()
+        latency = self._simulated_latency()
+        if latency:
+            time.sleep(latency)
+        metrics.observe("llm_request", time.perf_counter() - start, provider=self.name)
+        return self._make_summary(title, content)
+
+    async def asummarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        """
+        异步生成测试摘要，模拟的耗时不阻塞事件循环
+
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+
+        Returns:
+            测试摘要
+        """
+        start = time.perf_counter()
+        latency = self._simulated_latency()
+        if latency:
+            await asyncio.sleep(latency)
+        metrics.observe("llm_request", time.perf_counter() - start, provider=self.name)
+        return self._make_summary(title, content)
+
+    def _simulated_latency(self) -> float:
+        """模拟的调用耗时，在latency上下jitter范围内均匀波动"""
+        if not self.jitter:
+            return self.latency
+        return max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+
+    def _make_summary(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        """截取原标题和内容生成摘要"""
         logger.info(f"生成测试摘要 - 标题: {title[:30]}...")
 
         # 简单处理，截取原标题和内容的一部分作为摘要
@@ -2,20 +2,35 @@
 OpenAI提供者，使用OpenAI API进行新闻摘要
 """
 import os
+import re
+import json
+import time
+import random
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, Any, Optional, List, AsyncIterator
 
 import openai
 
 from core.ai.base_ai import BaseAI
-from config.settings import TITLE_MAX_LENGTH, CONTENT_MAX_LENGTH
+from core.ai.token_budget import TokenBudget
+from utils.metrics import metrics
+from config.settings import (TITLE_MAX_LENGTH, CONTENT_MAX_LENGTH, SUMMARY_TIMEOUT,
+                             SUMMARY_MAX_RETRIES, SUMMARY_RETRY_BASE_DELAY, SUMMARY_CONCURRENCY,
+                             SUMMARY_BATCH_SIZE, SUMMARY_BATCH_MAX_CHARS, SUMMARY_MAX_INPUT_TOKENS)
 
 logger = logging.getLogger(__name__)
 
+SYSTEM_PROMPT = "你是一个专业的新闻编辑，擅长提炼新闻重点并进行简明扼要的总结。"
+
 
 class OpenAIProvider(BaseAI):
     """OpenAI提供者，使用OpenAI API进行新闻摘要"""
 
+    PROMPT_VERSION = "v2"
+
     def __init__(self, config: Dict[str, Any] = None):
         """
         初始化OpenAI提供者
@@ -26,11 +41,22 @@ class OpenAIProvider(BaseAI):
         super().__init__(config)
         self.api_key = self.config.get("api_key") or os.environ.get("OPENAI_API_KEY")
         self.model = self.config.get("model", "gpt-3.5-turbo")
+        self.timeout = self.config.get("timeout", SUMMARY_TIMEOUT)
+        self.max_retries = self.config.get("max_retries", SUMMARY_MAX_RETRIES)
+        # 批量模式：把多篇短文章合并到一次请求中，batch_size不大于1时关闭
+        self.batch_size = self.config.get("batch_size", SUMMARY_BATCH_SIZE)
+        self.batch_max_chars = self.config.get("batch_max_chars", SUMMARY_BATCH_MAX_CHARS)
+        self.token_budget = TokenBudget(self.config.get("max_input_tokens", SUMMARY_MAX_INPUT_TOKENS))
+        self._client = None
+        # 异步客户端绑定事件循环，每个事件循环一个，按引用计数在最后一个使用者结束时关闭
+        self._async_clients: Dict[asyncio.AbstractEventLoop, List[Any]] = {}
+        self._async_clients_lock = threading.Lock()
 
         if not self.api_key:
             logger.warning("未设置OpenAI API密钥，将无法使用OpenAI服务")
         else:
-            openai.api_key = self.api_key
+            self._client = openai.OpenAI(api_key=self.api_key, timeout=self.timeout,
+                                         max_retries=self.max_retries)
             logger.info(f"OpenAI服务初始化成功，使用模型: {self.model}")
 
     def summarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
@@ -49,13 +75,284 @@ class OpenAIProvider(BaseAI):
             return None
 
         try:
-            # 构建提示词
-            prompt = f"""请根据以下新闻内容进行摘要：
+            # 调用OpenAI API
+            messages = self._build_messages(title, content)
+            start = time.perf_counter()
+            response = self._client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.5,  # 较低的temperature使输出更加确定性
+                max_tokens=1000
+            )
+            metrics.observe("llm_request", time.perf_counter() - start, provider=self.name)
+            self._record_usage(response)
+
+            # 解析回复
+            ai_response = response.choices[0].message.content.strip()
+            return self._parse_response(title, content, ai_response)
+
+        except Exception as e:
+            metrics.incr("llm_failures", provider=self.name)
+            logger.error(f"OpenAI API调用失败: {e}")
+            return None
+
+    async def asummarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        """
+        使用OpenAI异步API对新闻内容进行摘要，遇到429/5xx时指数退避重试
+
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+
+        Returns:
+            摘要信息，包含title和content，或None（如果摘要失败）
+        """
+        if not self.api_key:
+            logger.error("未设置OpenAI API密钥，无法进行摘要")
+            return None
+
+        ai_response = await self._acreate_completion(self._build_messages(title, content))
+        if ai_response is None:
+            return None
+        return self._parse_response(title, content, ai_response)
+
+    async def asummarize_many(self, articles: List[Dict[str, Any]],
+                              concurrency: int = SUMMARY_CONCURRENCY) -> List[Optional[Dict[str, str]]]:
+        """
+        并发摘要多篇新闻；开启批量模式时，短文章按batch_size合并为一次请求
+
+        Args:
+            articles: 新闻列表，每个元素包含title和content
+            concurrency: 最大并发请求数
+
+        Returns:
+            与articles顺序一致的摘要列表，失败的位置为None
+        """
+        # 整批请求共用一个客户端
+        async with self._async_client():
+            if self.batch_size <= 1:
+                return await super().asummarize_many(articles, concurrency)
+            return await self._asummarize_many_batched(articles, concurrency)
+
+    async def _asummarize_many_batched(self, articles: List[Dict[str, Any]],
+                                       concurrency: int) -> List[Optional[Dict[str, str]]]:
+        """批量模式下的并发摘要，短文章合并请求，长文章单独请求"""
+        results: List[Optional[Dict[str, str]]] = [None] * len(articles)
+        short_indexes = [i for i, article in enumerate(articles)
+                         if len(article['content']) <= self.batch_max_chars]
+        long_indexes = [i for i, article in enumerate(articles)
+                        if len(article['content']) > self.batch_max_chars]
+        batches = [short_indexes[start:start + self.batch_size]
+                   for start in range(0, len(short_indexes), self.batch_size)]
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def summarize_single(index: int):
+            async with semaphore:
+                article = articles[index]
+                results[index] = await self.asummarize(article['title'], article['content'])
+
+        async def summarize_batch(indexes: List[int]):
+            async with semaphore:
+                summaries = await self._asummarize_batch([articles[i] for i in indexes])
+            failed = []
+            for index, summary in zip(indexes, summaries):
+                results[index] = summary
+                if summary is None:
+                    failed.append(index)
+            if failed:
+                # 批量结果中解析失败的文章单独重试
+                logger.warning(f"批量摘要中有 {len(failed)} 篇解析失败，单独重试")
+                await asyncio.gather(*(summarize_single(index) for index in failed))
+
+        await asyncio.gather(*(summarize_batch(indexes) for indexes in batches),
+                             *(summarize_single(index) for index in long_indexes))
+        return results
+
+    def classify_links(self, site_name: str, links: List[Dict[str, str]]) -> Optional[List[bool]]:
+        """
+        用一次请求判断一批链接是否指向有价值的新闻文章
+
+        Args:
+            site_name: 站点名称
+            links: 链接列表，每个元素包含title和url
+
+        Returns:
+            与links顺序一致的判断结果，或None（如果调用失败）
+        """
+        if not self.api_key or not links:
+            return None
+
+        ai_response = asyncio.run(self._acreate_completion(
+            self._build_link_messages(site_name, links),
+            max_tokens=min(4096, 20 * len(links) + 50),
+            response_format={"type": "json_object"}
+        ))
+        if ai_response is None:
+            return None
+
+        items = self._parse_batch_response(ai_response)
+        if not items:
+            return None
+        # 未返回结果的链接按无效处理
+        return [bool(items.get(number, {}).get("valid")) for number in range(1, len(links) + 1)]
+
+    def close(self):
+        """关闭同步客户端"""
+        if self._client is not None:
+            self._client.close()
+
+    async def _asummarize_batch(self, articles: List[Dict[str, Any]]) -> List[Optional[Dict[str, str]]]:
+        """
+        用一次请求摘要多篇文章，要求AI以JSON返回，按编号拆分回各篇文章
+
+        Args:
+            articles: 新闻列表，每个元素包含title和content
+
+        Returns:
+            与articles顺序一致的摘要列表，解析失败的位置为None
+        """
+        if not self.api_key:
+            logger.error("未设置OpenAI API密钥，无法进行摘要")
+            return [None] * len(articles)
+
+        ai_response = await self._acreate_completion(
+            self._build_batch_messages(articles),
+            max_tokens=min(4096, 400 * len(articles)),
+            response_format={"type": "json_object"}
+        )
+        if ai_response is None:
+            return [None] * len(articles)
+
+        items = self._parse_batch_response(ai_response)
+        summaries = []
+        for number in range(1, len(articles) + 1):
+            item = items.get(number)
+            if not item:
+                summaries.append(None)
+                continue
+            summary = {
+                "title": str(item.get("title", "")).strip()[:TITLE_MAX_LENGTH],
+                "content": str(item.get("summary", "")).strip()[:CONTENT_MAX_LENGTH]
+            }
+            summaries.append(summary if self.validate_summary(summary) else None)
+
+        logger.info(f"批量摘要完成 - {sum(1 for s in summaries if s)}/{len(articles)} 篇成功")
+        return summaries
+
+    async def _acreate_completion(self, messages: List[Dict[str, str]], max_tokens: int = 1000,
+                                  **kwargs) -> Optional[str]:
+        """
+        调用异步对话接口，遇到429/5xx、超时和连接错误时指数退避重试
+
+        Args:
+            messages: 对话消息
+            max_tokens: 回复的最大token数
+            **kwargs: 其他接口参数
+
+        Returns:
+            AI回复文本，或None（如果调用失败）
+        """
+        async with self._async_client() as client:
+            return await self._acreate_with_retry(client, messages, max_tokens, **kwargs)
+
+    async def _acreate_with_retry(self, client: openai.AsyncOpenAI, messages: List[Dict[str, str]],
+                                  max_tokens: int, **kwargs) -> Optional[str]:
+        """调用对话接口并按需重试，参数见_acreate_completion"""
+        for attempt in range(self.max_retries + 1):
+            start = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=messages,
+                    temperature=0.5,
+                    max_tokens=max_tokens,
+                    timeout=self.timeout,
+                    **kwargs
+                )
+                metrics.observe("llm_request", time.perf_counter() - start, provider=self.name)
+                self._record_usage(response)
+                return response.choices[0].message.content.strip()
+            except Exception as e:
+                metrics.observe("llm_request", time.perf_counter() - start, provider=self.name)
+                metrics.incr("llm_failures", provider=self.name)
+                if attempt >= self.max_retries or not self._is_retryable(e):
+                    logger.error(f"OpenAI API调用失败: {e}")
+                    return None
+
+                delay = self._get_retry_delay(attempt, e)
+                logger.warning(f"OpenAI API调用失败，{delay:.1f} 秒后重试（第 {attempt + 1} 次）: {e}")
+                await asyncio.sleep(delay)
+
+        return None
+
+    @asynccontextmanager
+    async def _async_client(self) -> AsyncIterator[openai.AsyncOpenAI]:
+        """
+        使用当前事件循环的异步客户端，同一循环中并发的调用共用一个客户端，
+        最后一个使用者结束时在该循环中关闭，不会留下绑定已结束循环的连接
+        """
+        loop = asyncio.get_running_loop()
+        with self._async_clients_lock:
+            entry = self._async_clients.get(loop)
+            if entry is None:
+                # 重试由_acreate_completion统一处理，关闭客户端自带的重试
+                entry = self._async_clients[loop] = [openai.AsyncOpenAI(api_key=self.api_key, max_retries=0), 0]
+            entry[1] += 1
+        try:
+            yield entry[0]
+        finally:
+            with self._async_clients_lock:
+                entry[1] -= 1
+                last = entry[1] == 0
+                if last:
+                    del self._async_clients[loop]
+            if last:
+                await entry[0].close()
+
+    def _record_usage(self, response):
+        """记录接口返回的实际token用量"""
+        usage = getattr(response, "usage", None)
+        if usage is None:
+            return
+        metrics.incr("prompt_tokens", getattr(usage, "prompt_tokens", 0) or 0, provider=self.name)
+        metrics.incr("completion_tokens", getattr(usage, "completion_tokens", 0) or 0, provider=self.name)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """判断错误是否值得重试：限流、服务端错误、超时和连接错误"""
+        if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError)):
+            return True
+        status_code = getattr(error, "status_code", None)
+        return status_code == 429 or (status_code is not None and status_code >= 500)
+
+    @staticmethod
+    def _get_retry_delay(attempt: int, error: Exception) -> float:
+        """计算重试间隔，优先使用服务端返回的Retry-After"""
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after and retry_after.replace(".", "", 1).isdigit():
+            return float(retry_after)
+        # 指数退避并加入随机抖动，避免并发请求同时重试
+        return SUMMARY_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1)
+
+    def _fit_content(self, title: str, content: str) -> str:
+        """按token预算裁剪正文，并记录发送的token数"""
+        fitted, tokens = self.token_budget.fit(content)
+        metrics.incr("content_tokens", tokens, provider=self.name)
+        if len(fitted) < len(content):
+            logger.info(f"正文超出token预算，已裁剪 - {title}: {tokens} tokens（原 {len(content)} 字符）")
+        else:
+            logger.debug(f"发送正文 - {title}: {tokens} tokens")
+        return fitted
+
+    def _build_messages(self, title: str, content: str):
+        """构建对话消息"""
+        prompt = f"""请根据以下新闻内容进行摘要：
 
 原标题：{title}
 
 原内容：
-{content[:3000]}  # 限制内容长度，避免token过多
+{self._fit_content(title, content)}
 
 请提供以下格式的摘要：
 1. 新标题：（不超过{TITLE_MAX_LENGTH}个字符）
@@ -66,54 +363,107 @@ class OpenAIProvider(BaseAI):
 - 内容摘要应保留关键信息，用简洁的语言概括新闻内容
 - 保持客观中立的语气
 """
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
 
-            # 调用OpenAI API
-            response = openai.ChatCompletion.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是一个专业的新闻编辑，擅长提炼新闻重点并进行简明扼要的总结。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.5,  # 较低的temperature使输出更加确定性
-                max_tokens=1000
-            )
+    def _build_batch_messages(self, articles: List[Dict[str, Any]]):
+        """构建批量摘要的对话消息，格式要求只出现一次"""
+        parts = [f"[{number}] 原标题：{article['title']}\n"
+                 f"原内容：{self._fit_content(article['title'], article['content'])}"
+                 for number, article in enumerate(articles, start=1)]
+        prompt = f"""请分别对以下 {len(articles)} 篇新闻进行摘要：
 
-            # 解析回复
-            ai_response = response.choices[0].message.content.strip()
+{chr(10).join(parts)}
 
-            # 提取标题和内容
-            new_title = ""
-            new_content = ""
+请以JSON格式返回，格式为：
+{{"items": [{{"id": 新闻编号, "title": "新标题", "summary": "内容摘要"}}]}}
 
-            title_match = re.search(r"新标题：(.*?)(?:\n|$)", ai_response)
-            if title_match:
-                new_title = title_match.group(1).strip()
+要求：
+- 每篇新闻对应一个元素，id与新闻编号一致
+- 新标题不超过{TITLE_MAX_LENGTH}个字符，简洁明了，突出新闻重点
+- 内容摘要不超过{CONTENT_MAX_LENGTH}个字符，保留关键信息
+- 保持客观中立的语气
+"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
 
-            content_match = re.search(r"内容摘要：([\s\S]*?)(?:\n\n|$)", ai_response)
-            if content_match:
-                new_content = content_match.group(1).strip()
+    @staticmethod
+    def _build_link_messages(site_name: str, links: List[Dict[str, str]]):
+        """构建链接筛选的对话消息"""
+        parts = [f"[{number}] {link['title']} | {link['url']}" for number, link in enumerate(links, start=1)]
+        prompt = f"""以下是从「{site_name}」首页提取的链接，格式为 [编号] 标题 | URL：
 
-            if not new_title or not new_content:
-                # 如果正则匹配失败，尝试按行分割
-                lines = ai_response.split('\n')
-                for line in lines:
-                    if line.startswith("1. 新标题：") or line.startswith("新标题："):
-                        new_title = line.split('：', 1)[1].strip()
-                    elif line.startswith("2. 内容摘要：") or line.startswith("内容摘要："):
-                        new_content = line.split('：', 1)[1].strip()
+{chr(10).join(parts)}
 
-            summary = {
-                "title": new_title[:TITLE_MAX_LENGTH] if new_title else title[:TITLE_MAX_LENGTH],
-                "content": new_content[:CONTENT_MAX_LENGTH] if new_content else content[:100] + "..."
-            }
+请判断每个链接是否指向一篇有价值的新闻或资讯文章（而不是栏目、广告、活动、下载或登录页面），
+以JSON格式返回：{{"items": [{{"id": 编号, "valid": true或false}}]}}
+"""
+        return [
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": prompt}
+        ]
 
-            if self.validate_summary(summary):
-                logger.info(f"成功生成摘要 - 标题: {summary['title']}")
-                return summary
-            else:
-                logger.warning("摘要验证失败")
-                return None
+    @staticmethod
+    def _parse_batch_response(ai_response: str) -> Dict[int, Dict[str, Any]]:
+        """解析批量摘要的JSON回复，返回编号到结果的映射"""
+        try:
+            data = json.loads(ai_response)
+        except json.JSONDecodeError:
+            # 回复中夹杂了其他文字时，尝试截取JSON部分
+            match = re.search(r"\{[\s\S]*\}", ai_response)
+            if not match:
+                logger.warning("批量摘要回复不是有效的JSON")
+                return {}
+            try:
+                data = json.loads(match.group(0))
+            except json.JSONDecodeError:
+                logger.warning("批量摘要回复不是有效的JSON")
+                return {}
 
-        except Exception as e:
-            logger.error(f"OpenAI API调用失败: {e}")
-            return None
\ No newline at end of file
+        items = data.get("items", []) if isinstance(data, dict) else data
+        results = {}
+        for item in items if isinstance(items, list) else []:
+            if isinstance(item, dict):
+                try:
+                    results[int(item.get("id"))] = item
+                except (TypeError, ValueError):
+                    continue
+        return results
+
+    def _parse_response(self, title: str, content: str, ai_response: str) -> Optional[Dict[str, str]]:
+        """从AI回复中提取标题和内容摘要"""
+        new_title = ""
+        new_content = ""
+
+        title_match = re.search(r"新标题：(.*?)(?:\n|$)", ai_response)
+        if title_match:
+            new_title = title_match.group(1).strip()
+
+        content_match = re.search(r"内容摘要：([\s\S]*?)(?:\n\n|$)", ai_response)
+        if content_match:
+            new_content = content_match.group(1).strip()
+
+        if not new_title or not new_content:
+            # 如果正则匹配失败，尝试按行分割
+            lines = ai_response.split('\n')
+            for line in lines:
+                if line.startswith("1. 新标题：") or line.startswith("新标题："):
+                    new_title = line.split('：', 1)[1].strip()
+                elif line.startswith("2. 内容摘要：") or line.startswith("内容摘要："):
+                    new_content = line.split('：', 1)[1].strip()
+
+        summary = {
+            "title": new_title[:TITLE_MAX_LENGTH] if new_title else title[:TITLE_MAX_LENGTH],
+            "content": new_content[:CONTENT_MAX_LENGTH] if new_content else content[:100] + "..."
+        }
+
+        if self.validate_summary(summary):
+            logger.info(f"成功生成摘要 - 标题: {summary['title']}")
+            return summary
+
+        logger.warning("摘要验证失败")
+        return None
@@ -0,0 +1,293 @@
+"""
+摘要缓存，按内容缓存AI摘要结果，相同或近似转载的文章只调用一次AI
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Dict, Any, Optional, List
+
+from core.ai.base_ai import BaseAI
+from config.settings import (SUMMARY_CACHE_PATH, SUMMARY_CACHE_MAX_SIZE_MB,
+                             SUMMARY_CACHE_MAX_AGE_DAYS, SUMMARY_CONCURRENCY)
+from utils.helpers import normalize_content
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryCache:
+    """摘要缓存存储，基于SQLite，按容量和存活时间淘汰"""
+
+    # 每写入多少条检查一次淘汰
+    EVICT_INTERVAL = 100
+
+    def __init__(self, db_path: str = SUMMARY_CACHE_PATH,
+                 max_size_mb: float = SUMMARY_CACHE_MAX_SIZE_MB,
+                 max_age_days: float = SUMMARY_CACHE_MAX_AGE_DAYS):
+        """
+        初始化摘要缓存
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_size_mb: 缓存内容的最大总大小（MB）
+            max_age_days: 缓存条目的最长存活时间（天）
+        """
+        self.db_path = db_path
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summary_cache ("
+            "key TEXT PRIMARY KEY, "
+            "summary TEXT NOT NULL, "
+            "size INTEGER NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_summary_cache_accessed ON summary_cache (accessed_at)"
+        )
+        self._conn.commit()
+        self.evict()
+        logger.info(f"摘要缓存初始化成功: {db_path}")
+
+    @staticmethod
+    def make_key(model: str, prompt_version: str, content: str) -> str:
+        """
+        生成缓存键
+
+        Args:
+            model: 模型名称
+            prompt_version: 提示词版本
+            content: 新闻内容
+
+        Returns:
+            缓存键
+        """
+        content_hash = hashlib.sha256(normalize_content(content).encode("utf-8")).hexdigest()
+        return f"{model}:{prompt_version}:{content_hash}"
+
+    def get(self, key: str) -> Optional[Dict[str, str]]:
+        """
+        读取缓存
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存的摘要，或None（如果未命中或已过期）
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, created_at FROM summary_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and now - row[1] <= self.max_age:
+                self._conn.execute(
+                    "UPDATE summary_cache SET accessed_at = ? WHERE key = ?", (now, key)
+                )
+                self._conn.commit()
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+        return None
+
+    def put(self, key: str, summary: Dict[str, str]):
+        """
+        写入缓存
+
+        Args:
+            key: 缓存键
+            summary: 摘要信息
+        """
+        value = json.dumps(summary, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summary_cache (key, summary, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now)
+            )
+            self._conn.commit()
+            self._writes += 1
+            should_evict = self._writes % self.EVICT_INTERVAL == 0
+
+        if should_evict:
+            self.evict()
+
+    def evict(self):
+        """淘汰过期条目，总大小超出上限时按最近访问时间淘汰最旧的条目"""
+        with self._lock:
+            expired = self._conn.execute(
+                "DELETE FROM summary_cache WHERE created_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+
+            total_size = self._conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM summary_cache"
+            ).fetchone()[0]
+            evicted = 0
+            if total_size > self.max_size:
+                # 淘汰到上限的90%，避免每次写入都触发淘汰
+                excess = total_size - int(self.max_size * 0.9)
+                rows = self._conn.execute(
+                    "SELECT key, size FROM summary_cache ORDER BY accessed_at"
+                )
+                keys = []
+                for key, size in rows:
+                    if excess <= 0:
+                        break
+                    keys.append((key,))
+                    excess -= size
+                self._conn.executemany("DELETE FROM summary_cache WHERE key = ?", keys)
+                evicted = len(keys)
+            self._conn.commit()
+
+        if expired or evicted:
+            logger.info(f"摘要缓存淘汰 - 过期: {expired}, 超出容量: {evicted}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        获取缓存命中统计
+
+        Returns:
+            命中数、未命中数和命中率
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+class CachedAIProvider(BaseAI):
+    """带缓存的AI服务，包装任意AI提供者，按模型、提示词版本和内容哈希缓存摘要"""
+
+    def __init__(self, provider: BaseAI, cache: SummaryCache = None):
+        """
+        初始化带缓存的AI服务
+
+        Args:
+            provider: 被包装的AI提供者
+            cache: 摘要缓存，默认使用SUMMARY_CACHE_PATH
+        """
+        super().__init__(provider.config)
+        self.provider = provider
+        self.name = f"{provider.name}(cached)"
+        self.cache = cache or SummaryCache()
+
+    def summarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        """
+        对新闻内容进行摘要，内容相同时直接返回缓存结果
+
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+
+        Returns:
+            摘要信息，包含title和content，或None（如果摘要失败）
+        """
+        key = self._make_key(content)
+        summary = self._lookup(key)
+        if summary:
+            logger.info(f"摘要缓存命中 - 标题: {title[:30]}")
+            return summary
+
+        summary = self.provider.summarize(title, content)
+        if summary:
+            self.cache.put(key, summary)
+        return summary
+
+    async def asummarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        """
+        异步摘要，内容相同时直接返回缓存结果
+
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+
+        Returns:
+            摘要信息，包含title和content，或None（如果摘要失败）
+        """
+        key = self._make_key(content)
+        summary = self._lookup(key)
+        if summary:
+            logger.info(f"摘要缓存命中 - 标题: {title[:30]}")
+            return summary
+
+        summary = await self.provider.asummarize(title, content)
+        if summary:
+            self.cache.put(key, summary)
+        return summary
+
+    async def asummarize_many(self, articles: List[Dict[str, Any]],
+                              concurrency: int = SUMMARY_CONCURRENCY) -> List[Optional[Dict[str, str]]]:
+        """
+        批量摘要，先查缓存，未命中的文章整体交给被包装的提供者，以便其使用批量模式
+
+        Args:
+            articles: 新闻列表，每个元素包含title和content
+            concurrency: 最大并发请求数
+
+        Returns:
+            与articles顺序一致的摘要列表，失败的位置为None
+        """
+        keys = [self._make_key(article['content']) for article in articles]
+        results = [self._lookup(key) for key in keys]
+        missing = [i for i, summary in enumerate(results) if not summary]
+        if len(missing) < len(articles):
+            logger.info(f"摘要缓存命中 {len(articles) - len(missing)}/{len(articles)} 篇")
+
+        summaries = await self.provider.asummarize_many([articles[i] for i in missing], concurrency)
+        for index, summary in zip(missing, summaries):
+            results[index] = summary
+            if summary:
+                self.cache.put(keys[index], summary)
+        return results
+
+    def classify_links(self, site_name: str, links: List[Dict[str, str]]) -> Optional[List[bool]]:
+        """
+        判断链接是否指向有价值的新闻文章，直接交给被包装的提供者
+
+        Args:
+            site_name: 站点名称
+            links: 链接列表，每个元素包含title和url
+
+        Returns:
+            与links顺序一致的判断结果，或None（如果不支持或调用失败）
+        """
+        return self.provider.classify_links(site_name, links)
+
+    def close(self):
+        """关闭缓存并输出命中统计"""
+        stats = self.cache.get_stats()
+        logger.info(f"摘要缓存统计 - 命中: {stats['hits']}, 未命中: {stats['misses']}, "
+                    f"命中率: {stats['hit_rate']:.1%}")
+        self.cache.close()
+        self.provider.close()
+
+    def _lookup(self, key: str) -> Optional[Dict[str, str]]:
+        """查询缓存并记录命中情况"""
+        summary = self.cache.get(key)
+        metrics.incr("summary_cache_hits" if summary else "summary_cache_misses", provider=self.provider.name)
+        return summary
+
+    def _make_key(self, content: str) -> str:
+        model = getattr(self.provider, "model", None) or self.provider.name
+        return self.cache.make_key(model, self.provider.PROMPT_VERSION, content)
@@ -0,0 +1,178 @@
+"""
+Token预算，发送给AI之前按token数裁剪文章，优先删除样板段落，再按句子边界截断
+"""
+import re
+import logging
+import threading
+from concurrent.futures import Future, TimeoutError
+from typing import Dict, List, Tuple, Optional
+
+from config.settings import SUMMARY_MAX_INPUT_TOKENS, TOKENIZER_ENCODING, TOKENIZER_LOAD_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # 未安装tiktoken时使用估算器
+    tiktoken = None
+
+# 各编码的加载结果，每个编码只在后台线程中加载一次，超时的加载完成后供之后创建的预算使用
+_encoding_loads: Dict[str, Future] = {}
+_encoding_loads_lock = threading.Lock()
+
+# 超出预算时优先删除的样板段落关键词
+BOILERPLATE_KEYWORDS = [
+    "扫码", "二维码", "关注我们", "公众号", "免责声明", "转载请", "分享到", "订阅", "广告",
+]
+
+# 估算器参数：按cl100k_base分词器在中英文新闻上校准，宁可高估
+CJK_TOKENS_PER_CHAR = 1.2
+OTHER_CHARS_PER_TOKEN = 3.5
+
+CJK_RE = re.compile(r"[　-〿㐀-鿿豈-﫿＀-￯]")
+# 句子以中英文句末标点结尾，可带后引号；最后一句可以没有标点
+SENTENCE_RE = re.compile(r"[^。！？!?…]+(?:[。！？!?…]+[”’\"'」』）)]?|$)|[。！？!?…]+")
+
+
+class TokenBudget:
+    """Token预算，优先使用本地tiktoken分词器计数，不可用时使用校准过的估算器"""
+
+    def __init__(self, max_tokens: int = SUMMARY_MAX_INPUT_TOKENS,
+                 encoding_name: str = TOKENIZER_ENCODING, load_timeout: float = TOKENIZER_LOAD_TIMEOUT):
+        """
+        初始化Token预算
+
+        Args:
+            max_tokens: 每篇文章正文允许发送的最大token数，不大于0时不限制
+            encoding_name: tiktoken编码名称
+            load_timeout: 等待编码加载的最长时间（秒）
+        """
+        self.max_tokens = max_tokens
+        self._encoding = self._load_encoding(encoding_name, load_timeout)
+
+    def count(self, text: str) -> int:
+        """
+        计算文本的token数
+
+        Args:
+            text: 文本
+
+        Returns:
+            token数
+        """
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+
+        cjk_count = len(CJK_RE.findall(text))
+        other_count = len(text) - cjk_count
+        return int(cjk_count * CJK_TOKENS_PER_CHAR + other_count / OTHER_CHARS_PER_TOKEN + 0.999)
+
+    def fit(self, text: str) -> Tuple[str, int]:
+        """
+        把文本裁剪到预算以内：先删除样板段落，仍超出时按句子边界截断
+
+        Args:
+            text: 文章正文
+
+        Returns:
+            裁剪后的文本及其token数
+        """
+        tokens = self.count(text)
+        if self.max_tokens <= 0 or tokens <= self.max_tokens:
+            return text, tokens
+
+        # 清洗后的正文通常已合并为一行，此时以句子为单位删除样板内容
+        paragraphs = [p.strip() for p in text.split("\n") if p.strip()]
+        separator = "\n"
+        if len(paragraphs) <= 1:
+            paragraphs = [s.strip() for s in SENTENCE_RE.findall(text) if s.strip()]
+            separator = ""
+
+        kept = [p for p in paragraphs if not self._is_boilerplate(p)]
+        if len(kept) < len(paragraphs):
+            text = separator.join(kept)
+            tokens = self.count(text)
+            if tokens <= self.max_tokens:
+                return text, tokens
+
+        return self._truncate_sentences(kept, separator)
+
+    def _truncate_sentences(self, paragraphs: List[str], separator: str = "\n") -> Tuple[str, int]:
+        """按段落和句子顺序累加，直到下一句会超出预算"""
+        lines = []
+        used = 0
+        # 分隔符按一个token计
+        separator_tokens = 1 if separator else 0
+        for paragraph in paragraphs:
+            budget = self.max_tokens - used - (separator_tokens if lines else 0)
+            paragraph_tokens = self.count(paragraph)
+            if paragraph_tokens <= budget:
+                lines.append(paragraph)
+                used += paragraph_tokens + (separator_tokens if len(lines) > 1 else 0)
+                continue
+
+            sentences = []
+            for sentence in SENTENCE_RE.findall(paragraph):
+                sentence_tokens = self.count(sentence)
+                if sentence_tokens > budget:
+                    break
+                sentences.append(sentence)
+                budget -= sentence_tokens
+
+            if sentences:
+                lines.append("".join(sentences))
+            elif not lines:
+                # 第一句就超出预算，只能按字符截断
+                lines.append(self._truncate_chars(paragraph, budget))
+            break
+
+        text = separator.join(lines)
+        return text, self.count(text)
+
+    def _truncate_chars(self, text: str, budget: int) -> str:
+        """二分查找不超过预算的最长前缀"""
+        low, high = 0, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.count(text[:middle]) <= budget:
+                low = middle
+            else:
+                high = middle - 1
+        return text[:low]
+
+    @staticmethod
+    def _is_boilerplate(paragraph: str) -> bool:
+        return len(paragraph) < 80 and any(keyword in paragraph for keyword in BOILERPLATE_KEYWORDS)
+
+    @staticmethod
+    def _load_encoding(encoding_name: str, timeout: float) -> Optional[object]:
+        """加载tiktoken编码，首次使用需要下载编码文件，失败或超时时回退到估算器"""
+        if tiktoken is None or not encoding_name:
+            return None
+
+        with _encoding_loads_lock:
+            future = _encoding_loads.get(encoding_name)
+            if future is None:
+                future = Future()
+                _encoding_loads[encoding_name] = future
+                # tiktoken下载编码文件时没有超时，放在后台线程中，不阻塞调用方
+                threading.Thread(target=_run_encoding_load, args=(encoding_name, future),
+                                 name="tiktoken-load", daemon=True).start()
+
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            logger.warning(f"加载分词器超过 {timeout} 秒，使用估算的token数")
+        except Exception as e:
+            logger.warning(f"加载分词器失败，使用估算的token数: {e}")
+        return None
+
+
+def _run_encoding_load(encoding_name: str, future: Future):
+    """在后台线程中加载编码，结果写入future"""
+    try:
+        future.set_result(tiktoken.get_encoding(encoding_name))
+    except Exception as e:
+        future.set_exception(e)
@@ -2,93 +2,236 @@
 爬虫基类，定义爬虫的通用接口和方法
 """
 import time
+import hashlib
 import logging
 from abc import ABC, abstractmethod
-from typing import Union, List, Dict, Any, Optional
+from typing import Union, List, Dict, Any, Optional, Iterator
+from urllib.parse import urlparse
 
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.service import Service as ChromeService
 import undetected_chromedriver as uc
 from bs4 import BeautifulSoup
 import requests
 
-from config.settings import CRAWLER_HEADERS, CRAWL_DELAY, MAX_CRAWL_DEPTH
+from config.settings import (CRAWLER_HEADERS, MAX_CRAWL_DEPTH, MAX_NEWS_PER_SITE, MAX_LISTING_PAGES_PER_LEVEL,
+                             DEFAULT_FETCH_MODE, HTTP_TIMEOUT)
+from core.crawler import html_extractor
+from core.crawler.driver_pool import DriverPool, PooledDriver, add_chrome_arguments, init_headless_chrome_driver
+from core.crawler.http_client import create_http_session
+from core.crawler.link_triage import LinkTriage
+from core.crawler.page_cache import PageCache
+from core.crawler.page_state import FrontPageStateStore
+from core.crawler.rate_limiter import HostRateLimiter
+from core.crawler.selector_profile import SelectorProfileStore
+from core.pipeline.work_queue import WorkQueue, STAGE_FETCHED, PENDING_STAGES, STAGE_FAILED
+from core.storage.seen_url_index import SeenUrlIndex
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
-CHROME_USER_AGENT = "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+FETCH_MODE_HTTP = "http"
+FETCH_MODE_BROWSER = "browser"
+FETCH_MODE_AUTO = "auto"
 
 
 class BaseCrawler(ABC):
     """爬虫基类，定义爬虫的通用接口和方法"""
 
-    def __init__(self, site_config: Dict[str, Any]):
+    def __init__(self, site_config: Dict[str, Any], rate_limiter: HostRateLimiter = None,
+                 driver_pool: DriverPool = None, session: requests.Session = None,
+                 seen_index: SeenUrlIndex = None, selector_profiles: SelectorProfileStore = None,
+                 page_state: FrontPageStateStore = None, link_triage: LinkTriage = None,
+                 work_queue: WorkQueue = None, page_cache: PageCache = None):
         """
         初始化爬虫
 
         Args:
             site_config: 站点配置信息
+            rate_limiter: 按主机限速器，多个爬虫共享同一实例时限速按主机生效
+            driver_pool: WebDriver池，设置后从池中借用浏览器而不是每次新建
+            session: 共享的Requests会话，设置后由调用方负责关闭
+            seen_index: 已抓取URL索引，设置后跳过已保存过的文章，文章由下游保存后加入索引
+            selector_profiles: 正文选择器档案，设置后记住各主机提取正文成功的选择器
+            page_state: 主页状态记录，设置后主页未变化时跳过本次爬取
+            link_triage: 链接筛选，未设置时只用本地规则筛选
+            work_queue: 持久化工作队列，设置后记录选中和抓取成功的文章，上次未抓取完的链接优先抓取
+            page_cache: 网页缓存，设置后保存抓取到的页面；重放模式下只从缓存读取页面，
+                不使用seen_index、page_state和work_queue
         """
         self.site_config = site_config
         self.name = site_config["name"]
         self.url = site_config["url"]
         self.headers = CRAWLER_HEADERS
         self.driver = None
-        self.session = None
+        self.session = session
+        self._owns_session = session is None
+        self.fetch_mode = site_config.get("fetch_mode", DEFAULT_FETCH_MODE)
         self.current_depth = 0
-        self.max_depth = MAX_CRAWL_DEPTH
+        self.max_depth = site_config.get("max_depth", MAX_CRAWL_DEPTH)
+        self.max_news = site_config.get("max_news", MAX_NEWS_PER_SITE)
+        self.link_triage = link_triage or LinkTriage()
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self.rate_limiter.configure_site(site_config)
+        self.driver_pool = driver_pool
+        self.page_cache = page_cache
+        self.replay = bool(page_cache and page_cache.replay)
+        # 重放模式重新处理缓存中的页面，不读写已抓取URL索引和工作队列
+        self.seen_index = None if self.replay else seen_index
+        self.selector_profiles = selector_profiles
+        self.page_state = page_state
+        self.work_queue = None if self.replay else work_queue
+        # 最近一次爬取的统计：主页上的链接、主页是否未变化和产出的文章数，供调度器判断站点的更新频率
+        self.stats: Dict[str, Any] = {}
+        # 最近一次HTTP请求的结果：是否返回304，以及响应中的ETag和Last-Modified
+        self.not_modified = False
+        self.last_validators: Dict[str, Optional[str]] = {}
+        # 站点选择器只编译一次，在该爬虫的所有页面间复用
+        self.selectors = html_extractor.SelectorCache()
+        self._driver_lease: Optional[PooledDriver] = None
 
         logger.info(f"初始化爬虫 - {self.name}")
 
     def init_headless_selenium_driver(self):
-        max_retries = 2
-        for attempt in range(max_retries):
-            try:
-                options = webdriver.ChromeOptions()
-                self.add_argument(options)
-                service = ChromeService(log_output="/tmp/chrome_debug.log")
-                driver = webdriver.Chrome(options=options, service=service)
-                return driver
-            except Exception as e:
-                if attempt < max_retries - 1:
-                    logger.error(f"Attempt init_headless_selenium_driver {attempt + 1} failed. {e} Retrying...")
-                    time.sleep(2)
-                else:
-                    raise e
+        return init_headless_chrome_driver(self.add_argument)
 
     def add_argument(self, options: Union[webdriver.ChromeOptions, uc.ChromeOptions]):
-        options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-extensions")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument(CHROME_USER_AGENT)
-        return options
+        return add_chrome_arguments(options)
 
     def setup_selenium(self):
-        """设置Selenium WebDriver"""
-        self.driver = self.init_headless_selenium_driver()
+        """设置Selenium WebDriver，有WebDriver池时从池中借用"""
+        if self.driver_pool:
+            self._driver_lease = self.driver_pool.acquire()
+            self.driver = self._driver_lease.driver
+        else:
+            self.driver = self.init_headless_selenium_driver()
 
     def setup_requests(self):
         """设置Requests会话"""
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = create_http_session(self.headers)
+        self._owns_session = True
         logger.info(f"Requests会话初始化成功 - {self.name}")
 
     def close(self):
         """关闭资源"""
-        if self.driver:
+        if self._driver_lease:
+            self.driver_pool.release(self._driver_lease)
+            self._driver_lease = None
+            self.driver = None
+            logger.info(f"Selenium WebDriver 已归还到池 - {self.name}")
+        elif self.driver:
             self.driver.quit()
+            self.driver = None
             logger.info(f"Selenium WebDriver 已关闭 - {self.name}")
 
-        if self.session:
+        if self.session and self._owns_session:
             self.session.close()
+            self.session = None
             logger.info(f"Requests会话已关闭 - {self.name}")
 
-    def get_page_content(self, url: str) -> Optional[str]:
+    def get_page_content(self, url: str, selector: str = None,
+                         validators: Dict[str, Any] = None) -> Optional[str]:
+        """
+        按站点的fetch_mode获取页面内容
+
+        Args:
+            url: 页面URL
+            selector: auto模式下用于检验HTTP结果的CSS选择器，无匹配时改用浏览器渲染
+            validators: 上次的etag和last_modified，设置后发送条件请求
+
+        Returns:
+            页面HTML内容或None（如果获取失败或页面未变化，未变化时not_modified为True）
+        """
+        self.not_modified = False
+        self.last_validators = {}
+        if self.replay:
+            return self.fetch_from_cache(url)
+
+        if self.fetch_mode == FETCH_MODE_BROWSER:
+            html = self.fetch_with_browser(url)
+        else:
+            html = self.fetch_with_http(url, validators)
+            if self.fetch_mode != FETCH_MODE_HTTP and not self.not_modified and \
+                    not (html and (not selector or self.selector_matches(html, selector))):
+                logger.info(f"HTTP页面未匹配选择器，改用浏览器渲染 - {url}")
+                # 浏览器渲染的页面与HTTP响应的ETag和Last-Modified无关，不能用于下次的条件请求
+                self.last_validators = {}
+                html = self.fetch_with_browser(url)
+
+        if html and self.page_cache:
+            try:
+                self.page_cache.put(url, html)
+            except Exception as e:
+                logger.warning(f"保存页面到缓存失败 - {url}: {e}")
+        return html
+
+    def fetch_from_cache(self, url: str) -> Optional[str]:
+        """
+        从网页缓存读取页面，用于重放模式
+
+        Args:
+            url: 页面URL
+
+        Returns:
+            最近一次缓存的页面HTML内容或None（如果没有缓存）
+        """
+        html = self.page_cache.get(url)
+        metrics.incr("page_cache_hits" if html else "page_cache_misses", site=self.name)
+        if not html:
+            logger.warning(f"缓存中没有该页面 - {url}")
+        return html
+
+    def fetch_with_http(self, url: str, validators: Dict[str, Any] = None) -> Optional[str]:
+        """
+        使用HTTP长连接获取页面内容
+
+        Args:
+            url: 页面URL
+            validators: 上次的etag和last_modified，设置后发送条件请求
+
+        Returns:
+            页面HTML内容或None（如果获取失败或服务器返回304）
+        """
+        if not self.session:
+            self.setup_requests()
+
+        headers = {}
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        host = urlparse(url).netloc
+        try:
+            self.rate_limiter.acquire(url)  # 按主机限速，避免频繁请求
+            start = time.perf_counter()
+            response = self.session.get(url, headers=headers, timeout=HTTP_TIMEOUT)
+            metrics.observe("fetch", time.perf_counter() - start, site=self.name, host=host, mode=FETCH_MODE_HTTP)
+            metrics.incr("bytes_fetched", len(response.content), site=self.name, host=host)
+            if response.status_code in (429, 503):
+                # 服务器要求限流，之后对该主机的请求按Retry-After推迟
+                self.rate_limiter.defer(url, response.headers.get("Retry-After"))
+            if response.status_code == 304 and headers:
+                self.not_modified = True
+                metrics.incr("not_modified", site=self.name, host=host)
+                return None
+            response.raise_for_status()
+            self.last_validators = {"etag": response.headers.get("ETag"),
+                                    "last_modified": response.headers.get("Last-Modified")}
+
+            # 响应头未声明编码时，优先使用页面meta中声明的编码，再按内容推测，避免中文页面乱码
+            if not response.encoding or response.encoding.lower() == "iso-8859-1":
+                declared = requests.utils.get_encodings_from_content(response.text)
+                response.encoding = declared[0] if declared else response.apparent_encoding
+            return response.text
+        except Exception as e:
+            metrics.incr("fetch_failures", site=self.name, host=host, mode=FETCH_MODE_HTTP)
+            logger.warning(f"HTTP获取页面失败 - {url}: {e}")
+            return None
+
+    def fetch_with_browser(self, url: str) -> Optional[str]:
         """
-        获取页面内容
+        使用浏览器渲染页面
 
         Args:
             url: 页面URL
@@ -96,14 +239,43 @@ class BaseCrawler(ABC):
         Returns:
             页面HTML内容或None（如果获取失败）
         """
+        host = urlparse(url).netloc
         try:
+            if not self.driver:
+                self.setup_selenium()
+
+            self.rate_limiter.acquire(url)  # 按主机限速，避免频繁请求
+            start = time.perf_counter()
             self.driver.get(url)
-            time.sleep(CRAWL_DELAY)  # 添加延迟，避免频繁请求
-            return self.driver.page_source
+            page_source = self.driver.page_source
+            metrics.observe("fetch", time.perf_counter() - start, site=self.name, host=host, mode=FETCH_MODE_BROWSER)
+            if self._driver_lease:
+                self._driver_lease.pages += 1
+            metrics.incr("bytes_fetched", len(page_source.encode("utf-8")), site=self.name, host=host)
+            return page_source
         except Exception as e:
+            metrics.incr("fetch_failures", site=self.name, host=host, mode=FETCH_MODE_BROWSER)
             logger.error(f"获取页面内容失败 - {url}: {e}")
             return None
 
+    def selector_matches(self, html: str, selector: str) -> bool:
+        """
+        检查页面中是否存在匹配选择器的元素
+
+        Args:
+            html: HTML内容
+            selector: CSS选择器
+
+        Returns:
+            是否存在匹配
+        """
+        if html_extractor.is_available():
+            try:
+                return html_extractor.has_match(html, selector, self.selectors)
+            except Exception as e:
+                logger.debug(f"lxml选择器匹配失败，改用BeautifulSoup - {selector}: {e}")
+        return self.parse_html(html).select_one(selector) is not None
+
     def parse_html(self, html: str) -> BeautifulSoup:
         """
         解析HTML
@@ -116,6 +288,80 @@ class BaseCrawler(ABC):
         """
         return BeautifulSoup(html, 'lxml')
 
+    def get_links_selector(self) -> Optional[str]:
+        """
+        主页上新闻链接所在元素的选择器，auto模式下用于判断是否需要浏览器渲染
+
+        Returns:
+            CSS选择器，None表示不检验
+        """
+        return None
+
+    def get_content_selector(self) -> Optional[str]:
+        """
+        文章页正文元素的选择器，auto模式下用于判断是否需要浏览器渲染
+
+        Returns:
+            CSS选择器，None表示不检验
+        """
+        return None
+
+    def extract_links_from_html(self, html: str) -> List[Dict[str, str]]:
+        """
+        从主页HTML中提取新闻链接，优先使用不构建BeautifulSoup树的快速路径
+
+        Args:
+            html: 主页HTML内容
+
+        Returns:
+            新闻链接列表，每个元素包含title和url
+        """
+        news_links = self.extract_news_links_fast(html)
+        if news_links is not None:
+            return news_links
+        return self.extract_news_links(self.parse_html(html))
+
+    def extract_news_links_fast(self, html: str) -> Optional[List[Dict[str, str]]]:
+        """
+        快速提取新闻链接，结果必须与extract_news_links一致，无法处理时返回None以回退到BeautifulSoup
+
+        Args:
+            html: 主页HTML内容
+
+        Returns:
+            新闻链接列表，或None（如果需要回退）
+        """
+        return None
+
+    def extract_article_content(self, html: str, url: str = None) -> str:
+        """
+        从文章页HTML中提取正文，优先使用不构建BeautifulSoup树的快速路径
+
+        Args:
+            html: 文章页HTML内容
+            url: 文章页URL
+
+        Returns:
+            新闻内容
+        """
+        content = self.extract_content_fast(html, url)
+        if content is not None:
+            return content
+        return self.extract_content(self.parse_html(html))
+
+    def extract_content_fast(self, html: str, url: str = None) -> Optional[str]:
+        """
+        快速提取正文，无法处理时返回None以回退到BeautifulSoup
+
+        Args:
+            html: 文章页HTML内容
+            url: 文章页URL
+
+        Returns:
+            新闻内容，或None（如果需要回退）
+        """
+        return None
+
     @abstractmethod
     def extract_news_links(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
         """
@@ -149,30 +395,117 @@ class BaseCrawler(ABC):
         Returns:
             爬取的新闻列表
         """
+        return list(self.iter_crawl())
+
+    def _crawl_listing_pages(self, links: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        爬取层级大于2时，沿主页上的栏目页逐层向下爬取，收集更多候选链接
+
+        Args:
+            links: 主页上的链接
+
+        Returns:
+            栏目页中新发现的链接
+        """
+        collected = []
+        known_urls = {link['url'] for link in links}
+        frontier = links
+        # 第1层是主页，最后一层是文章页，中间各层是栏目页
+        for _ in range(self.max_depth - 2):
+            listing_links = [link for link in frontier
+                             if self.link_triage.is_listing(self.site_config, link)][:MAX_LISTING_PAGES_PER_LEVEL]
+            frontier = []
+            for listing in listing_links:
+                html = self.get_page_content(listing['url'], self.get_links_selector())
+                if not html:
+                    continue
+                for link in self.extract_links_from_html(html):
+                    if link['url'] not in known_urls:
+                        known_urls.add(link['url'])
+                        frontier.append(link)
+            collected.extend(frontier)
+            if not frontier:
+                break
+
+        if collected:
+            logger.info(f"从栏目页获取了 {len(collected)} 个新闻链接 - {self.name}")
+        return collected
+
+    def _resume_links(self, news_links: List[Dict[str, str]]) -> List[Dict[str, str]]:
+        """
+        把上次选中但没有抓取成功的链接排在最前面，并去掉已抓取但尚未存储或已放弃的链接
+
+        Args:
+            news_links: 筛选后的链接
+
+        Returns:
+            调整后的链接
+        """
+        pending = self.work_queue.pending_links(self.name)
+        if pending:
+            logger.info(f"继续抓取上次未完成的 {len(pending)} 个链接 - {self.name}")
+        pending_urls = {news['url'] for news in pending}
+        fresh = [news for news in news_links if news['url'] not in pending_urls
+                 and self.work_queue.get_stage(news['url']) not in (*PENDING_STAGES, STAGE_FAILED)]
+        return pending + fresh
+
+    @staticmethod
+    def _hash_links(urls: List[str]) -> str:
+        """链接列表的哈希，与链接顺序无关"""
+        return hashlib.sha1("\n".join(sorted(set(urls))).encode("utf-8")).hexdigest()
+
+    def iter_crawl(self) -> Iterator[Dict[str, Any]]:
+        """
+        逐条爬取新闻，每爬完一篇文章立即产出，便于下游流式处理
+
+        Yields:
+            爬取的新闻
+        """
         logger.info(f"开始爬取 - {self.name}")
+        self.stats = {"link_urls": None, "unchanged": False, "articles": 0}
+        # 重放模式处理缓存中的页面，不比较主页状态
+        previous_state = self.page_state.get(self.url) if self.page_state and not self.replay else {}
 
         try:
-            self.setup_selenium()
-
-            # 爬取主页
-            html = self.get_page_content(self.url)
+            # 爬取主页，上次完整处理后未变化时直接结束
+            html = self.get_page_content(self.url, self.get_links_selector(), previous_state)
+            if self.not_modified:
+                logger.info(f"主页未变化（304），跳过本次爬取 - {self.name}")
+                self.stats["unchanged"] = True
+                return
             if not html:
                 logger.error(f"无法获取主页内容 - {self.name}")
-                return []
-
-            soup = self.parse_html(html)
-            news_links = self.extract_news_links(soup)
+                return
+            validators = self.last_validators
+
+            news_links = self.extract_links_from_html(html)
+            self.stats["link_urls"] = [news['url'] for news in news_links]
+            links_hash = self._hash_links(self.stats["link_urls"])
+            if links_hash == previous_state.get("links_hash"):
+                logger.info(f"主页链接未变化，跳过本次爬取 - {self.name}")
+                metrics.incr("links_unchanged", site=self.name)
+                self.stats["unchanged"] = True
+                return
 
             logger.info(f"从主页获取了 {len(news_links)} 个新闻链接 - {self.name}")
+            if self.max_depth < 2:
+                return
+
+            # 抓取文章之前筛选链接，已抓取过和低价值的链接不再请求，名额留给有价值的新链接
+            candidates = news_links + self._crawl_listing_pages(news_links)
+            news_links = self.link_triage.select(self.site_config, candidates, self.seen_index)
+            if self.work_queue:
+                news_links = self._resume_links(news_links)
+                self.work_queue.add_links(self.name, news_links[:self.max_news])
 
-            results = []
             # 爬取内容页
-            for news in news_links[:5]:  # 限制爬取数量
+            failed = 0
+            for news in news_links[:self.max_news]:
+                news_item = None
                 try:
-                    content_html = self.get_page_content(news['url'])
+                    content_html = self.get_page_content(news['url'], self.get_content_selector())
                     if content_html:
-                        content_soup = self.parse_html(content_html)
-                        content = self.extract_content(content_soup)
+                        content = self.extract_article_content(content_html, news['url'])
 
                         news_item = {
                             'title': news['title'],
@@ -180,15 +513,24 @@ class BaseCrawler(ABC):
                             'content': content,
                             'source': self.name
                         }
-
-                        results.append(news_item)
+                        if self.work_queue:
+                            self.work_queue.update(self.name, STAGE_FETCHED, news_item)
                         logger.info(f"成功爬取新闻: {news['title']}")
                 except Exception as e:
                     logger.error(f"爬取新闻内容失败 - {news['title']}: {e}")
 
-            return results
+                if news_item:
+                    self.stats["articles"] += 1
+                    yield news_item
+                else:
+                    failed += 1
+                    if self.work_queue:
+                        self.work_queue.record_failure(news['url'], "抓取失败")
+
+            # 新链接全部处理完才记录主页状态，否则下次仍需处理剩余和失败的链接
+            if self.page_state and not self.replay and not failed and len(news_links) <= self.max_news:
+                self.page_state.update(self.url, {**validators, "links_hash": links_hash})
         except Exception as e:
             logger.error(f"爬取过程中出错 - {self.name}: {e}")
-            return []
         finally:
-            self.close()
\ No newline at end of file
+            self.close()
@@ -14,12 +14,13 @@ class CrawlerFactory:
     """爬虫工厂类，用于创建不同类型的爬虫"""
 
     @staticmethod
-    def create_crawler(site_config: Dict[str, Any]) -> BaseCrawler:
+    def create_crawler(site_config: Dict[str, Any], **kwargs) -> BaseCrawler:
         """
         根据站点配置创建对应的爬虫实例
 
         Args:
             site_config: 站点配置信息
+            **kwargs: 传给爬虫的共享资源，如rate_limiter
 
         Returns:
             爬虫实例
@@ -30,7 +31,7 @@ class CrawlerFactory:
 
         # 根据crawler_type创建对应的爬虫
         if crawler_type == "common":
-            return CommonCrawler(site_config)
+            return CommonCrawler(site_config, **kwargs)
 
         # 如果需要自定义爬虫，可以在这里添加更多的条件判断
         # elif crawler_type == "custom_type":
@@ -38,4 +39,4 @@ class CrawlerFactory:
 
         else:
             logger.warning(f"未知爬虫类型 {crawler_type}，使用通用爬虫")
-            return CommonCrawler(site_config)
\ No newline at end of file
+            return CommonCrawler(site_config, **kwargs)
\ No newline at end of file
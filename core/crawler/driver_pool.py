@@ -0,0 +1,241 @@
+"""
+WebDriver池，复用常驻的无头Chrome实例，避免每个站点冷启动浏览器
+"""
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service as ChromeService
+
+from config.settings import DRIVER_POOL_SIZE, DRIVER_MAX_PAGES, DRIVER_ACQUIRE_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+CHROME_USER_AGENT = "--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+
+
+def add_chrome_arguments(options: webdriver.ChromeOptions) -> webdriver.ChromeOptions:
+    """添加无头Chrome的启动参数"""
+    options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument(CHROME_USER_AGENT)
+    return options
+
+
+def init_headless_chrome_driver(add_arguments: Callable = add_chrome_arguments,
+                                max_retries: int = 2) -> webdriver.Chrome:
+    """
+    启动一个无头Chrome WebDriver，失败时重试
+
+    Args:
+        add_arguments: 向ChromeOptions添加启动参数的函数
+        max_retries: 最大尝试次数
+
+    Returns:
+        WebDriver实例
+    """
+    for attempt in range(max_retries):
+        try:
+            options = webdriver.ChromeOptions()
+            add_arguments(options)
+            service = ChromeService(log_output="/tmp/chrome_debug.log")
+            return webdriver.Chrome(options=options, service=service)
+        except Exception as e:
+            if attempt < max_retries - 1:
+                logger.error(f"Attempt init_headless_selenium_driver {attempt + 1} failed. {e} Retrying...")
+                time.sleep(2)
+            else:
+                raise e
+
+
+class PooledDriver:
+    """池中的WebDriver，记录已加载的页面数，用于到期回收"""
+
+    def __init__(self, driver: webdriver.Chrome):
+        self.driver = driver
+        self.pages = 0
+        self.created_at = time.monotonic()
+
+
+class DriverPool:
+    """WebDriver池，保持N个预热的无头浏览器，按租约借给爬虫使用"""
+
+    def __init__(self, size: int = DRIVER_POOL_SIZE, max_pages: int = DRIVER_MAX_PAGES,
+                 driver_factory: Callable[[], webdriver.Chrome] = init_headless_chrome_driver,
+                 acquire_timeout: float = DRIVER_ACQUIRE_TIMEOUT):
+        """
+        初始化WebDriver池
+
+        Args:
+            size: 池中浏览器的最大数量
+            max_pages: 单个浏览器加载多少页面后回收重建，0表示不限制
+            driver_factory: 创建WebDriver的函数
+            acquire_timeout: 借用浏览器的最长等待时间（秒）
+        """
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.driver_factory = driver_factory
+        self.acquire_timeout = acquire_timeout
+
+        # 后进先出，优先复用刚归还的浏览器
+        self._idle: "queue.LifoQueue[PooledDriver]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._closed = False
+
+        logger.info(f"初始化WebDriver池 - 大小: {self.size}, 回收页数: {self.max_pages}")
+
+    def warm_up(self, count: int = None):
+        """
+        预先启动浏览器
+
+        Args:
+            count: 预热数量，默认填满整个池
+        """
+        count = min(count or self.size, self.size)
+        leases = []
+        try:
+            for _ in range(count):
+                leases.append(self.acquire())
+        finally:
+            for lease in leases:
+                self.release(lease)
+
+    def acquire(self, timeout: float = None) -> PooledDriver:
+        """
+        借用一个健康的浏览器，池已满时阻塞等待归还
+
+        Args:
+            timeout: 最长等待时间（秒），默认使用acquire_timeout
+
+        Returns:
+            池中的WebDriver
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            if self._closed:
+                raise RuntimeError("WebDriver池已关闭")
+
+            lease = self._take_idle()
+            if lease is None and self._reserve_slot():
+                try:
+                    lease = PooledDriver(self.driver_factory())
+                    logger.info("WebDriver池启动了新的浏览器")
+                except Exception:
+                    self._release_slot()
+                    raise
+            if lease is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"等待WebDriver超时（{timeout}秒）")
+                try:
+                    # 短轮询，以便有浏览器被销毁时能及时补建
+                    lease = self._idle.get(timeout=min(remaining, 1.0))
+                except queue.Empty:
+                    continue
+
+            if self._is_healthy(lease):
+                return lease
+
+            logger.warning("WebDriver健康检查失败，重建浏览器")
+            self._discard(lease)
+
+    def release(self, lease: PooledDriver, broken: bool = False):
+        """
+        归还浏览器，重置状态；损坏或达到回收页数的浏览器直接销毁
+
+        Args:
+            lease: 借出的WebDriver
+            broken: 使用过程中是否出现了浏览器级别的错误
+        """
+        if self._closed or broken:
+            self._discard(lease)
+            return
+
+        if self.max_pages and lease.pages >= self.max_pages:
+            logger.info(f"WebDriver已加载 {lease.pages} 个页面，回收重建")
+            self._discard(lease)
+            return
+
+        try:
+            self._reset(lease.driver)
+        except Exception as e:
+            logger.warning(f"重置WebDriver失败，销毁浏览器: {e}")
+            self._discard(lease)
+            return
+
+        self._idle.put(lease)
+
+    @contextmanager
+    def lease(self):
+        """以上下文管理器方式借用浏览器"""
+        pooled = self.acquire()
+        broken = False
+        try:
+            yield pooled
+        except Exception:
+            broken = not self._is_healthy(pooled)
+            raise
+        finally:
+            self.release(pooled, broken=broken)
+
+    def close(self):
+        """关闭池中所有空闲浏览器，已借出的浏览器在归还时销毁"""
+        self._closed = True
+        while True:
+            lease = self._take_idle()
+            if lease is None:
+                break
+            self._discard(lease)
+        logger.info("WebDriver池已关闭")
+
+    def _take_idle(self) -> Optional[PooledDriver]:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _reserve_slot(self) -> bool:
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return True
+            return False
+
+    def _release_slot(self):
+        with self._lock:
+            self._created -= 1
+
+    def _discard(self, lease: PooledDriver):
+        try:
+            lease.driver.quit()
+        except Exception as e:
+            logger.debug(f"关闭WebDriver失败: {e}")
+        finally:
+            self._release_slot()
+
+    @staticmethod
+    def _is_healthy(lease: PooledDriver) -> bool:
+        try:
+            return lease.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    @staticmethod
+    def _reset(driver: webdriver.Chrome):
+        """清理上一个租约留下的标签页和Cookie"""
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+        driver.delete_all_cookies()
+        driver.get("about:blank")
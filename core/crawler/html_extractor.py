@@ -0,0 +1,293 @@
+"""
+HTML提取工具，直接基于lxml按CSS选择器提取元素和文本，避免构建BeautifulSoup树
+"""
+import re
+import logging
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import lxml.html
+from lxml import etree
+
+try:
+    from lxml.cssselect import CSSSelector
+except ImportError:  # cssselect未安装时退回BeautifulSoup
+    CSSSelector = None
+
+logger = logging.getLogger(__name__)
+
+# BeautifulSoup的get_text()不包含这些元素内的文字，保持一致
+NON_TEXT_TAGS = frozenset(["script", "style", "template", "rt", "rp"])
+
+
+def is_available() -> bool:
+    """lxml快速路径是否可用"""
+    return CSSSelector is not None
+
+
+def parse_document(html: str) -> Optional[etree._Element]:
+    """
+    解析HTML文档
+
+    Args:
+        html: HTML内容
+
+    Returns:
+        文档根元素，或None（如果文档为空）
+    """
+    try:
+        return lxml.html.document_fromstring(html)
+    except ValueError:
+        # 带有编码声明的字符串需要先编码为字节再解析
+        parser = lxml.html.HTMLParser(encoding="utf-8")
+        return lxml.html.document_fromstring(html.encode("utf-8"), parser=parser)
+    except etree.ParserError:
+        return None
+
+
+class SelectorCache:
+    """CSS选择器编译缓存，选择器字符串只解析一次，编译失败的选择器也会被记住"""
+
+    def __init__(self):
+        self._compiled: Dict[str, Union["CSSSelector", Exception]] = {}
+
+    def get(self, selector: str) -> "CSSSelector":
+        """
+        获取编译后的选择器
+
+        Args:
+            selector: CSS选择器
+
+        Returns:
+            编译后的选择器，cssselect不支持该选择器时抛出异常
+        """
+        compiled = self._compiled.get(selector)
+        if compiled is None:
+            try:
+                compiled = CSSSelector(selector)
+            except Exception as e:
+                compiled = e
+            self._compiled[selector] = compiled
+
+        if isinstance(compiled, Exception):
+            raise compiled
+        return compiled
+
+    def select(self, root: etree._Element, selector: str, include_root: bool = False) -> List[etree._Element]:
+        """
+        查找所有匹配CSS选择器的元素，与BeautifulSoup的select一致
+
+        Args:
+            root: 查找范围的根元素
+            selector: CSS选择器
+            include_root: 是否包含root本身，从整个文档查找时为True
+
+        Returns:
+            按文档顺序排列的匹配元素
+        """
+        elements = self.get(selector)(root)
+        if include_root:
+            return elements
+        return [element for element in elements if element is not root]
+
+    def select_one(self, root: etree._Element, selector: str,
+                   include_root: bool = False) -> Optional[etree._Element]:
+        """
+        查找第一个匹配CSS选择器的元素，与BeautifulSoup的select_one一致
+
+        Args:
+            root: 查找范围的根元素
+            selector: CSS选择器
+            include_root: 是否包含root本身，从整个文档查找时为True
+
+        Returns:
+            匹配的元素，或None
+        """
+        for element in self.get(selector)(root):
+            if include_root or element is not root:
+                return element
+        return None
+
+
+_SIMPLE_SELECTOR_RE = re.compile(r"^(?P<tag>[a-zA-Z][\w-]*)?(?:#(?P<id>[\w-]+))?(?P<classes>(?:\.[\w-]+)*)$")
+
+
+def compile_simple_selector(selector: str) -> Callable[[etree._Element], bool]:
+    """
+    把形如 tag、.class、#id、tag.class 的简单选择器编译为元素判断函数
+
+    Args:
+        selector: 简单CSS选择器
+
+    Returns:
+        判断元素是否匹配的函数，不是简单选择器时抛出ValueError
+    """
+    match = _SIMPLE_SELECTOR_RE.match(selector.strip())
+    if not match or not selector.strip():
+        raise ValueError(f"不是简单选择器: {selector}")
+
+    tag = match.group("tag").lower() if match.group("tag") else None
+    element_id = match.group("id")
+    classes = frozenset(name for name in match.group("classes").split(".") if name)
+
+    def matches(element: etree._Element) -> bool:
+        if tag and element.tag.lower() != tag:
+            return False
+        if element_id and element.get("id") != element_id:
+            return False
+        return not classes or classes.issubset((element.get("class") or "").split())
+
+    return matches
+
+
+def find_first_by_priority(root: etree._Element, matchers: Sequence[Callable[[etree._Element], bool]]
+                           ) -> Tuple[Optional[etree._Element], int]:
+    """
+    一次遍历找出优先级最高的选择器的第一个匹配元素，
+    结果与按顺序逐个执行select_one、返回第一个有匹配的结果相同
+
+    Args:
+        root: 文档根元素
+        matchers: 按优先级排列的元素判断函数
+
+    Returns:
+        匹配的元素和对应选择器的序号，没有匹配时为(None, -1)
+    """
+    best = len(matchers)
+    result = None
+    for element in root.iter():
+        if not isinstance(element.tag, str):
+            continue
+        for priority in range(best):
+            if matchers[priority](element):
+                best = priority
+                result = element
+                break
+        if best == 0:
+            break
+    return result, (best if result is not None else -1)
+
+
+# 正文密度评分：只统计足够长的段落，标点越多越像正文
+PARAGRAPH_TAGS = ("p", "pre")
+MIN_PARAGRAPH_LENGTH = 25
+PUNCTUATION_RE = re.compile(r"[，。！？；、,.!?;]")
+
+
+def find_densest_element(root: etree._Element) -> Optional[etree._Element]:
+    """
+    按文本密度找出最可能是正文的容器，思路与Readability相同：
+    每个长段落按长度和标点数评分，分数累加到父元素，祖父元素得一半，
+    最后按链接文字占比折算，得分最高的容器即为正文
+
+    Args:
+        root: 文档根元素
+
+    Returns:
+        正文容器，或None（如果页面中没有像正文的段落）
+    """
+    scores: Dict[etree._Element, float] = {}
+    for paragraph in root.iter(*PARAGRAPH_TAGS):
+        text = element_text(paragraph)
+        if len(text) < MIN_PARAGRAPH_LENGTH:
+            continue
+
+        score = 1 + len(PUNCTUATION_RE.findall(text)) + min(len(text) / 100, 3)
+        parent = paragraph.getparent()
+        if parent is None:
+            continue
+        scores[parent] = scores.get(parent, 0.0) + score
+        grandparent = parent.getparent()
+        if grandparent is not None:
+            scores[grandparent] = scores.get(grandparent, 0.0) + score / 2
+
+    best = None
+    best_score = 0.0
+    for candidate, score in scores.items():
+        score *= 1 - link_density(candidate)
+        if score > best_score:
+            best, best_score = candidate, score
+    return best
+
+
+def link_density(element: etree._Element) -> float:
+    """
+    链接文字占元素全部文字的比例
+
+    Args:
+        element: lxml元素
+
+    Returns:
+        0到1之间的比例
+    """
+    text_length = len(element_text(element))
+    if not text_length:
+        return 1.0
+    link_length = sum(len(element_text(link)) for link in element.iter("a"))
+    return min(1.0, link_length / text_length)
+
+
+def element_text(element: etree._Element, strip: bool = True) -> str:
+    """
+    提取元素文本，结果与BeautifulSoup的get_text(strip=strip)一致
+
+    Args:
+        element: lxml元素
+        strip: 是否去除每段文字两端的空白并丢弃空段
+
+    Returns:
+        元素文本
+    """
+    strings: List[str] = []
+    _collect_strings(element, strings, skip=False)
+    if strip:
+        return "".join(text for text in (string.strip() for string in strings) if text)
+    return "".join(strings)
+
+
+def extract_text(html: str, selector: str, selectors: SelectorCache = None) -> Optional[str]:
+    """
+    提取第一个匹配选择器的元素的文本
+
+    Args:
+        html: HTML内容
+        selector: CSS选择器
+        selectors: 选择器编译缓存，不传时临时编译
+
+    Returns:
+        元素文本，或None（如果没有匹配的元素）
+    """
+    root = parse_document(html)
+    if root is None:
+        return None
+    element = (selectors or SelectorCache()).select_one(root, selector, include_root=True)
+    return element_text(element) if element is not None else None
+
+
+def has_match(html: str, selector: str, selectors: SelectorCache = None) -> bool:
+    """
+    判断HTML中是否存在匹配选择器的元素
+
+    Args:
+        html: HTML内容
+        selector: CSS选择器
+        selectors: 选择器编译缓存，不传时临时编译
+
+    Returns:
+        是否存在匹配
+    """
+    root = parse_document(html)
+    if root is None:
+        return False
+    return (selectors or SelectorCache()).select_one(root, selector, include_root=True) is not None
+
+
+def _collect_strings(element: etree._Element, strings: List[str], skip: bool):
+    """按文档顺序收集元素内的文字，注释和NON_TEXT_TAGS内的文字跳过，但其后的tail仍属于父元素"""
+    tag = element.tag
+    skip = skip or not isinstance(tag, str) or tag.lower() in NON_TEXT_TAGS
+    if not skip and element.text:
+        strings.append(element.text)
+    for child in element:
+        _collect_strings(child, strings, skip)
+        if not skip and child.tail:
+            strings.append(child.tail)
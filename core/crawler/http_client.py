@@ -0,0 +1,36 @@
+"""
+HTTP客户端，创建带连接池和长连接的Requests会话
+"""
+import logging
+from typing import Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.settings import CRAWLER_HEADERS, PROXY, HTTP_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+def create_http_session(headers: Dict[str, str] = None, pool_size: int = HTTP_POOL_SIZE) -> requests.Session:
+    """
+    创建Requests会话，同一主机的请求复用长连接
+
+    Args:
+        headers: 请求头，默认使用CRAWLER_HEADERS
+        pool_size: 每个主机保持的最大连接数
+
+    Returns:
+        Requests会话
+    """
+    session = requests.Session()
+    session.headers.update(headers or CRAWLER_HEADERS)
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    if PROXY:
+        session.proxies.update({"http": PROXY, "https": PROXY})
+
+    return session
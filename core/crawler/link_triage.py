@@ -0,0 +1,185 @@
+"""
+链接筛选，在抓取文章之前给候选链接打分，只把有价值的链接交给爬虫
+"""
+import re
+import logging
+import threading
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
+
+from config.settings import (LINK_TRIAGE_ACCEPT_SCORE, LINK_TRIAGE_REJECT_SCORE, LINK_TRIAGE_LLM_ENABLED,
+                             LINK_TRIAGE_MAX_LLM_LINKS)
+from core.ai.base_ai import BaseAI
+from core.storage.seen_url_index import SeenUrlIndex
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 文章页URL的常见特征：日期、长数字ID、静态页后缀
+ARTICLE_URL_RE = re.compile(r"(?:20\d{2}[/-]?[01]\d(?:[/-]?[0-3]\d)?)|(?:\d{5,})|(?:\.s?html?$)", re.IGNORECASE)
+# 明显不是新闻的链接
+NON_ARTICLE_URL_RE = re.compile(
+    r"(?:^(?:javascript|mailto|tel):)|(?:/(?:login|register|signup|signin|logout|about|contact|help|search|"
+    r"tags?|user|users|download|app|privacy|terms)(?:[/?#.]|$))|(?:\.(?:jpe?g|png|gif|pdf|zip|apk|exe)$)",
+    re.IGNORECASE
+)
+# 栏目页：路径很短且不含数字，例如 /news/、/tech
+LISTING_URL_RE = re.compile(r"^/?(?:[a-z_-]+/?){1,2}$", re.IGNORECASE)
+
+MIN_TITLE_LENGTH = 6
+MAX_TITLE_LENGTH = 80
+
+
+class LinkTriage:
+    """
+    链接筛选
+
+    先用本地规则打分（URL特征、标题长度、链接在页面中的位置），已抓取过的链接直接跳过；
+    分数介于拒绝和接受阈值之间的链接批量交给AI判断，AI不可用时按分数排序保留。
+    AI的判断结果按URL缓存，常驻运行时同一链接只判断一次。
+    """
+
+    # 缓存的AI判断结果上限，超过后清空
+    MAX_CACHED_VERDICTS = 10000
+
+    def __init__(self, ai_service: BaseAI = None, accept_score: float = LINK_TRIAGE_ACCEPT_SCORE,
+                 reject_score: float = LINK_TRIAGE_REJECT_SCORE, llm_enabled: bool = LINK_TRIAGE_LLM_ENABLED,
+                 max_llm_links: int = LINK_TRIAGE_MAX_LLM_LINKS):
+        """
+        初始化链接筛选
+
+        Args:
+            ai_service: AI服务，用于判断规则无法确定的链接，None表示只用本地规则
+            accept_score: 不低于该分数的链接直接接受
+            reject_score: 不高于该分数的链接直接拒绝
+            llm_enabled: 是否用AI判断不确定的链接
+            max_llm_links: 每个页面最多交给AI判断的链接数
+        """
+        self.ai_service = ai_service
+        self.accept_score = accept_score
+        self.reject_score = reject_score
+        self.llm_enabled = llm_enabled and ai_service is not None
+        self.max_llm_links = max_llm_links
+        self._lock = threading.Lock()
+        self._verdicts: Dict[str, bool] = {}
+
+    def select(self, site_config: Dict[str, Any], links: List[Dict[str, str]],
+               seen_index: SeenUrlIndex = None) -> List[Dict[str, str]]:
+        """
+        筛选值得抓取的新闻链接
+
+        Args:
+            site_config: 站点配置信息
+            links: 候选链接，按在页面中出现的顺序排列，每个元素包含title和url
+            seen_index: 已抓取URL索引，已抓取过的链接会被跳过
+
+        Returns:
+            按价值从高到低排列的链接
+        """
+        name = site_config["name"]
+        if seen_index:
+            seen_urls = seen_index.filter_seen(link['url'] for link in links)
+            links = [link for link in links if link['url'] not in seen_urls]
+            logger.info(f"跳过 {len(seen_urls)} 个已抓取的链接 - {name}")
+
+        scored = [(self.score(site_config, link, position, len(links)), position, link)
+                  for position, link in enumerate(links)]
+        accepted = [item for item in scored if item[0] >= self.accept_score]
+        ambiguous = [item for item in scored if self.reject_score < item[0] < self.accept_score]
+        rejected = len(scored) - len(accepted) - len(ambiguous)
+
+        if ambiguous and self.llm_enabled:
+            # 分数高的先交给AI，超出上限的链接保持待定
+            ambiguous.sort(key=lambda item: (-item[0], item[1]))
+            judged, ambiguous = ambiguous[:self.max_llm_links], ambiguous[self.max_llm_links:]
+            verdicts = self._classify(site_config, [link for _, _, link in judged])
+            if verdicts is None:
+                ambiguous = judged + ambiguous
+            else:
+                kept = [item for item, valid in zip(judged, verdicts) if valid]
+                rejected += len(judged) - len(kept)
+                accepted += kept
+
+        # 不确定的链接排在接受的链接之后，同一类中分数高、位置靠前的优先
+        selected = sorted(accepted, key=lambda item: (-item[0], item[1])) + \
+            sorted(ambiguous, key=lambda item: (-item[0], item[1]))
+        metrics.incr("links_rejected", rejected, site=name)
+        logger.info(f"链接筛选 - {name}: 接受 {len(accepted)}, 待定 {len(ambiguous)}, 拒绝 {rejected}")
+        return [link for _, _, link in selected]
+
+    def score(self, site_config: Dict[str, Any], link: Dict[str, str], position: int, total: int) -> float:
+        """
+        用本地规则给链接打分
+
+        Args:
+            site_config: 站点配置信息
+            link: 链接，包含title和url
+            position: 链接在页面中的位置
+            total: 页面中的链接数
+
+        Returns:
+            0到1之间的分数，越高越可能是有价值的新闻
+        """
+        url = link['url']
+        title = link['title'].strip()
+        parsed = urlparse(url)
+        if parsed.scheme not in ("http", "https") or NON_ARTICLE_URL_RE.search(url):
+            return 0.0
+        if len(title) < MIN_TITLE_LENGTH // 2:
+            return 0.0
+
+        score = 0.5
+        if ARTICLE_URL_RE.search(parsed.path):
+            score += 0.25
+        elif LISTING_URL_RE.match(parsed.path):
+            score -= 0.2
+
+        if MIN_TITLE_LENGTH <= len(title) <= MAX_TITLE_LENGTH:
+            score += 0.15
+        elif len(title) < MIN_TITLE_LENGTH:
+            score -= 0.2
+
+        if parsed.netloc != urlparse(site_config["url"]).netloc:
+            score -= 0.1
+
+        # 页面靠前的链接通常是头条
+        if total > 1:
+            score += 0.1 * (1 - position / (total - 1))
+        return max(0.0, min(1.0, score))
+
+    def is_listing(self, site_config: Dict[str, Any], link: Dict[str, str]) -> bool:
+        """
+        判断链接是否为同站点的栏目页，栏目页可以继续向下一层爬取
+
+        Args:
+            site_config: 站点配置信息
+            link: 链接，包含title和url
+
+        Returns:
+            是否为栏目页
+        """
+        parsed = urlparse(link['url'])
+        return (parsed.netloc == urlparse(site_config["url"]).netloc
+                and bool(LISTING_URL_RE.match(parsed.path))
+                and not NON_ARTICLE_URL_RE.search(link['url'])
+                and 2 <= len(link['title'].strip()) < MIN_TITLE_LENGTH)
+
+    def _classify(self, site_config: Dict[str, Any], links: List[Dict[str, str]]) -> Optional[List[bool]]:
+        """用AI判断链接是否为有价值的新闻，已判断过的链接使用缓存结果"""
+        with self._lock:
+            cached = [self._verdicts.get(link['url']) for link in links]
+        unknown = [link for link, verdict in zip(links, cached) if verdict is None]
+
+        if unknown:
+            with metrics.timer("link_triage", site=site_config["name"]):
+                verdicts = self.ai_service.classify_links(site_config["name"], unknown)
+            if verdicts is None:
+                return None
+            with self._lock:
+                if len(self._verdicts) > self.MAX_CACHED_VERDICTS:
+                    self._verdicts.clear()
+                for link, verdict in zip(unknown, verdicts):
+                    self._verdicts[link['url']] = verdict
+            verdict_iter = iter(verdicts)
+            cached = [verdict if verdict is not None else next(verdict_iter) for verdict in cached]
+        return cached
@@ -0,0 +1,248 @@
+"""
+网页缓存，把抓取到的HTML按内容哈希压缩保存到磁盘，修改选择器或清洗规则后可以直接重放，不必重新爬取
+"""
+import os
+import gzip
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from typing import Optional, Iterator, Tuple
+
+from config.settings import (PAGE_CACHE_DIR, PAGE_CACHE_TTL_DAYS, PAGE_CACHE_MAX_MB, PAGE_CACHE_COMPRESSION)
+from utils.helpers import normalize_url
+
+logger = logging.getLogger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # 未安装zstandard时只能使用gzip
+    zstandard = None
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+# 压缩格式对应的文件后缀，读取时按后缀解压，切换压缩格式后旧文件仍可读取
+SUFFIXES = {COMPRESSION_GZIP: ".html.gz", COMPRESSION_ZSTD: ".html.zst"}
+
+
+class PageCache:
+    """
+    网页缓存
+
+    HTML按内容的SHA-256保存为压缩文件，内容相同的页面只保存一份；SQLite索引记录每次抓取的
+    标准化URL、抓取时间和内容哈希，同一URL的多个版本都会保留。超过ttl_days的记录在启动时和
+    写入一定次数后清除，总大小超过max_mb时从最早的记录开始清除。
+    """
+
+    # 每写入多少个页面检查一次过期和总大小
+    EVICT_INTERVAL = 200
+
+    def __init__(self, cache_dir: str = PAGE_CACHE_DIR, ttl_days: float = PAGE_CACHE_TTL_DAYS,
+                 max_mb: float = PAGE_CACHE_MAX_MB, compression: str = PAGE_CACHE_COMPRESSION,
+                 replay: bool = False):
+        """
+        初始化网页缓存
+
+        Args:
+            cache_dir: 缓存目录
+            ttl_days: 页面保留天数
+            max_mb: 缓存总大小上限（MB，按压缩后计算）
+            compression: 压缩格式，gzip或zstd，zstd需要安装zstandard
+            replay: 是否为重放模式，重放模式下爬虫只从缓存读取页面，不访问网络
+        """
+        if compression == COMPRESSION_ZSTD and zstandard is None:
+            logger.warning("未安装zstandard，网页缓存改用gzip压缩")
+            compression = COMPRESSION_GZIP
+        if compression not in SUFFIXES:
+            raise ValueError(f"不支持的压缩格式: {compression}")
+
+        self.cache_dir = cache_dir
+        self.ttl = ttl_days * 24 * 3600
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.compression = compression
+        self.replay = replay
+        self._puts = 0
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(cache_dir, "index.db"), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            "url TEXT NOT NULL, "
+            "fetched_at REAL NOT NULL, "
+            "hash TEXT NOT NULL, "
+            "PRIMARY KEY (url, fetched_at))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages (fetched_at)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS blobs ("
+            "hash TEXT PRIMARY KEY, "
+            "file_name TEXT NOT NULL, "
+            "size INTEGER NOT NULL)"
+        )
+        self._conn.commit()
+        # 重放模式只读取缓存，不清除过期页面，否则较早的抓取结果无法重放
+        if not replay:
+            self.evict()
+        logger.info(f"网页缓存初始化成功: {cache_dir}{'（重放模式）' if replay else ''}")
+
+    def put(self, url: str, html: str, fetched_at: float = None):
+        """
+        保存抓取到的页面
+
+        Args:
+            url: 页面URL
+            html: 页面HTML内容
+            fetched_at: 抓取时间戳，默认为当前时间
+        """
+        data = html.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        fetched_at = fetched_at or time.time()
+
+        evict = False
+        with self._lock:
+            exists = self._conn.execute("SELECT 1 FROM blobs WHERE hash = ?", (content_hash,)).fetchone()
+            if exists:
+                evict = self._add_page(url, fetched_at, content_hash)
+        if not exists:
+            # 压缩和写文件不持有锁，同一内容被并发写入时结果相同
+            file_name = self._write_blob(content_hash, data)
+            size = os.path.getsize(os.path.join(self.cache_dir, file_name))
+            with self._lock:
+                self._conn.execute("INSERT OR REPLACE INTO blobs (hash, file_name, size) VALUES (?, ?, ?)",
+                                   (content_hash, file_name, size))
+                evict = self._add_page(url, fetched_at, content_hash)
+        if evict:
+            self.evict()
+
+    def get(self, url: str, before: float = None) -> Optional[str]:
+        """
+        读取页面最近一次抓取的内容
+
+        Args:
+            url: 页面URL
+            before: 只读取该时间戳之前抓取的版本，None表示最新版本
+
+        Returns:
+            页面HTML内容，没有缓存时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT blobs.file_name FROM pages JOIN blobs ON pages.hash = blobs.hash "
+                "WHERE pages.url = ? AND pages.fetched_at <= ? ORDER BY pages.fetched_at DESC LIMIT 1",
+                (normalize_url(url), before if before is not None else float("inf"))
+            ).fetchone()
+        return self._read_blob(row[0]) if row else None
+
+    def iter_pages(self, since: float = None, until: float = None,
+                   latest_only: bool = True) -> Iterator[Tuple[str, float, str]]:
+        """
+        按抓取时间顺序遍历缓存的页面
+
+        Args:
+            since: 起始时间戳，None表示不限
+            until: 结束时间戳，None表示不限
+            latest_only: 同一URL只返回时间范围内最新的版本
+
+        Yields:
+            (标准化URL, 抓取时间戳, HTML内容)
+        """
+        query = ("SELECT pages.url, MAX(pages.fetched_at), blobs.file_name" if latest_only
+                 else "SELECT pages.url, pages.fetched_at, blobs.file_name")
+        query += " FROM pages JOIN blobs ON pages.hash = blobs.hash WHERE pages.fetched_at BETWEEN ? AND ?"
+        if latest_only:
+            query += " GROUP BY pages.url"
+        query += " ORDER BY 2"
+        with self._lock:
+            rows = self._conn.execute(
+                query, (since if since is not None else 0, until if until is not None else float("inf"))
+            ).fetchall()
+
+        for url, fetched_at, file_name in rows:
+            html = self._read_blob(file_name)
+            if html is not None:
+                yield url, fetched_at, html
+
+    def evict(self):
+        """清除过期的记录，总大小超过上限时从最早的记录开始清除，并删除不再被引用的文件"""
+        with self._lock:
+            expired = self._conn.execute("DELETE FROM pages WHERE fetched_at < ?",
+                                         (time.time() - self.ttl,)).rowcount
+            removed = self._remove_orphans()
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            while total > self.max_bytes:
+                # 按批清除最早的记录，直到总大小不超过上限
+                deleted = self._conn.execute(
+                    "DELETE FROM pages WHERE rowid IN (SELECT rowid FROM pages ORDER BY fetched_at LIMIT 100)"
+                ).rowcount
+                if not deleted:
+                    break
+                expired += deleted
+                removed += self._remove_orphans()
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+            self._conn.commit()
+
+        if expired:
+            logger.info(f"网页缓存清除了 {expired} 条记录和 {removed} 个文件，当前大小 {total / 1024 / 1024:.1f} MB")
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def _add_page(self, url: str, fetched_at: float, content_hash: str) -> bool:
+        """记录一次抓取，返回是否需要检查过期和总大小，调用方需持有锁"""
+        self._conn.execute("INSERT OR REPLACE INTO pages (url, fetched_at, hash) VALUES (?, ?, ?)",
+                           (normalize_url(url), fetched_at, content_hash))
+        self._conn.commit()
+        self._puts += 1
+        return self._puts % self.EVICT_INTERVAL == 0
+
+    def _remove_orphans(self) -> int:
+        """删除不再被任何记录引用的文件，调用方需持有锁"""
+        orphans = self._conn.execute(
+            "SELECT hash, file_name FROM blobs WHERE hash NOT IN (SELECT hash FROM pages)"
+        ).fetchall()
+        for content_hash, file_name in orphans:
+            try:
+                os.remove(os.path.join(self.cache_dir, file_name))
+            except FileNotFoundError:
+                pass
+            self._conn.execute("DELETE FROM blobs WHERE hash = ?", (content_hash,))
+        return len(orphans)
+
+    def _write_blob(self, content_hash: str, data: bytes) -> str:
+        """压缩写入内容文件，返回相对缓存目录的文件名"""
+        file_name = os.path.join(content_hash[:2], content_hash + SUFFIXES[self.compression])
+        path = os.path.join(self.cache_dir, file_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        if self.compression == COMPRESSION_ZSTD:
+            compressed = zstandard.ZstdCompressor().compress(data)
+        else:
+            compressed = gzip.compress(data, compresslevel=6)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(compressed)
+        os.replace(tmp_path, path)
+        return file_name
+
+    def _read_blob(self, file_name: str) -> Optional[str]:
+        """读取并解压内容文件"""
+        path = os.path.join(self.cache_dir, file_name)
+        try:
+            with open(path, 'rb') as f:
+                compressed = f.read()
+            if file_name.endswith(SUFFIXES[COMPRESSION_ZSTD]):
+                if zstandard is None:
+                    logger.warning(f"读取缓存页面需要安装zstandard - {file_name}")
+                    return None
+                data = zstandard.ZstdDecompressor().decompress(compressed)
+            else:
+                data = gzip.decompress(compressed)
+            return data.decode("utf-8")
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            logger.warning(f"读取缓存页面失败 - {file_name}: {e}")
+            return None
@@ -0,0 +1,48 @@
+"""
+主页状态记录，保存各站点主页的ETag、Last-Modified和链接列表哈希，用于判断主页是否变化
+"""
+from typing import Dict, Any
+
+from config.settings import FRONT_PAGE_STATE_PATH
+from utils.json_store import JsonStore
+
+
+class FrontPageStateStore(JsonStore):
+    """主页状态记录，保存在JSON文件中，多个爬虫共享"""
+
+    DESCRIPTION = "主页状态记录"
+
+    def __init__(self, file_path: str = FRONT_PAGE_STATE_PATH):
+        """
+        初始化主页状态记录
+
+        Args:
+            file_path: 记录文件路径
+        """
+        super().__init__(file_path)
+
+    def get(self, url: str) -> Dict[str, Any]:
+        """
+        获取主页上一次完整处理时的状态
+
+        Args:
+            url: 主页URL
+
+        Returns:
+            状态字典，可能包含etag、last_modified和links_hash，没有记录时为空字典
+        """
+        with self._lock:
+            return dict(self._data.get(url, {}))
+
+    def update(self, url: str, state: Dict[str, Any]):
+        """
+        记录主页的最新状态，只应在主页上的新链接全部处理完后调用
+
+        Args:
+            url: 主页URL
+            state: 状态字典
+        """
+        with self._lock:
+            self._data[url] = {key: value for key, value in state.items() if value}
+            self._mark_dirty()
+        self._save_if_due()
@@ -0,0 +1,263 @@
+"""
+限速器，按主机的令牌桶控制爬取频率
+"""
+import time
+import asyncio
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from config.settings import (CRAWL_DELAY, CRAWLER_HEADERS, RATE_LIMIT_BURST,
+                             RESPECT_ROBOTS_CRAWL_DELAY, HTTP_TIMEOUT)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """令牌桶，以rate个/秒的速度补充令牌，最多积攒capacity个"""
+
+    def __init__(self, rate: float, capacity: int = 1):
+        """
+        初始化令牌桶
+
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 令牌桶容量，即允许的突发请求数
+        """
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        # 令牌数对应的时间点，预约的请求可能使其位于未来
+        self.updated = time.monotonic()
+
+    def reserve(self, now: float) -> float:
+        """
+        预约一个令牌
+
+        Args:
+            now: 当前时间（time.monotonic）
+
+        Returns:
+            需要等待的秒数
+        """
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+        self.tokens -= 1
+        ready_at = self.updated + max(0.0, -self.tokens) / self.rate
+        return max(0.0, ready_at - now)
+
+    def block_until(self, until: float):
+        """
+        在指定时间之前不再发放令牌
+
+        Args:
+            until: 恢复发放的时间（time.monotonic）
+        """
+        if until > self.updated:
+            self.updated = until
+            self.tokens = 1.0
+
+
+class HostRateLimiter:
+    """按主机限速器，每个主机一个令牌桶，只有要求限速的主机才会被放慢"""
+
+    def __init__(self, delay: float = CRAWL_DELAY, burst: int = RATE_LIMIT_BURST,
+                 respect_robots: bool = RESPECT_ROBOTS_CRAWL_DELAY):
+        """
+        初始化限速器
+
+        Args:
+            delay: 默认的同一主机两次请求之间的平均间隔（秒）
+            burst: 默认允许的突发请求数
+            respect_robots: 是否遵守robots.txt中的Crawl-delay
+        """
+        self.delay = delay
+        self.burst = burst
+        self.respect_robots = respect_robots
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._host_limits: Dict[str, Tuple[float, int]] = {}
+        self._robots_delays: Dict[str, Optional[float]] = {}
+        # 正在下载robots.txt的主机，同一主机的其他线程等待下载完成后再预约令牌
+        self._robots_loading: Dict[str, threading.Event] = {}
+
+    def configure_site(self, site_config: Dict[str, Any]):
+        """
+        按站点配置中的rate_limit设置站点主机的限速，例如 {"delay": 5} 或 {"rate": 2, "burst": 4}
+
+        Args:
+            site_config: 站点配置信息
+        """
+        rate_limit = site_config.get("rate_limit")
+        if not rate_limit:
+            return
+
+        delay = rate_limit.get("delay")
+        rate = rate_limit.get("rate") or (1.0 / delay if delay else None)
+        self.configure_host(site_config["url"], rate=rate, burst=rate_limit.get("burst"))
+
+    def configure_host(self, url: str, rate: float = None, burst: int = None):
+        """
+        设置单个主机的限速
+
+        Args:
+            url: 主机名或该主机下的任意URL
+            rate: 每秒允许的请求数，None表示使用默认值
+            burst: 允许的突发请求数，None表示使用默认值
+        """
+        host = self._get_host(url)
+        with self._lock:
+            self._host_limits[host] = (rate or self._default_rate(), burst or self.burst)
+            self._apply_limits(host)
+        logger.info(f"设置主机限速 - {host}: {self._host_limits[host][0]:.3f} 次/秒")
+
+    def defer(self, url: str, retry_after: str = None):
+        """
+        按服务器返回的Retry-After暂停对该主机的请求
+
+        Args:
+            url: 触发限流的URL
+            retry_after: Retry-After响应头，秒数或HTTP日期，缺省时暂停一个默认间隔
+        """
+        seconds = self._parse_retry_after(retry_after)
+        if seconds is None:
+            seconds = self.delay
+        host = self._get_host(url)
+
+        with self._lock:
+            self._get_bucket(host).block_until(time.monotonic() + seconds)
+        logger.warning(f"主机要求限流，暂停 {seconds:.1f} 秒 - {host}")
+
+    def reserve(self, url: str) -> float:
+        """
+        为一次请求预约令牌
+
+        Args:
+            url: 即将请求的URL
+
+        Returns:
+            需要等待的秒数
+        """
+        host = self._get_host(url)
+        if self.respect_robots and host not in self._robots_delays:
+            self._load_robots(url, host)
+
+        with self._lock:
+            return self._get_bucket(host).reserve(time.monotonic())
+
+    def acquire(self, url: str):
+        """
+        阻塞直到允许向该URL所在主机发起请求
+
+        Args:
+            url: 即将请求的URL
+        """
+        wait_time = self.reserve(url)
+        if wait_time > 0:
+            logger.debug(f"限速等待 {wait_time:.2f} 秒 - {self._get_host(url)}")
+            time.sleep(wait_time)
+
+    async def aacquire(self, url: str):
+        """
+        acquire的异步版本，等待期间不阻塞事件循环
+
+        Args:
+            url: 即将请求的URL
+        """
+        if self.respect_robots and self._get_host(url) not in self._robots_delays:
+            # 首次访问主机需要下载robots.txt，放到线程池中执行
+            loop = asyncio.get_running_loop()
+            wait_time = await loop.run_in_executor(None, self.reserve, url)
+        else:
+            wait_time = self.reserve(url)
+
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+
+    def _default_rate(self) -> float:
+        return 1.0 / self.delay if self.delay > 0 else float("inf")
+
+    def _get_bucket(self, host: str) -> TokenBucket:
+        """获取主机的令牌桶，调用方需持有锁"""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(self._default_rate(), self.burst)
+            self._buckets[host] = bucket
+            self._apply_limits(host)
+        return bucket
+
+    def _apply_limits(self, host: str):
+        """按站点配置和robots.txt计算主机的实际速率，取较严格者，调用方需持有锁"""
+        rate, burst = self._host_limits.get(host, (self._default_rate(), self.burst))
+        robots_delay = self._robots_delays.get(host)
+        if robots_delay:
+            rate = min(rate, 1.0 / robots_delay)
+
+        bucket = self._buckets.get(host)
+        if bucket:
+            bucket.rate = rate
+            bucket.capacity = max(1, burst)
+            bucket.tokens = min(bucket.tokens, bucket.capacity)
+
+    def _load_robots(self, url: str, host: str):
+        """读取主机robots.txt中的Crawl-delay，每个主机只读取一次，其他线程等待读取完成"""
+        with self._lock:
+            if host in self._robots_delays:
+                return
+            loading = self._robots_loading.get(host)
+            if loading is None:
+                self._robots_loading[host] = threading.Event()
+        if loading is not None:
+            loading.wait()
+            return
+
+        crawl_delay = None
+        try:
+            crawl_delay = self._fetch_crawl_delay(url)
+        finally:
+            with self._lock:
+                self._robots_delays[host] = float(crawl_delay) if crawl_delay else None
+                self._apply_limits(host)
+                self._robots_loading.pop(host).set()
+        if crawl_delay:
+            logger.info(f"遵守robots.txt的Crawl-delay: {crawl_delay} 秒 - {host}")
+
+    @staticmethod
+    def _fetch_crawl_delay(url: str) -> Optional[float]:
+        """下载URL所在主机的robots.txt，返回其中的Crawl-delay，没有或下载失败时返回None"""
+        parsed = urlparse(url)
+        robots_url = f"{parsed.scheme}://{parsed.netloc}/robots.txt"
+        try:
+            response = requests.get(robots_url, headers=CRAWLER_HEADERS, timeout=HTTP_TIMEOUT)
+            if response.status_code == 200:
+                parser = RobotFileParser()
+                parser.parse(response.text.splitlines())
+                return parser.crawl_delay(CRAWLER_HEADERS.get("User-Agent", "*"))
+        except Exception as e:
+            logger.debug(f"读取robots.txt失败 - {robots_url}: {e}")
+        return None
+
+    @staticmethod
+    def _get_host(url: str) -> str:
+        return urlparse(url).netloc or url
+
+    @staticmethod
+    def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """解析Retry-After，支持秒数和HTTP日期两种格式"""
+        if not value:
+            return None
+        value = value.strip()
+        if value.isdigit():
+            return float(value)
+        try:
+            retry_at = parsedate_to_datetime(value)
+            return max(0.0, retry_at.timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
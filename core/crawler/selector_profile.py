@@ -0,0 +1,87 @@
+"""
+正文选择器档案，按主机记录提取正文成功的选择器，下次优先尝试
+"""
+import logging
+from datetime import datetime
+from typing import Optional
+
+from config.settings import SELECTOR_PROFILE_PATH, SELECTOR_PROFILE_MAX_MISSES
+from utils.json_store import JsonStore
+
+logger = logging.getLogger(__name__)
+
+# 表示使用文本密度评分而不是CSS选择器
+DENSITY_SELECTOR = "@density"
+
+
+class SelectorProfileStore(JsonStore):
+    """正文选择器档案，保存在JSON文件中，多个爬虫共享"""
+
+    DESCRIPTION = "正文选择器档案"
+
+    def __init__(self, file_path: str = SELECTOR_PROFILE_PATH,
+                 max_misses: int = SELECTOR_PROFILE_MAX_MISSES):
+        """
+        初始化选择器档案
+
+        Args:
+            file_path: 档案文件路径
+            max_misses: 学到的选择器连续失败多少次后作废
+        """
+        super().__init__(file_path)
+        self.max_misses = max_misses
+
+    def get(self, host: str) -> Optional[str]:
+        """
+        获取主机学到的正文选择器
+
+        Args:
+            host: 主机名
+
+        Returns:
+            选择器，DENSITY_SELECTOR表示使用文本密度评分，None表示还没有学到
+        """
+        with self._lock:
+            profile = self._data.get(host)
+            return profile["selector"] if profile else None
+
+    def record_success(self, host: str, selector: str):
+        """
+        记录一次提取成功，已学到其他选择器时保留原选择器，直到它连续失败max_misses次被作废
+
+        Args:
+            host: 主机名
+            selector: 成功的选择器
+        """
+        with self._lock:
+            profile = self._data.get(host)
+            if profile and profile["selector"] != selector:
+                return
+            if profile:
+                profile["hits"] += 1
+                profile["misses"] = 0
+            else:
+                logger.info(f"学到正文选择器 - {host}: {selector}")
+                profile = {"selector": selector, "hits": 1, "misses": 0}
+                self._data[host] = profile
+            profile["updated_at"] = datetime.now().isoformat()
+            self._mark_dirty()
+        self._save_if_due()
+
+    def record_miss(self, host: str):
+        """
+        记录学到的选择器一次提取失败，连续失败过多时作废
+
+        Args:
+            host: 主机名
+        """
+        with self._lock:
+            profile = self._data.get(host)
+            if not profile:
+                return
+            profile["misses"] += 1
+            if profile["misses"] >= self.max_misses:
+                logger.info(f"正文选择器连续失败 {profile['misses']} 次，重新学习 - {host}: {profile['selector']}")
+                del self._data[host]
+            self._mark_dirty()
+        self._save_if_due()
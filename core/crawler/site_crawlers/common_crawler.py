@@ -2,22 +2,40 @@
 通用爬虫，适用于大部分网站的爬取
 """
 import logging
-from typing import List, Dict, Any
-from urllib.parse import urljoin
+from typing import List, Dict, Optional
+from urllib.parse import urljoin, urlparse
 
 from bs4 import BeautifulSoup
 
+from core.crawler import html_extractor
 from core.crawler.base_crawler import BaseCrawler
+from core.crawler.selector_profile import DENSITY_SELECTOR
+from config.settings import SELECTOR_PROFILE_MIN_TEXT
 
 logger = logging.getLogger(__name__)
 
 
+# 未配置内容选择器时按优先级尝试的常用选择器
+COMMON_CONTENT_SELECTORS = [
+    "article", ".article", ".article-content", ".content",
+    "#content", ".post-content", ".entry-content", ".news-content"
+]
+
+
 class CommonCrawler(BaseCrawler):
     """通用爬虫实现，适用于大部分标准网站布局"""
 
-    def __init__(self, site_config):
-        super().__init__(site_config)
+    def __init__(self, site_config, **kwargs):
+        super().__init__(site_config, **kwargs)
         self.article_selector = site_config.get("article_selector", {})
+        self._fallback_matchers = [html_extractor.compile_simple_selector(selector)
+                                   for selector in COMMON_CONTENT_SELECTORS]
+
+    def get_links_selector(self) -> Optional[str]:
+        return self.article_selector.get("list") or self.article_selector.get("link") or None
+
+    def get_content_selector(self) -> Optional[str]:
+        return self.article_selector.get("content") or None
 
     def extract_news_links(self, soup: BeautifulSoup) -> List[Dict[str, str]]:
         """
@@ -84,6 +102,142 @@ class CommonCrawler(BaseCrawler):
         logger.info(f"提取到 {len(news_links)} 个新闻链接 - {self.name}")
         return news_links
 
+    def extract_news_links_fast(self, html: str) -> Optional[List[Dict[str, str]]]:
+        """
+        使用lxml和编译缓存的选择器提取新闻链接，逻辑与extract_news_links相同
+
+        Args:
+            html: 主页HTML内容
+
+        Returns:
+            新闻链接列表，或None（如果需要回退到BeautifulSoup）
+        """
+        if not html_extractor.is_available():
+            return None
+
+        try:
+            root = html_extractor.parse_document(html)
+            if root is None:
+                return None
+
+            news_links = []
+            list_selector = self.article_selector.get("list", "")
+            title_selector = self.article_selector.get("title", "")
+            link_selector = self.article_selector.get("link", "")
+
+            if not list_selector:
+                logger.info(f"使用直接链接选择器 - {self.name}")
+                link_elements = self.selectors.select(root, link_selector, include_root=True) if link_selector else []
+                for link in link_elements:
+                    self._append_link(news_links, html_extractor.element_text(link, strip=False).strip(),
+                                      link.get('href', ''))
+            else:
+                logger.info(f"使用列表选择器 - {self.name}")
+                for item in self.selectors.select(root, list_selector, include_root=True):
+                    title_element = self.selectors.select_one(item, title_selector) if title_selector else None
+                    title = html_extractor.element_text(title_element, strip=False).strip() \
+                        if title_element is not None else ""
+
+                    if link_selector:
+                        link_element = self.selectors.select_one(item, link_selector)
+                    else:
+                        link_element = title_element
+                    url = link_element.get('href', '') if link_element is not None else ''
+
+                    self._append_link(news_links, title, url)
+
+            logger.info(f"提取到 {len(news_links)} 个新闻链接 - {self.name}")
+            return news_links
+
+        except Exception as e:
+            logger.debug(f"lxml提取链接失败，改用BeautifulSoup - {self.name}: {e}")
+            return None
+
+    def _append_link(self, news_links: List[Dict[str, str]], title: str, url: str):
+        """补全相对URL，标题和链接都不为空时加入结果"""
+        if url and not url.startswith(('http://', 'https://')):
+            url = urljoin(self.url, url)
+        if url and title:
+            news_links.append({
+                'title': title,
+                'url': url
+            })
+
+    def extract_content_fast(self, html: str, url: str = None) -> Optional[str]:
+        """
+        使用lxml和编译缓存的选择器提取正文；配置的内容选择器未匹配时返回空字符串，与extract_content一致。
+        未配置内容选择器时依次尝试：该主机学到的选择器、常用选择器、文本密度评分，最后取body文本
+
+        Args:
+            html: 文章页HTML内容
+            url: 文章页URL，用于按主机记录学到的选择器
+
+        Returns:
+            新闻内容，或None（如果需要回退）
+        """
+        if not html_extractor.is_available():
+            return None
+
+        content_selector = self.article_selector.get("content", "")
+        try:
+            root = html_extractor.parse_document(html)
+            if root is None:
+                return None
+
+            if content_selector:
+                # 未匹配时BeautifulSoup同样找不到，不再回退重新解析
+                element = self.selectors.select_one(root, content_selector, include_root=True)
+                if element is None:
+                    logger.warning(f"未找到内容元素 - {self.name}")
+                    return ""
+                return html_extractor.element_text(element)
+
+            host = urlparse(url or self.url).netloc
+            learned = self.selector_profiles.get(host) if self.selector_profiles else None
+            if learned:
+                content = self._extract_with_learned(root, learned)
+                if len(content) >= SELECTOR_PROFILE_MIN_TEXT:
+                    self.selector_profiles.record_success(host, learned)
+                    return content
+                self.selector_profiles.record_miss(host)
+
+            # 常用选择器一次遍历按优先级探测
+            content_element, priority = html_extractor.find_first_by_priority(root, self._fallback_matchers)
+            if content_element is not None:
+                content = html_extractor.element_text(content_element)
+                self._learn(host, COMMON_CONTENT_SELECTORS[priority], content)
+                return content
+
+            # 按文本密度找正文，避免把导航等无关内容交给AI
+            content_element = html_extractor.find_densest_element(root)
+            if content_element is not None:
+                content = html_extractor.element_text(content_element)
+                self._learn(host, DENSITY_SELECTOR, content)
+                return content
+
+            # 如果以上都没找到，返回body的内容，并截取一部分
+            body = root.find('body')
+            if body is None:
+                return None
+            return html_extractor.element_text(body)[:2000]  # 限制长度
+
+        except Exception as e:
+            logger.debug(f"lxml提取正文失败，改用BeautifulSoup - {self.name}: {e}")
+            return None
+
+    def _extract_with_learned(self, root, selector: str) -> str:
+        """用学到的选择器提取正文，未匹配时返回空字符串"""
+        if selector == DENSITY_SELECTOR:
+            element = html_extractor.find_densest_element(root)
+        else:
+            element = self.selectors.select_one(root, selector, include_root=True)
+        return html_extractor.element_text(element) if element is not None else ""
+
+    def _learn(self, host: str, selector: str, content: str):
+        """提取的正文足够长时记住该主机的选择器，已学到的选择器作废前不会被替换"""
+        if self.selector_profiles and len(content) >= SELECTOR_PROFILE_MIN_TEXT:
+            self.selector_profiles.record_success(host, selector)
+
     def extract_content(self, soup: BeautifulSoup) -> str:
         """
         提取新闻内容
@@ -98,12 +252,7 @@ class CommonCrawler(BaseCrawler):
 
         if not content_selector:
             # 如果没有指定内容选择器，尝试一些常用的选择器
-            common_selectors = [
-                "article", ".article", ".article-content", ".content",
-                "#content", ".post-content", ".entry-content", ".news-content"
-            ]
-
-            for selector in common_selectors:
+            for selector in COMMON_CONTENT_SELECTORS:
                 content_element = soup.select_one(selector)
                 if content_element:
                     return content_element.get_text(strip=True)
@@ -0,0 +1,110 @@
+"""
+内容清理器，预编译清理规则，对正文做线性时间的单次扫描
+"""
+import re
+import logging
+from typing import Dict, Any, List, Optional
+
+from utils.helpers import clean_text
+
+logger = logging.getLogger(__name__)
+
+# 出现后从该处截断到行尾的关键词（正则片段）
+DEFAULT_TRUNCATE_PATTERNS = [
+    r"相关[推荐|阅读]",
+    r"本文来源",
+    r"原标题",
+    r"编辑",
+    r"记者",
+    r"点击查看",
+]
+
+# 出现后删除整行的关键词
+DEFAULT_DROP_LINE_KEYWORDS = [
+    "版权声明",
+    "版权所有",
+    "责任编辑",
+    "文章来源",
+]
+
+MAX_CONTENT_LENGTH = 5000
+
+
+class ContentCleaner:
+    """
+    内容清理器
+
+    所有规则在初始化时合并为两个交替正则：截断规则取行内最早的匹配位置截断，
+    删行规则在截断后的行内出现即删除整行。每行只扫描两遍，耗时与文本长度成线性关系。
+    """
+
+    def __init__(self, truncate_patterns: List[str] = None, drop_line_keywords: List[str] = None,
+                 max_length: int = MAX_CONTENT_LENGTH):
+        """
+        初始化内容清理器
+
+        Args:
+            truncate_patterns: 截断规则（正则片段），默认使用DEFAULT_TRUNCATE_PATTERNS
+            drop_line_keywords: 删行关键词，默认使用DEFAULT_DROP_LINE_KEYWORDS
+            max_length: 清理后内容的最大长度
+        """
+        truncate_patterns = DEFAULT_TRUNCATE_PATTERNS if truncate_patterns is None else truncate_patterns
+        drop_line_keywords = DEFAULT_DROP_LINE_KEYWORDS if drop_line_keywords is None else drop_line_keywords
+
+        self.max_length = max_length
+        self._truncate_re = self._compile(truncate_patterns)
+        self._drop_line_re = self._compile([re.escape(keyword) for keyword in drop_line_keywords])
+
+    @classmethod
+    def from_site_config(cls, site_config: Dict[str, Any]) -> "ContentCleaner":
+        """
+        按站点配置创建清理器，custom_rules中的truncate_keywords和drop_line_keywords追加到默认规则之后
+
+        Args:
+            site_config: 站点配置信息
+
+        Returns:
+            内容清理器
+        """
+        custom_rules = site_config.get("custom_rules") or {}
+        truncate_patterns = DEFAULT_TRUNCATE_PATTERNS + [
+            re.escape(keyword) for keyword in custom_rules.get("truncate_keywords", [])
+        ]
+        drop_line_keywords = DEFAULT_DROP_LINE_KEYWORDS + list(custom_rules.get("drop_line_keywords", []))
+        return cls(truncate_patterns, drop_line_keywords)
+
+    def clean(self, content: str) -> str:
+        """
+        清理内容，去除广告、导航等无关内容
+
+        Args:
+            content: 原始内容
+
+        Returns:
+            清理后的内容
+        """
+        # 清理基本的HTML标签和空白字符
+        content = clean_text(content)
+
+        lines = []
+        for line in content.split("\n"):
+            if self._truncate_re:
+                match = self._truncate_re.search(line)
+                if match:
+                    line = line[:match.start()]
+            if self._drop_line_re and self._drop_line_re.search(line):
+                line = ""
+            lines.append(line)
+        content = "\n".join(lines)
+
+        # 限制内容长度
+        if len(content) > self.max_length:
+            content = content[:self.max_length] + "..."
+
+        return content.strip()
+
+    @staticmethod
+    def _compile(patterns: List[str]) -> Optional["re.Pattern"]:
+        if not patterns:
+            return None
+        return re.compile("|".join(f"(?:{pattern})" for pattern in patterns))
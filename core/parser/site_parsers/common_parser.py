@@ -2,13 +2,11 @@
 通用解析器，适用于大部分网站的内容解析
 """
 import logging
-import re
 from typing import Dict, Any, Optional
 
-from bs4 import BeautifulSoup
-
 from core.parser.base_parser import BaseParser
-from utils.helpers import clean_text
+from core.parser.content_cleaner import ContentCleaner
+from utils.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +17,8 @@ class CommonParser(BaseParser):
     def __init__(self, site_config):
         super().__init__(site_config)
         self.article_selector = site_config.get("article_selector", {})
+        # 清理规则每个解析器只编译一次
+        self.cleaner = ContentCleaner.from_site_config(site_config)
 
     def parse(self, raw_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
@@ -70,28 +70,5 @@ class CommonParser(BaseParser):
         Returns:
             清理后的内容
         """
-        # 清理基本的HTML标签和空白字符
-        content = clean_text(content)
-
-        # 移除常见的广告和无关文本
-        patterns_to_remove = [
-            r"相关[推荐|阅读].*?(?=\n|$)",
-            r"本文来源.*?(?=\n|$)",
-            r"原标题.*?(?=\n|$)",
-            r"编辑.*?(?=\n|$)",
-            r"记者.*?(?=\n|$)",
-            r"点击查看.*?(?=\n|$)",
-            r".*?版权声明.*?(?=\n|$)",
-            r".*?版权所有.*?(?=\n|$)",
-            r".*?责任编辑.*?(?=\n|$)",
-            r".*?文章来源.*?(?=\n|$)"
-        ]
-
-        for pattern in patterns_to_remove:
-            content = re.sub(pattern, "", content)
-
-        # 限制内容长度
-        if len(content) > 5000:
-            content = content[:5000] + "..."
-
-        return content.strip()
\ No newline at end of file
+        with metrics.timer("clean", site=self.name):
+            return self.cleaner.clean(content)
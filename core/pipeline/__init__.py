@@ -0,0 +1,3 @@
+"""
+流水线模块，负责编排爬取、解析、摘要和存储的并发执行
+"""
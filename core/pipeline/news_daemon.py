@@ -0,0 +1,167 @@
+"""
+常驻调度器，复用同一条流水线，按站点各自的间隔反复爬取
+"""
+import time
+import signal
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Set
+
+from config.settings import DAEMON_DEFAULT_INTERVAL, DAEMON_REPORT_INTERVAL, SITE_WORKERS
+from core.pipeline.news_pipeline import NewsPipeline
+from core.pipeline.refresh_policy import AdaptiveRefreshPolicy
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class NewsDaemon:
+    """
+    常驻调度器
+
+    浏览器池、HTTP会话、摘要缓存和已抓取URL索引都保存在流水线中，在各次运行之间保持可用。
+    每个站点独立调度，初始间隔为refresh_interval，之后由AdaptiveRefreshPolicy按主页新链接比例调整；
+    同一站点上一次运行未结束时不会再次启动，慢站点也不会推迟其他站点。
+    同时运行的站点不超过max_workers，到期的站点在有空闲线程时才提交；
+    收到SIGTERM或SIGINT后不再启动新的运行，等待进行中的站点完成后退出。
+    """
+
+    def __init__(self, pipeline: NewsPipeline, sites: List[Dict[str, Any]],
+                 default_interval: float = DAEMON_DEFAULT_INTERVAL, max_workers: int = SITE_WORKERS,
+                 report_interval: float = DAEMON_REPORT_INTERVAL,
+                 refresh_policy: AdaptiveRefreshPolicy = None):
+        """
+        初始化调度器
+
+        Args:
+            pipeline: 新闻处理流水线
+            sites: 站点配置列表，站点可用refresh_interval（秒）设置自己的初始爬取间隔
+            default_interval: 未配置refresh_interval的站点的初始爬取间隔（秒）
+            max_workers: 同时运行的站点数
+            report_interval: 输出运行报告的间隔（秒）
+            refresh_policy: 爬取间隔策略，默认按default_interval创建
+        """
+        self.pipeline = pipeline
+        self.sites = {site["name"]: site for site in sites}
+        self.default_interval = default_interval
+        self.max_workers = max(1, max_workers)
+        self.report_interval = report_interval
+        self._owns_refresh_policy = refresh_policy is None
+        self.refresh_policy = refresh_policy or AdaptiveRefreshPolicy(default_interval)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        # 站点运行结束或收到停止信号时唤醒调度循环
+        self._wakeup = threading.Event()
+        now = time.monotonic()
+        self._next_run: Dict[str, float] = {name: now for name in self.sites}
+        self._running: Set[str] = set()
+        self._last_report = now
+
+    def run_forever(self):
+        """运行调度循环，直到stop()被调用或收到退出信号"""
+        self._install_signal_handlers()
+        logger.info(f"调度器启动 - 站点数: {len(self.sites)}, 同时运行: {self.max_workers}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="site") as executor:
+            while not self._stop.is_set():
+                # 先清除再计算等待时间，之后的唤醒不会丢失
+                self._wakeup.clear()
+                for site_config in self._take_due_sites():
+                    executor.submit(self._run_site, site_config)
+
+                if time.monotonic() - self._last_report >= self.report_interval:
+                    self._write_report()
+
+                self._wakeup.wait(self._seconds_until_next())
+
+            logger.info("调度器停止，等待进行中的站点完成")
+
+        self._write_report()
+        if self._owns_refresh_policy:
+            self.refresh_policy.close()
+        logger.info("调度器已退出")
+
+    def stop(self):
+        """请求停止，进行中的站点会继续完成"""
+        self._stop.set()
+        self._wakeup.set()
+
+    def get_interval(self, site_config: Dict[str, Any]) -> float:
+        """
+        获取站点的爬取间隔
+
+        Args:
+            site_config: 站点配置信息
+
+        Returns:
+            爬取间隔（秒）
+        """
+        return self.refresh_policy.get_interval(site_config)
+
+    def _take_due_sites(self) -> List[Dict[str, Any]]:
+        """
+        取出已到期且不在运行中的站点，并标记为运行中
+
+        最多取出空闲线程数个站点，提交的站点都能立即开始运行，收到退出信号时不会有排队的站点
+        """
+        now = time.monotonic()
+        with self._lock:
+            free = self.max_workers - len(self._running)
+            due = sorted((next_run, name) for name, next_run in self._next_run.items()
+                         if next_run <= now and name not in self._running)
+            due = [name for _, name in due[:max(0, free)]]
+            self._running.update(due)
+        return [self.sites[name] for name in due]
+
+    def _seconds_until_next(self) -> float:
+        """距离下一个站点到期或下一次输出报告的秒数，没有空闲线程时只等站点结束或输出报告"""
+        now = time.monotonic()
+        with self._lock:
+            if len(self._running) >= self.max_workers:
+                waiting = []
+            else:
+                waiting = [next_run for name, next_run in self._next_run.items() if name not in self._running]
+        deadlines = waiting + [self._last_report + self.report_interval]
+        return max(0.0, min(deadlines) - now)
+
+    def _run_site(self, site_config: Dict[str, Any]):
+        """运行单个站点，结束后按间隔安排下一次运行"""
+        name = site_config["name"]
+        start = time.monotonic()
+        try:
+            self.pipeline.run([site_config])
+            stats = self.pipeline.site_stats.get(name, {})
+            self.refresh_policy.update(site_config, stats.get("link_urls"), stats.get("unchanged", False))
+        except Exception as e:
+            logger.error(f"站点运行出错 - {name}: {e}")
+        finally:
+            elapsed = time.monotonic() - start
+            interval = self.get_interval(site_config)
+            if elapsed > interval:
+                logger.warning(f"站点运行耗时 {elapsed:.0f} 秒，超过爬取间隔 {interval:.0f} 秒 - {name}")
+
+            with self._lock:
+                self._running.discard(name)
+                self._next_run[name] = start + interval
+            logger.info(f"站点下次运行在 {max(0.0, start + interval - time.monotonic()):.0f} 秒后 - {name}")
+            self._wakeup.set()
+
+    def _write_report(self):
+        """输出自上次报告以来的运行指标"""
+        metrics.write_report()
+        metrics.reset()
+        self._last_report = time.monotonic()
+
+    def _install_signal_handlers(self):
+        """收到SIGTERM或SIGINT时停止调度，只能在主线程中安装"""
+        if threading.current_thread() is not threading.main_thread():
+            return
+
+        def handle_signal(signum, frame):
+            logger.info(f"收到信号 {signal.Signals(signum).name}，准备退出")
+            self.stop()
+
+        signal.signal(signal.SIGTERM, handle_signal)
+        signal.signal(signal.SIGINT, handle_signal)
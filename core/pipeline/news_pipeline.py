@@ -0,0 +1,370 @@
+"""
+新闻处理流水线，多站点并发爬取，文章流式进入解析、摘要和存储
+"""
+import os
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Any, List, Tuple
+
+import requests
+
+from config.settings import (SITE_WORKERS, SUMMARY_WORKERS, SEEN_INDEX_ENABLED, NEAR_DUP_ENABLED,
+                             WORK_QUEUE_ENABLED, PAGE_CACHE_ENABLED, SELECTOR_PROFILE_PATH, FRONT_PAGE_STATE_PATH,
+                             NEAR_DUP_INDEX_PATH)
+from core.ai.base_ai import BaseAI
+from core.crawler.crawler_factory import CrawlerFactory
+from core.crawler.driver_pool import DriverPool
+from core.crawler.http_client import create_http_session
+from core.crawler.link_triage import LinkTriage
+from core.crawler.page_cache import PageCache
+from core.crawler.page_state import FrontPageStateStore
+from core.crawler.rate_limiter import HostRateLimiter
+from core.crawler.selector_profile import SelectorProfileStore
+from core.parser.base_parser import BaseParser
+from core.parser.parser_factory import ParserFactory
+from core.pipeline.summary_batcher import SummaryBatcher
+from core.pipeline.work_queue import (WorkQueue, STAGE_FETCHED, STAGE_PARSED, STAGE_SUMMARIZED, STAGE_SAVED,
+                                      STAGE_FAILED)
+from core.storage.base_storage import BaseStorage
+from core.storage.near_duplicate_index import NearDuplicateIndex
+from core.storage.seen_url_index import SeenUrlIndex
+from utils.helpers import normalize_url, get_content_hash
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def replay_path(path: str, replay_dir: str = None, copy: bool = False) -> str:
+    """
+    重放模式下把正式数据文件的路径换到重放目录中，重放不会改动正式数据
+
+    Args:
+        path: 正式数据文件路径
+        replay_dir: 重放目录，None表示不是重放模式
+        copy: 重放目录中还没有该文件时是否先复制一份正式文件
+
+    Returns:
+        实际使用的文件路径
+    """
+    if not replay_dir:
+        return path
+    target = os.path.join(replay_dir, os.path.basename(path))
+    os.makedirs(replay_dir, exist_ok=True)
+    if copy and os.path.exists(path) and not os.path.exists(target):
+        shutil.copyfile(path, target)
+    return target
+
+
+class NewsPipeline:
+    """新闻处理流水线，站点由有界线程池并发爬取，爬到的文章立即交给摘要线程池处理"""
+
+    def __init__(self, storage: BaseStorage, ai_service: BaseAI,
+                 site_workers: int = SITE_WORKERS, summary_workers: int = SUMMARY_WORKERS,
+                 rate_limiter: HostRateLimiter = None, driver_pool: DriverPool = None,
+                 seen_index: SeenUrlIndex = None, selector_profiles: SelectorProfileStore = None,
+                 page_state: FrontPageStateStore = None, duplicate_index: NearDuplicateIndex = None,
+                 work_queue: WorkQueue = None, page_cache: PageCache = None, replay_dir: str = None):
+        """
+        初始化流水线
+
+        Args:
+            storage: 存储实例
+            ai_service: AI服务实例
+            site_workers: 同时爬取的站点数
+            summary_workers: 同时进行摘要和存储的文章数
+            rate_limiter: 按主机限速器，所有爬虫共享
+            driver_pool: WebDriver池，未指定时由流水线创建并在close()时关闭
+            seen_index: 已抓取URL索引，未指定且启用增量爬取时由流水线创建
+            selector_profiles: 正文选择器档案，未指定时由流水线创建
+            page_state: 主页状态记录，未指定时由流水线创建
+            duplicate_index: 近似重复索引，未指定且启用近似重复检测时由流水线创建
+            work_queue: 持久化工作队列，未指定且启用工作队列时由流水线创建
+            page_cache: 网页缓存，未指定且启用网页缓存或重放模式时由流水线创建
+            replay_dir: 重放目录，设置后为重放模式：只从网页缓存读取页面，不使用已抓取URL索引和工作队列，
+                流水线创建的近似重复索引、正文选择器档案和主页状态记录放在该目录中，
+                选择器档案从正式档案复制；存储由调用方指向该目录
+
+        由调用方传入的索引和记录不会在close()时关闭
+        """
+        self.storage = storage
+        self.ai_service = ai_service
+        self.site_workers = max(1, site_workers)
+        self.summary_workers = max(1, summary_workers)
+        self.rate_limiter = rate_limiter or HostRateLimiter()
+        self._owns_driver_pool = driver_pool is None
+        self.driver_pool = driver_pool or DriverPool(size=self.site_workers)
+        self.replay_dir = replay_dir
+        self._owns_page_cache = page_cache is None and (PAGE_CACHE_ENABLED or bool(replay_dir))
+        self.page_cache = page_cache or (PageCache(replay=bool(replay_dir)) if self._owns_page_cache else None)
+        self.replay = bool(self.page_cache and self.page_cache.replay)
+        self._owns_seen_index = seen_index is None and SEEN_INDEX_ENABLED and not self.replay
+        self.seen_index = None if self.replay else \
+            seen_index or (SeenUrlIndex() if self._owns_seen_index else None)
+        self._owns_selector_profiles = selector_profiles is None
+        self.selector_profiles = selector_profiles or \
+            SelectorProfileStore(replay_path(SELECTOR_PROFILE_PATH, replay_dir, copy=True))
+        self._owns_page_state = page_state is None
+        self.page_state = page_state or FrontPageStateStore(replay_path(FRONT_PAGE_STATE_PATH, replay_dir))
+        self._owns_duplicate_index = duplicate_index is None and NEAR_DUP_ENABLED
+        self.duplicate_index = duplicate_index or \
+            (NearDuplicateIndex(replay_path(NEAR_DUP_INDEX_PATH, replay_dir)) if NEAR_DUP_ENABLED else None)
+        self.link_triage = LinkTriage(ai_service)
+        # 各摘要线程的文章汇总后交给ai_service.asummarize_many
+        self.summarizer = SummaryBatcher(ai_service)
+        self._owns_work_queue = work_queue is None and WORK_QUEUE_ENABLED and not self.replay
+        self.work_queue = None if self.replay else \
+            work_queue or (WorkQueue() if self._owns_work_queue else None)
+        # 每个站点一个HTTP会话，在多次运行之间保持长连接
+        self._sessions: Dict[str, requests.Session] = {}
+        self._sessions_lock = threading.Lock()
+
+        # 限制已爬取但尚未处理的文章数量，避免摘要跟不上时积压过多
+        self._backlog = threading.BoundedSemaphore(self.summary_workers * 2)
+        self._stats_lock = threading.Lock()
+        # 等待规范文章保存的近似重复文章，按规范URL分组
+        self._waiting: Dict[str, List[Tuple[Dict[str, Any], BaseParser]]] = {}
+        self._waiting_lock = threading.Lock()
+        # 每个站点最近一次爬取的统计，见BaseCrawler.stats
+        self.site_stats: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, sites: List[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        并发处理所有站点，可以在多个线程中同时调用，各次调用处理的站点不应重复
+
+        Args:
+            sites: 站点配置列表
+
+        Returns:
+            每个站点成功保存的文章数
+        """
+        saved = {site["name"]: 0 for site in sites}
+        logger.info(f"流水线启动 - 站点数: {len(sites)}, 爬取并发: {self.site_workers}, "
+                    f"摘要并发: {self.summary_workers}")
+
+        with ThreadPoolExecutor(max_workers=self.summary_workers,
+                                thread_name_prefix="summary") as summary_pool:
+            with ThreadPoolExecutor(max_workers=self.site_workers,
+                                    thread_name_prefix="crawl") as crawl_pool:
+                futures = [crawl_pool.submit(self._crawl_site, site_config, summary_pool, saved)
+                           for site_config in sites]
+                wait(futures)
+
+        logger.info(f"流水线完成 - 共保存 {sum(saved.values())} 条新闻")
+        return saved
+
+    def close(self):
+        """释放流水线持有的资源"""
+        self.summarizer.close()
+        if self._owns_driver_pool:
+            self.driver_pool.close()
+
+        if self._owns_seen_index:
+            self.seen_index.close()
+
+        if self._owns_selector_profiles:
+            self.selector_profiles.close()
+        if self._owns_page_state:
+            self.page_state.close()
+        if self._owns_duplicate_index:
+            self.duplicate_index.close()
+        if self._owns_work_queue:
+            self.work_queue.close()
+        if self._owns_page_cache:
+            self.page_cache.close()
+
+        with self._sessions_lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+    def _get_session(self, site_name: str) -> requests.Session:
+        """获取站点对应的HTTP会话，不存在时创建"""
+        with self._sessions_lock:
+            if site_name not in self._sessions:
+                self._sessions[site_name] = create_http_session()
+            return self._sessions[site_name]
+
+    def _crawl_site(self, site_config: Dict[str, Any], summary_pool: ThreadPoolExecutor,
+                    saved: Dict[str, int]):
+        """
+        爬取单个站点，每篇文章爬完即提交给摘要线程池
+
+        Args:
+            site_config: 站点配置信息
+            summary_pool: 摘要线程池
+            saved: 本次运行各站点保存的文章数
+        """
+        logger.info(f"开始处理站点: {site_config['name']}")
+        with self._stats_lock:
+            self.site_stats.pop(site_config['name'], None)
+
+        try:
+            crawler = CrawlerFactory.create_crawler(site_config, rate_limiter=self.rate_limiter,
+                                                    driver_pool=self.driver_pool,
+                                                    session=self._get_session(site_config['name']),
+                                                    seen_index=self.seen_index,
+                                                    selector_profiles=self.selector_profiles,
+                                                    page_state=self.page_state,
+                                                    link_triage=self.link_triage,
+                                                    work_queue=self.work_queue,
+                                                    page_cache=self.page_cache)
+            parser = ParserFactory.create_parser(site_config)
+
+            # 先处理上次运行中断时已抓取但没有存储的文章，从各自完成的阶段继续
+            pending = self.work_queue.pending_items(site_config['name']) if self.work_queue else []
+            if pending:
+                logger.info(f"继续处理上次未完成的 {len(pending)} 篇文章 - {site_config['name']}")
+            for stage, item in pending:
+                self._submit(summary_pool, item, parser, saved, stage)
+
+            for news in crawler.iter_crawl():
+                self._submit(summary_pool, news, parser, saved, STAGE_FETCHED)
+
+            with self._stats_lock:
+                self.site_stats[site_config['name']] = dict(crawler.stats)
+        except Exception as e:
+            logger.error(f"处理站点出错 - {site_config['name']}: {e}")
+
+    def _submit(self, summary_pool: ThreadPoolExecutor, item: Dict[str, Any], parser: BaseParser,
+                saved: Dict[str, int], stage: str):
+        """把文章提交给摘要线程池，积压过多时阻塞"""
+        self._backlog.acquire()
+        try:
+            summary_pool.submit(self._process_news, item, parser, saved, stage)
+        except Exception:
+            self._backlog.release()
+            raise
+
+    def _checkpoint(self, site: str, stage: str, item: Dict[str, Any]):
+        """记录文章完成的阶段"""
+        if self.work_queue:
+            self.work_queue.update(site, stage, item)
+
+    def _process_news(self, news: Dict[str, Any], parser: BaseParser, saved: Dict[str, int],
+                      stage: str = STAGE_FETCHED):
+        """
+        解析、摘要并存储单篇新闻，从已完成的阶段之后继续
+
+        Args:
+            news: 已完成阶段的结果，fetched为爬取的新闻，parsed和summarized为解析结果
+            parser: 站点对应的解析器
+            saved: 本次运行各站点保存的文章数
+            stage: 已完成的阶段
+        """
+        try:
+            self._handle_news(news, parser, saved, stage)
+        finally:
+            self._backlog.release()
+
+    def _handle_news(self, news: Dict[str, Any], parser: BaseParser, saved: Dict[str, int], stage: str):
+        """处理单篇新闻，参数见_process_news"""
+        site = parser.name
+        # 本文作为新的规范文章加入了近似重复索引，结束时需要确认或移除
+        is_canonical = False
+        success = False
+        try:
+            if stage == STAGE_FETCHED:
+                with metrics.timer("parse", site=site):
+                    parsed = parser.parse(news)
+                if not parsed:
+                    metrics.incr("parse_failures", site=site)
+                    self._checkpoint(site, STAGE_FAILED, news)
+                    return
+                self._checkpoint(site, STAGE_PARSED, parsed)
+            else:
+                parsed = news
+
+            if stage != STAGE_SUMMARIZED:
+                # 近似重复的文章不再摘要，只记录其指向的规范文章
+                if self.duplicate_index and not self._check_duplicate(parsed, parser, saved):
+                    return
+                is_canonical = self.duplicate_index is not None
+
+                # 使用AI进行内容摘要
+                with metrics.timer("summarize", site=site, provider=self.ai_service.name):
+                    summary = self.summarizer.summarize(parsed['title'], parsed['content'])
+
+                if not summary:
+                    metrics.incr("summarize_failures", site=site, provider=self.ai_service.name)
+                    if self.work_queue:
+                        self.work_queue.record_failure(parsed['url'], "摘要失败")
+                    return
+                parsed['summary'] = summary
+                self._checkpoint(site, STAGE_SUMMARIZED, parsed)
+
+            # 存储摘要
+            with metrics.timer("save", site=site):
+                stored = self.storage.save(parsed)
+            if stored:
+                metrics.incr("articles_saved", site=site)
+                self._mark_saved(site, parsed, saved)
+                success = True
+            else:
+                metrics.incr("save_failures", site=site)
+                if self.work_queue:
+                    self.work_queue.record_failure(parsed['url'], "存储失败")
+        except Exception as e:
+            logger.error(f"处理新闻失败 - {news.get('title', '')}: {e}")
+            if self.work_queue:
+                self.work_queue.record_failure(news['url'], str(e))
+        finally:
+            if is_canonical:
+                self._resolve_canonical(parsed['url'], success, saved)
+
+    def _check_duplicate(self, parsed: Dict[str, Any], parser: BaseParser, saved: Dict[str, int]) -> bool:
+        """
+        近似重复判断，重复文章指向已保存的规范文章，规范文章尚未保存时暂存到它处理完
+
+        Returns:
+            是否需要继续摘要（本文成为新的规范文章）
+        """
+        while True:
+            canonical_url = self.duplicate_index.check_and_add(parsed['url'], parsed['content'])
+            if not canonical_url:
+                return True
+            with self._waiting_lock:
+                if self.duplicate_index.is_pending(canonical_url):
+                    logger.info(f"近似重复文章，等待规范文章保存 {canonical_url} - {parsed['title']}")
+                    self._waiting.setdefault(canonical_url, []).append((parsed, parser))
+                    return False
+                confirmed = canonical_url in self.duplicate_index
+            if confirmed:
+                self._link_duplicate(canonical_url, parsed, parser.name, saved)
+                return False
+            # 规范文章在判重之后处理失败，整个簇已被移除，重新判重
+
+    def _resolve_canonical(self, url: str, success: bool, saved: Dict[str, int]):
+        """规范文章处理结束：成功时确认并记录等待中的重复文章，失败时移除整个簇并重新处理这些文章"""
+        url = normalize_url(url)
+        with self._waiting_lock:
+            if success:
+                self.duplicate_index.confirm(url)
+            else:
+                # 规范文章没有摘要，让之后的重复文章成为新的规范文章
+                self.duplicate_index.discard(url)
+            waiting = self._waiting.pop(url, [])
+
+        for item, parser in waiting:
+            if success:
+                self._link_duplicate(url, item, parser.name, saved)
+            else:
+                self._handle_news(item, parser, saved, STAGE_PARSED)
+
+    def _link_duplicate(self, canonical_url: str, item: Dict[str, Any], site: str, saved: Dict[str, int]):
+        """把近似重复的文章记录为指向规范文章"""
+        logger.info(f"近似重复文章，归入 {canonical_url} - {item['title']}")
+        metrics.incr("near_duplicates", site=site)
+        if self.storage.link_duplicate(canonical_url, item):
+            self._mark_saved(site, item, saved)
+        elif self.work_queue:
+            self.work_queue.record_failure(item['url'], "存储失败")
+
+    def _mark_saved(self, site: str, item: Dict[str, Any], saved: Dict[str, int]):
+        """记录文章已保存，保存之后才加入已抓取索引，处理失败的文章下次仍会抓取"""
+        self._checkpoint(site, STAGE_SAVED, item)
+        if self.seen_index:
+            self.seen_index.add(item['url'], get_content_hash(item.get('content', '')))
+        with self._stats_lock:
+            saved[item['source']] = saved.get(item['source'], 0) + 1
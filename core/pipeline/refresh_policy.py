@@ -0,0 +1,115 @@
+"""
+自适应爬取间隔，按站点主页上新链接的比例估计其更新频率并调整爬取间隔
+"""
+import logging
+from typing import Dict, Any, List, Optional
+
+from config.settings import (DAEMON_DEFAULT_INTERVAL, ADAPTIVE_REFRESH_ENABLED, REFRESH_MIN_INTERVAL,
+                             REFRESH_MAX_INTERVAL, REFRESH_TARGET_NEW_RATIO, REFRESH_STATE_PATH)
+from utils.json_store import JsonStore
+
+logger = logging.getLogger(__name__)
+
+
+class AdaptiveRefreshPolicy(JsonStore):
+    """
+    自适应爬取间隔
+
+    每次爬取后比较主页链接与上一次的差异，得到新链接比例并做指数平滑。比例高于目标说明站点更新快，
+    间隔按比例缩短；低于目标说明大部分爬取都是白跑，间隔按比例延长。每次最多缩短一半或延长一倍，
+    结果限制在站点的最短和最长间隔之间。学到的间隔、平滑后的比例和上一次的链接保存在JSON文件中，重启后继续使用。
+    """
+
+    DESCRIPTION = "爬取间隔记录"
+
+    # 新链接比例的平滑系数，越大越看重最近一次爬取
+    SMOOTHING = 0.5
+    # 单次调整的最大倍数
+    MAX_STEP = 2.0
+
+    def __init__(self, default_interval: float = DAEMON_DEFAULT_INTERVAL,
+                 min_interval: float = REFRESH_MIN_INTERVAL, max_interval: float = REFRESH_MAX_INTERVAL,
+                 target_ratio: float = REFRESH_TARGET_NEW_RATIO, enabled: bool = ADAPTIVE_REFRESH_ENABLED,
+                 file_path: str = REFRESH_STATE_PATH):
+        """
+        初始化自适应爬取间隔
+
+        Args:
+            default_interval: 未配置refresh_interval的站点的初始爬取间隔（秒）
+            min_interval: 默认的最短爬取间隔（秒）
+            max_interval: 默认的最长爬取间隔（秒）
+            target_ratio: 期望每次爬取时新链接所占的比例
+            enabled: 是否启用自适应调整，关闭时始终使用配置的间隔
+            file_path: 记录文件路径
+        """
+        super().__init__(file_path)
+        self.default_interval = default_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.target_ratio = target_ratio
+        self.enabled = enabled
+
+    def get_interval(self, site_config: Dict[str, Any]) -> float:
+        """
+        获取站点当前的爬取间隔
+
+        Args:
+            site_config: 站点配置信息
+
+        Returns:
+            爬取间隔（秒）
+        """
+        with self._lock:
+            interval = self._data.get(site_config["name"], {}).get("interval")
+        return interval if interval is not None else site_config.get("refresh_interval", self.default_interval)
+
+    def update(self, site_config: Dict[str, Any], link_urls: Optional[List[str]],
+               unchanged: bool = False) -> float:
+        """
+        根据本次爬取到的主页链接调整站点的爬取间隔
+
+        Args:
+            site_config: 站点配置信息
+            link_urls: 本次主页上的链接，None表示主页获取失败或未变化
+            unchanged: 主页是否未变化，未变化时新链接比例为0
+
+        Returns:
+            调整后的爬取间隔（秒）
+        """
+        interval = self.get_interval(site_config)
+        if not self.enabled or not (link_urls or unchanged):
+            return interval
+
+        name = site_config["name"]
+        with self._lock:
+            state = self._data.setdefault(name, {})
+            previous = state.get("links")
+            if unchanged:
+                new_ratio = 0.0
+            else:
+                current = set(link_urls)
+                state["links"] = sorted(current)
+                self._mark_dirty()
+                # 第一次爬取没有可比较的链接
+                new_ratio = None if previous is None else len(current - set(previous)) / len(current)
+
+            if new_ratio is not None:
+                smoothed = state.get("new_ratio", new_ratio)
+                smoothed = self.SMOOTHING * new_ratio + (1 - self.SMOOTHING) * smoothed
+                state["new_ratio"] = smoothed
+
+                factor = self.target_ratio / max(smoothed, 1e-3)
+                factor = min(self.MAX_STEP, max(1 / self.MAX_STEP, factor))
+                min_interval = site_config.get("min_refresh_interval", self.min_interval)
+                max_interval = site_config.get("max_refresh_interval", self.max_interval)
+                new_interval = min(max_interval, max(min_interval, interval * factor))
+                state["interval"] = new_interval
+                self._mark_dirty()
+        self._save_if_due()
+
+        if new_ratio is None:
+            return interval
+        if abs(new_interval - interval) >= 1:
+            logger.info(f"调整爬取间隔 - {name}: 新链接比例 {new_ratio:.0%}（平滑后 {smoothed:.0%}），"
+                        f"{interval:.0f} -> {new_interval:.0f} 秒")
+        return new_interval
@@ -0,0 +1,226 @@
+"""
+离线重新处理，不爬取网站，对网页缓存中的页面或已存储的文章重新执行解析、清洗、摘要和存储
+"""
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional, Iterator, Iterable
+from urllib.parse import urlparse
+
+from config.settings import SUMMARY_CONCURRENCY
+from core.ai.base_ai import BaseAI
+from core.crawler.base_crawler import BaseCrawler
+from core.crawler.crawler_factory import CrawlerFactory
+from core.crawler.link_triage import LISTING_URL_RE
+from core.crawler.page_cache import PageCache
+from core.parser.base_parser import BaseParser
+from core.parser.parser_factory import ParserFactory
+from core.storage.base_storage import BaseStorage
+from utils.helpers import normalize_url
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+INPUT_CACHE = "cache"
+INPUT_OUTPUT = "output"
+
+# 工作进程内按站点复用的爬虫和解析器，只用于提取正文，不会访问网络
+_crawlers: Dict[str, BaseCrawler] = {}
+_parsers: Dict[str, BaseParser] = {}
+_sites: Dict[str, Dict[str, Any]] = {}
+_page_cache: Optional[PageCache] = None
+
+
+def _init_worker(sites: List[Dict[str, Any]], cache_dir: Optional[str]):
+    """工作进程初始化，记录站点配置，打开重放模式的网页缓存供爬虫读取页面"""
+    global _page_cache
+    _sites.update({site["name"]: site for site in sites})
+    if cache_dir:
+        _page_cache = PageCache(cache_dir, replay=True)
+
+
+def parse_item(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    在工作进程中解析单篇文章，来自网页缓存的文章先按站点规则提取正文
+
+    Args:
+        item: 文章，包含title、url和source，以及content或html
+
+    Returns:
+        解析结果或None（如果解析失败）
+    """
+    site_config = _sites.get(item["source"])
+    if site_config is None:
+        return None
+
+    try:
+        if "html" in item:
+            crawler = _crawlers.get(item["source"])
+            if crawler is None:
+                crawler = _crawlers[item["source"]] = CrawlerFactory.create_crawler(site_config,
+                                                                                    page_cache=_page_cache)
+            html = item.pop("html")
+            if not item.get("title"):
+                item["title"] = _extract_title(crawler, html)
+            item["content"] = crawler.extract_article_content(html, item["url"])
+
+        parser = _parsers.get(item["source"])
+        if parser is None:
+            parser = _parsers[item["source"]] = ParserFactory.create_parser(site_config)
+        return parser.parse(item)
+    except Exception as e:
+        logger.error(f"重新解析失败 - {item.get('url')}: {e}")
+        return None
+
+
+def _extract_title(crawler: BaseCrawler, html: str) -> str:
+    """缓存页面没有对应的链接标题时，从页面的h1或title中取标题"""
+    soup = crawler.parse_html(html)
+    for tag in (soup.find("h1"), soup.title):
+        if tag and tag.get_text(strip=True):
+            return tag.get_text(strip=True)
+    return ""
+
+
+class Reprocessor:
+    """
+    离线重新处理
+
+    输入可以是网页缓存中的文章页，也可以是存储中已有的文章。解析和清洗在进程池中进行，
+    可以用满所有CPU；摘要按批并发请求AI，同时进行的请求数有上限。摘要缓存按内容和提示词版本
+    命中，只改了解析规则而正文没有变化的文章不会重新请求AI。
+    """
+
+    def __init__(self, sites: List[Dict[str, Any]], ai_service: BaseAI, storage: BaseStorage,
+                 workers: int = None, concurrency: int = SUMMARY_CONCURRENCY, batch_size: int = 200,
+                 cache_dir: str = None):
+        """
+        初始化重新处理
+
+        Args:
+            sites: 站点配置列表，只处理属于这些站点的文章
+            ai_service: AI服务实例
+            storage: 输出存储实例
+            workers: 解析进程数，默认为CPU核数
+            concurrency: 同时进行的AI请求数
+            batch_size: 每批解析和摘要的文章数
+            cache_dir: 网页缓存目录，设置后解析进程中的爬虫以重放模式使用该缓存，不会访问网络
+        """
+        self.sites = sites
+        self.ai_service = ai_service
+        self.storage = storage
+        self.workers = workers or os.cpu_count() or 1
+        self.concurrency = concurrency
+        self.batch_size = max(1, batch_size)
+        self.cache_dir = cache_dir
+
+    def run(self, items: Iterable[Dict[str, Any]]) -> Dict[str, int]:
+        """
+        重新处理文章
+
+        Args:
+            items: 待处理的文章，见load_from_cache和load_from_storage
+
+        Returns:
+            处理统计，包含total、parsed、summarized和saved
+        """
+        stats = {"total": 0, "parsed": 0, "summarized": 0, "saved": 0}
+        logger.info(f"重新处理启动 - 解析进程: {self.workers}, AI并发: {self.concurrency}")
+
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.sites, self.cache_dir)) as pool:
+            for batch in self._batches(items):
+                stats["total"] += len(batch)
+                with metrics.timer("reprocess_parse"):
+                    parsed = [item for item in pool.map(parse_item, batch, chunksize=8) if item]
+                stats["parsed"] += len(parsed)
+
+                with metrics.timer("summarize_many", provider=self.ai_service.name):
+                    summaries = self.ai_service.summarize_many(parsed, concurrency=self.concurrency)
+                summarized = []
+                for item, summary in zip(parsed, summaries):
+                    if summary:
+                        item['summary'] = summary
+                        summarized.append(item)
+                stats["summarized"] += len(summarized)
+
+                with metrics.timer("save"):
+                    stored = self.storage.save_many(summarized)
+                stats["saved"] += stored
+                metrics.incr("articles_saved", stored)
+                logger.info(f"重新处理进度 - 已处理 {stats['total']} 篇，已保存 {stats['saved']} 篇")
+
+        logger.info(f"重新处理完成 - 共 {stats['total']} 篇，解析成功 {stats['parsed']} 篇，"
+                    f"摘要成功 {stats['summarized']} 篇，保存 {stats['saved']} 篇")
+        return stats
+
+    def load_from_storage(self, storage: BaseStorage, date: str = None) -> Iterator[Dict[str, Any]]:
+        """
+        读取存储中已有的文章，近似重复记录和没有正文的记录不再处理，同一URL只保留最后一条
+
+        Args:
+            storage: 输入存储实例
+            date: 只读取该日期（YYYY-MM-DD）保存的文章，None表示全部
+
+        Yields:
+            待处理的文章
+        """
+        latest: Dict[str, Dict[str, Any]] = {}
+        for site_config in self.sites:
+            query = {"source": site_config["name"]}
+            if date:
+                query["date"] = date
+            for item in storage.load(query):
+                if item.get("content") and item.get("url") and not item.get("duplicate_of"):
+                    latest[normalize_url(item["url"])] = item
+
+        for item in latest.values():
+            yield {key: item[key] for key in ("title", "url", "content", "source")}
+
+    def load_from_cache(self, page_cache: PageCache, date: str = None,
+                        titles: Dict[str, str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        读取网页缓存中的文章页，主页和栏目页不处理，同一URL只取时间范围内最新的版本
+
+        Args:
+            page_cache: 网页缓存
+            date: 只读取该日期（YYYY-MM-DD）抓取的页面，None表示全部
+            titles: 标准化URL到链接标题的映射，没有标题的页面从页面内容中提取
+
+        Yields:
+            待处理的文章，正文尚未提取
+        """
+        since = until = None
+        if date:
+            day = datetime.strptime(date.replace("-", ""), "%Y%m%d")
+            since, until = day.timestamp(), (day + timedelta(days=1)).timestamp()
+
+        # 按站点主页所在目录的最长前缀确定页面所属站点，同一主机上的多个站点也能区分
+        prefixes = sorted(((self._site_prefix(site_config["url"]), site_config["name"]) for site_config in self.sites),
+                          key=lambda prefix: -len(prefix[0]))
+        home_pages = {normalize_url(site_config["url"]) for site_config in self.sites}
+
+        titles = titles or {}
+        for url, _, html in page_cache.iter_pages(since, until):
+            source = next((name for prefix, name in prefixes if url.startswith(prefix)), None)
+            path = urlparse(url).path or "/"
+            if not source or url in home_pages or LISTING_URL_RE.match(path):
+                continue
+            yield {"title": titles.get(url, ""), "url": url, "html": html, "source": source}
+
+    @staticmethod
+    def _site_prefix(url: str) -> str:
+        """站点主页所在目录的URL，例如 https://example.com/news/index.html 对应 https://example.com/news/"""
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}{parsed.path.rsplit('/', 1)[0]}/"
+
+    def _batches(self, items: Iterable[Dict[str, Any]]) -> Iterator[List[Dict[str, Any]]]:
+        batch = []
+        for item in items:
+            batch.append(item)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
@@ -0,0 +1,121 @@
+"""
+摘要汇总器，流水线各摘要线程提交的文章在同一个事件循环中汇总后交给asummarize_many，
+使并发上限、批量模式以及异步的超时和重试在流水线中同样生效
+"""
+import asyncio
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Set, Tuple
+
+from config.settings import SUMMARY_CONCURRENCY, SUMMARY_BATCH_SIZE, SUMMARY_BATCH_WINDOW
+from core.ai.base_ai import BaseAI
+
+logger = logging.getLogger(__name__)
+
+
+class SummaryBatcher:
+    """在后台事件循环中汇总摘要请求，summarize可以在多个线程中同时调用"""
+
+    def __init__(self, ai_service: BaseAI, concurrency: int = SUMMARY_CONCURRENCY,
+                 window: float = None):
+        """
+        初始化摘要汇总器
+
+        Args:
+            ai_service: AI服务
+            concurrency: 同时进行摘要的最大文章数，也是每次汇总的最大文章数
+            window: 收到第一篇文章后等待更多文章的最长时间（秒），默认只在批量模式下等待
+        """
+        self.ai_service = ai_service
+        self.concurrency = max(1, concurrency)
+        self.window = window if window is not None else \
+            (SUMMARY_BATCH_WINDOW if SUMMARY_BATCH_SIZE > 1 else 0)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="summary-loop", daemon=True)
+        self._thread.start()
+        self._closed = False
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._collector: Optional[asyncio.Task] = None
+        # 进行中的摘要任务，保持引用避免被垃圾回收
+        self._batches: Set[asyncio.Task] = set()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+    def summarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        """
+        提交一篇文章并等待摘要结果
+
+        Args:
+            title: 新闻标题
+            content: 新闻内容
+
+        Returns:
+            摘要信息，包含title和content，或None（如果摘要失败）
+        """
+        if self._closed:
+            raise RuntimeError("摘要汇总器已关闭")
+        future: Future = Future()
+        self._loop.call_soon_threadsafe(self._queue.put_nowait,
+                                        ({"title": title, "content": content}, future))
+        return future.result()
+
+    def close(self):
+        """停止后台事件循环，调用前应确保没有进行中的summarize"""
+        if self._closed:
+            return
+        self._closed = True
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def _start(self):
+        """在事件循环中创建队列、并发限制和汇总任务"""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._collector = asyncio.create_task(self._collect())
+
+    async def _stop(self):
+        """取消汇总任务，并等待已开始的摘要完成"""
+        self._collector.cancel()
+        await asyncio.gather(self._collector, *self._batches, return_exceptions=True)
+
+    async def _collect(self):
+        """取出待摘要的文章，窗口内到达的文章合并为一组交给asummarize_many"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.concurrency:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # 每篇文章占用一个名额，正在摘要的文章总数不超过concurrency
+            for _ in batch:
+                await self._slots.acquire()
+            task = loop.create_task(self._summarize_batch(batch))
+            self._batches.add(task)
+            task.add_done_callback(self._batches.discard)
+
+    async def _summarize_batch(self, batch: List[Tuple[Dict[str, Any], Future]]):
+        """摘要一组文章并把结果交给等待的线程"""
+        try:
+            summaries = await self.ai_service.asummarize_many([article for article, _ in batch],
+                                                              self.concurrency)
+        except Exception as e:
+            logger.error(f"批量摘要失败 - {len(batch)} 篇: {e}")
+            summaries = [None] * len(batch)
+        finally:
+            for _ in batch:
+                self._slots.release()
+
+        for (_, future), summary in zip(batch, summaries):
+            future.set_result(summary)
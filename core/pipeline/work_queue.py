@@ -0,0 +1,192 @@
+"""
+持久化工作队列，记录每篇文章处理到的阶段，运行中断后从上次完成的阶段继续
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Dict, Any, List, Optional, Iterable, Tuple
+
+from config.settings import WORK_QUEUE_PATH, WORK_QUEUE_MAX_ATTEMPTS, WORK_QUEUE_RETENTION_DAYS
+from utils.helpers import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# 文章的处理阶段，按顺序推进
+STAGE_LINK = "link"  # 已选中，等待抓取
+STAGE_FETCHED = "fetched"  # 已抓取，data为爬取的新闻
+STAGE_PARSED = "parsed"  # 已解析，data为解析结果
+STAGE_SUMMARIZED = "summarized"  # 已摘要，data为带摘要的解析结果
+STAGE_SAVED = "saved"  # 已存储（包括作为近似重复文章存储）
+STAGE_FAILED = "failed"  # 多次失败或无法解析，不再重试
+
+PENDING_STAGES = (STAGE_FETCHED, STAGE_PARSED, STAGE_SUMMARIZED)
+FINISHED_STAGES = (STAGE_SAVED, STAGE_FAILED)
+
+
+class WorkQueue:
+    """持久化工作队列，基于SQLite，每次阶段变更立即提交，进程崩溃后已完成的阶段不会丢失"""
+
+    def __init__(self, db_path: str = WORK_QUEUE_PATH, max_attempts: int = WORK_QUEUE_MAX_ATTEMPTS,
+                 retention_days: float = WORK_QUEUE_RETENTION_DAYS):
+        """
+        初始化工作队列
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_attempts: 同一篇文章最多失败几次，之后标记为failed不再重试
+            retention_days: 已完成的记录保留天数
+        """
+        self.db_path = db_path
+        self.max_attempts = max_attempts
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS work_items ("
+            "url TEXT PRIMARY KEY, "
+            "site TEXT NOT NULL, "
+            "stage TEXT NOT NULL, "
+            "title TEXT, "
+            "data TEXT, "
+            "attempts INTEGER NOT NULL DEFAULT 0, "
+            "error TEXT, "
+            "updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_work_items_site ON work_items (site, stage)")
+        self._conn.execute(
+            f"DELETE FROM work_items WHERE stage IN ({','.join('?' * len(FINISHED_STAGES))}) AND updated_at < ?",
+            (*FINISHED_STAGES, time.time() - retention_days * 24 * 3600)
+        )
+        self._conn.commit()
+        logger.info(f"工作队列初始化成功: {db_path}")
+
+    def add_links(self, site: str, links: Iterable[Dict[str, str]]):
+        """
+        记录即将抓取的链接，已有记录的链接保持原阶段
+
+        Args:
+            site: 站点名称
+            links: 链接列表，每个元素包含title和url
+        """
+        now = time.time()
+        rows = [(normalize_url(link['url']), site, STAGE_LINK, link['title'], json.dumps(link, ensure_ascii=False), now)
+                for link in links]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO work_items (url, site, stage, title, data, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+
+    def update(self, site: str, stage: str, data: Dict[str, Any]):
+        """
+        记录文章完成了某个阶段
+
+        Args:
+            site: 站点名称
+            stage: 完成的阶段
+            data: 该阶段的结果，必须包含url；已完成的阶段不再保存数据
+        """
+        payload = None if stage in FINISHED_STAGES else json.dumps(data, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO work_items (url, site, stage, title, data, attempts, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, 0, ?) "
+                "ON CONFLICT(url) DO UPDATE SET stage = excluded.stage, title = excluded.title, "
+                "data = excluded.data, error = NULL, updated_at = excluded.updated_at",
+                (normalize_url(data['url']), site, stage, data.get('title'), payload, time.time())
+            )
+            self._conn.commit()
+
+    def record_failure(self, url: str, error: str) -> bool:
+        """
+        记录文章在当前阶段处理失败，失败次数达到上限时标记为failed
+
+        Args:
+            url: 文章URL
+            error: 错误信息
+
+        Returns:
+            是否还会重试
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE work_items SET attempts = attempts + 1, error = ?, updated_at = ?, "
+                "stage = CASE WHEN attempts + 1 >= ? THEN ? ELSE stage END WHERE url = ?",
+                (error, time.time(), self.max_attempts, STAGE_FAILED, normalize_url(url))
+            )
+            row = self._conn.execute(
+                "SELECT stage FROM work_items WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+            self._conn.commit()
+
+        if row and row[0] == STAGE_FAILED:
+            logger.warning(f"文章处理失败 {self.max_attempts} 次，不再重试 - {url}: {error}")
+            return False
+        return True
+
+    def pending_links(self, site: str) -> List[Dict[str, str]]:
+        """
+        获取站点已选中但还没有抓取成功的链接
+
+        Args:
+            site: 站点名称
+
+        Returns:
+            链接列表，每个元素包含title和url
+        """
+        return [data for _, data in self._select(site, (STAGE_LINK,))]
+
+    def pending_items(self, site: str) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        获取站点已抓取但还没有存储的文章
+
+        Args:
+            site: 站点名称
+
+        Returns:
+            (已完成的阶段, 该阶段的结果) 列表
+        """
+        return self._select(site, PENDING_STAGES)
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def _select(self, site: str, stages: Tuple[str, ...]) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT stage, data FROM work_items WHERE site = ? AND stage IN ({','.join('?' * len(stages))}) "
+                f"ORDER BY updated_at", (site, *stages)
+            ).fetchall()
+
+        items = []
+        for stage, data in rows:
+            try:
+                items.append((stage, json.loads(data)))
+            except (TypeError, json.JSONDecodeError):
+                logger.warning(f"工作队列中的记录无法读取，已跳过 - {site}")
+        return items
+
+    def get_stage(self, url: str) -> Optional[str]:
+        """
+        获取文章当前的阶段
+
+        Args:
+            url: 文章URL
+
+        Returns:
+            阶段，没有记录时返回None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT stage FROM work_items WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+        return row[0] if row else None
@@ -3,7 +3,7 @@
 """
 import logging
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Iterable
 
 logger = logging.getLogger(__name__)
 
@@ -35,8 +35,35 @@ class BaseStorage(ABC):
         """
         pass
 
+    def save_many(self, items: List[Dict[str, Any]]) -> int:
+        """
+        批量保存数据，默认逐条保存，支持批量写入的存储可以覆盖
+
+        Args:
+            items: 要保存的数据列表
+
+        Returns:
+            成功保存的条数
+        """
+        return sum(1 for data in items if self.save(data))
+
+    def link_duplicate(self, canonical_url: str, data: Dict[str, Any]) -> bool:
+        """
+        保存近似重复的文章，只记录来源信息和所属的规范文章，不重复保存正文和摘要
+
+        Args:
+            canonical_url: 规范文章的URL，其摘要代表整个重复簇
+            data: 重复文章的数据
+
+        Returns:
+            保存结果
+        """
+        record = {key: data[key] for key in ("title", "url", "source") if key in data}
+        record["duplicate_of"] = canonical_url
+        return self.save(record)
+
     @abstractmethod
-    def load(self, query: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    def load(self, query: Dict[str, Any] = None) -> Iterable[Dict[str, Any]]:
         """
         加载数据
 
@@ -44,6 +71,9 @@ class BaseStorage(ABC):
             query: 查询条件
 
         Returns:
-            加载的数据列表
+            加载的数据，可以是列表或逐条产出的迭代器
         """
-        pass
\ No newline at end of file
+        pass
+
+    def close(self):
+        """释放存储占用的资源，缓冲的数据在此写入"""
\ No newline at end of file
@@ -0,0 +1,222 @@
+"""
+近似重复文章索引，用字符shingle的SimHash指纹识别不同网站对同一事件的报道
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Set, Tuple
+
+from config.settings import (NEAR_DUP_INDEX_PATH, NEAR_DUP_MAX_DISTANCE, NEAR_DUP_MAX_AGE_DAYS,
+                             NEAR_DUP_MIN_LENGTH)
+from utils.helpers import normalize_content, normalize_url
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 3
+
+
+def simhash(text: str, shingle_size: int = SHINGLE_SIZE) -> int:
+    """
+    计算文本的64位SimHash指纹，特征为去掉标点空白后的字符shingle，适合不分词的中文文本
+
+    Args:
+        text: 文本
+        shingle_size: shingle的字符数
+
+    Returns:
+        64位无符号整数指纹
+    """
+    shingles = Counter(text[i:i + shingle_size] for i in range(max(1, len(text) - shingle_size + 1)))
+    weights = [0] * FINGERPRINT_BITS
+    for shingle, count in shingles.items():
+        feature = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(FINGERPRINT_BITS):
+            if feature >> bit & 1:
+                weights[bit] += count
+            else:
+                weights[bit] -= count
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+class NearDuplicateIndex:
+    """
+    近似重复文章索引
+
+    指纹常驻内存，按分段建立倒排：汉明距离不超过max_distance的两个指纹，拆成max_distance+1段后
+    至少有一段完全相同，因此只需比较分段相同的候选。指纹和所属簇（规范URL）持久化到SQLite，
+    超过max_age_days的记录在启动时清除。
+
+    新的规范文章在confirm()之前处于待确认状态，调用方应等它保存成功后再记录簇内的重复文章；
+    规范文章处理失败时用discard()移除整个簇。上次运行中断时仍未确认的簇在启动时清除。
+    """
+
+    def __init__(self, db_path: str = NEAR_DUP_INDEX_PATH, max_distance: int = NEAR_DUP_MAX_DISTANCE,
+                 max_age_days: float = NEAR_DUP_MAX_AGE_DAYS, min_length: int = NEAR_DUP_MIN_LENGTH):
+        """
+        初始化索引
+
+        Args:
+            db_path: SQLite数据库文件路径
+            max_distance: 判定为近似重复的最大汉明距离
+            max_age_days: 指纹保留天数
+            min_length: 参与判重的最短文本长度（去掉标点空白后），过短的文本指纹不可靠
+        """
+        self.db_path = db_path
+        self.max_distance = max_distance
+        self.max_age = max_age_days * 24 * 3600
+        self.min_length = min_length
+        self._bands = max_distance + 1
+        self._band_bits = -(-FINGERPRINT_BITS // self._bands)
+
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS fingerprints ("
+            "url TEXT PRIMARY KEY, "
+            "fingerprint INTEGER NOT NULL, "
+            "canonical_url TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "confirmed INTEGER NOT NULL DEFAULT 1)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(fingerprints)")}
+        if "confirmed" not in columns:
+            self._conn.execute("ALTER TABLE fingerprints ADD COLUMN confirmed INTEGER NOT NULL DEFAULT 1")
+        self._conn.execute("DELETE FROM fingerprints WHERE created_at < ?", (time.time() - self.max_age,))
+        # 规范文章未保存成功的簇不可信，重新处理时再加入
+        self._conn.execute("DELETE FROM fingerprints WHERE canonical_url IN "
+                           "(SELECT url FROM fingerprints WHERE confirmed = 0)")
+        self._conn.commit()
+
+        self._entries: Dict[str, Tuple[int, str]] = {}
+        self._buckets: Dict[Tuple[int, int], List[str]] = {}
+        # 尚未确认的规范文章
+        self._pending: Set[str] = set()
+        for url, fingerprint, canonical_url in self._conn.execute(
+                "SELECT url, fingerprint, canonical_url FROM fingerprints"):
+            self._index(url, fingerprint & (2 ** FINGERPRINT_BITS - 1), canonical_url)
+        logger.info(f"近似重复索引初始化成功: {db_path}, 已有指纹 {len(self._entries)} 个")
+
+    def check_and_add(self, url: str, text: str) -> Optional[str]:
+        """
+        判断文章是否与已收录的文章近似重复，并把文章加入索引
+
+        Args:
+            url: 文章URL
+            text: 文章正文
+
+        Returns:
+            重复时返回所属簇的规范URL（最先收录的文章），否则返回None
+        """
+        normalized = normalize_content(text)
+        if len(normalized) < self.min_length:
+            return None
+
+        url = normalize_url(url)
+        fingerprint = simhash(normalized)
+        with self._lock:
+            existing = self._entries.get(url)
+            if existing:
+                # 同一篇文章再次处理，沿用原来的簇
+                canonical_url = existing[1]
+                return canonical_url if canonical_url != url else None
+
+            canonical_url = self._find(fingerprint)
+            self._index(url, fingerprint, canonical_url or url)
+            if not canonical_url:
+                self._pending.add(url)
+            # SQLite的INTEGER是有符号64位
+            stored = fingerprint - 2 ** FINGERPRINT_BITS if fingerprint >= 2 ** (FINGERPRINT_BITS - 1) else fingerprint
+            self._conn.execute(
+                "INSERT OR REPLACE INTO fingerprints (url, fingerprint, canonical_url, created_at, confirmed) "
+                "VALUES (?, ?, ?, ?, ?)", (url, stored, canonical_url or url, time.time(), int(bool(canonical_url)))
+            )
+            self._conn.commit()
+        return canonical_url
+
+    def is_pending(self, url: str) -> bool:
+        """
+        判断规范文章是否仍待确认
+
+        Args:
+            url: 规范文章URL
+
+        Returns:
+            是否已加入索引但尚未确认
+        """
+        with self._lock:
+            return normalize_url(url) in self._pending
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            return normalize_url(url) in self._entries
+
+    def confirm(self, url: str):
+        """
+        确认规范文章已保存，之后簇内的重复文章可以直接指向它
+
+        Args:
+            url: 规范文章URL
+        """
+        url = normalize_url(url)
+        with self._lock:
+            if url not in self._pending:
+                return
+            self._pending.discard(url)
+            self._conn.execute("UPDATE fingerprints SET confirmed = 1 WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def discard(self, url: str):
+        """
+        从索引中移除文章，用于规范文章处理失败的情况。规范文章连同簇内的重复文章一起移除，
+        之后的重复文章会成为新的规范文章
+
+        Args:
+            url: 文章URL
+        """
+        url = normalize_url(url)
+        with self._lock:
+            if url not in self._entries:
+                return
+            members = [member for member, (_, canonical_url) in self._entries.items() if canonical_url == url]
+            for member in set(members) | {url}:
+                fingerprint, _ = self._entries.pop(member)
+                for key in self._band_keys(fingerprint):
+                    bucket = self._buckets.get(key, [])
+                    if member in bucket:
+                        bucket.remove(member)
+            self._pending.discard(url)
+            self._conn.execute("DELETE FROM fingerprints WHERE url = ? OR canonical_url = ?", (url, url))
+            self._conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+    def _find(self, fingerprint: int) -> Optional[str]:
+        """查找汉明距离最近且不超过max_distance的已收录文章，返回其规范URL，调用方需持有锁"""
+        best = None
+        for key in self._band_keys(fingerprint):
+            for candidate in self._buckets.get(key, ()):
+                candidate_fingerprint, canonical_url = self._entries[candidate]
+                distance = bin(fingerprint ^ candidate_fingerprint).count("1")
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, canonical_url)
+        return best[1] if best else None
+
+    def _index(self, url: str, fingerprint: int, canonical_url: str):
+        """把指纹加入内存索引，调用方需持有锁"""
+        self._entries[url] = (fingerprint, canonical_url)
+        for key in self._band_keys(fingerprint):
+            self._buckets.setdefault(key, []).append(url)
+
+    def _band_keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        mask = (1 << self._band_bits) - 1
+        return [(band, fingerprint >> (band * self._band_bits) & mask) for band in range(self._bands)]
@@ -4,6 +4,7 @@
 import os
 import json
 import logging
+import threading
 from datetime import datetime
 from typing import Dict, Any, List
 
@@ -26,6 +27,8 @@ class FileStorage(BaseStorage):
         """
         super().__init__(config)
         self.output_dir = self.config.get("output_dir", OUTPUT_DIR)
+        # 保存是读-改-写操作，并发写同一文件时需要加锁
+        self._lock = threading.Lock()
 
         # 确保输出目录存在
         os.makedirs(self.output_dir, exist_ok=True)
@@ -49,22 +52,23 @@ class FileStorage(BaseStorage):
             # 添加时间戳
             data["saved_at"] = datetime.now().isoformat()
 
-            # 读取已有数据
-            existing_data = []
-            if os.path.exists(file_path):
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    try:
-                        existing_data = json.load(f)
-                    except json.JSONDecodeError:
-                        logger.warning(f"解析文件失败，创建新文件: {file_path}")
-                        existing_data = []
-
-            # 追加新数据
-            existing_data.append(data)
-
-            # 保存数据
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(existing_data, f, ensure_ascii=False, indent=2)
+            with self._lock:
+                # 读取已有数据
+                existing_data = []
+                if os.path.exists(file_path):
+                    with open(file_path, 'r', encoding='utf-8') as f:
+                        try:
+                            existing_data = json.load(f)
+                        except json.JSONDecodeError:
+                            logger.warning(f"解析文件失败，创建新文件: {file_path}")
+                            existing_data = []
+
+                # 追加新数据
+                existing_data.append(data)
+
+                # 保存数据
+                with open(file_path, 'w', encoding='utf-8') as f:
+                    json.dump(existing_data, f, ensure_ascii=False, indent=2)
 
             logger.info(f"数据已保存到文件: {file_path}")
             return True
@@ -0,0 +1,144 @@
+"""
+JSONL文件存储，每条数据追加为一行JSON，按来源和日期分文件
+"""
+import os
+import re
+import glob
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, List, Iterator, IO
+
+from core.storage.base_storage import BaseStorage
+from config.settings import OUTPUT_DIR, JSONL_FSYNC
+from utils.helpers import get_file_path
+
+logger = logging.getLogger(__name__)
+
+
+class JsonlStorage(BaseStorage):
+    """JSONL文件存储，只追加写入，每批数据写入文件后才返回"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        初始化JSONL存储
+
+        Args:
+            config: 存储配置信息，可包含output_dir和fsync（每批数据是否同步到磁盘）
+        """
+        super().__init__(config)
+        self.output_dir = self.config.get("output_dir", OUTPUT_DIR)
+        self.fsync = self.config.get("fsync", JSONL_FSYNC)
+
+        self._lock = threading.Lock()
+        self._files: Dict[str, IO[str]] = {}
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        logger.info(f"JSONL存储初始化成功，输出目录: {self.output_dir}")
+
+    def save(self, data: Dict[str, Any]) -> bool:
+        """
+        追加一条数据
+
+        Args:
+            data: 要保存的数据
+
+        Returns:
+            保存结果
+        """
+        return self.save_many([data]) == 1
+
+    def save_many(self, items: List[Dict[str, Any]]) -> int:
+        """
+        批量追加数据，写入的文件在返回前刷新到系统，开启fsync时同步到磁盘
+
+        Args:
+            items: 要保存的数据列表
+
+        Returns:
+            成功保存的条数
+        """
+        saved = 0
+        try:
+            with self._lock:
+                files = set()
+                for data in items:
+                    data["saved_at"] = datetime.now().isoformat()
+                    file = self._get_file(data.get("source", "unknown"))
+                    file.write(json.dumps(data, ensure_ascii=False) + "\n")
+                    files.add(file)
+                # 日期变化时前一天的文件已在_get_file中关闭
+                self._sync(file for file in files if not file.closed)
+                saved = len(items)
+
+            logger.info(f"已追加 {saved} 条数据")
+        except Exception as e:
+            logger.error(f"保存数据失败: {e}")
+        return saved
+
+    def load(self, query: Dict[str, Any] = None) -> Iterator[Dict[str, Any]]:
+        """
+        逐行读取数据，不会一次性加载整个文件
+
+        Args:
+            query: 查询条件，source和date（YYYYMMDD或YYYY-MM-DD）按文件名过滤，其余字段逐条比较
+
+        Yields:
+            符合条件的数据
+        """
+        query = dict(query or {})
+        source = query.pop("source", None)
+        date = query.pop("date", None)
+
+
+        for file_path in self._match_files(source, date):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                for line_number, line in enumerate(f, start=1):
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        item = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 进程中断时最后一行可能不完整，跳过即可
+                        logger.warning(f"跳过无法解析的行: {file_path}:{line_number}")
+                        continue
+
+                    if all(item.get(key) == value for key, value in query.items()):
+                        yield item
+
+    def close(self):
+        """关闭所有文件"""
+        with self._lock:
+            for file in self._files.values():
+                file.close()
+            self._files.clear()
+        logger.info("JSONL存储已关闭")
+
+    def _get_file(self, source: str) -> IO[str]:
+        """获取来源当天的文件句柄，调用方需持有锁"""
+        file_path = get_file_path(self.output_dir, source, file_type="jsonl")
+        file = self._files.get(file_path)
+        if file is None:
+            # 日期变化后关闭同一来源前一天的文件
+            base = file_path.rsplit("_", 1)[0]
+            for old_path in [path for path in self._files if path.rsplit("_", 1)[0] == base]:
+                self._files.pop(old_path).close()
+
+            file = open(file_path, 'a', encoding='utf-8')
+            self._files[file_path] = file
+        return file
+
+    def _sync(self, files):
+        """把文件的写入缓冲刷新到系统，开启fsync时同步到磁盘，调用方需持有锁"""
+        for file in files:
+            file.flush()
+            if self.fsync:
+                os.fsync(file.fileno())
+
+    def _match_files(self, source: str = None, date: str = None) -> List[str]:
+        """按来源和日期匹配数据文件"""
+        safe_name = re.sub(r'[^\w\-_.]', '_', source) if source else "*"
+        date_str = date.replace("-", "") if date else "*"
+        return sorted(glob.glob(os.path.join(glob.escape(self.output_dir), f"{safe_name}_{date_str}.jsonl")))
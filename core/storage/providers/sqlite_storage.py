@@ -0,0 +1,162 @@
+"""
+SQLite存储，将数据保存到带索引的SQLite数据库
+"""
+import os
+import json
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, Any, List
+
+from core.storage.base_storage import BaseStorage
+from config.settings import SQLITE_DB_PATH, SQLITE_BATCH_SIZE
+from utils.helpers import normalize_url
+
+logger = logging.getLogger(__name__)
+
+# 作为独立列保存并建立索引的字段，其余字段通过JSON查询
+INDEXED_COLUMNS = ("source", "saved_at", "url")
+
+
+class SqliteStorage(BaseStorage):
+    """SQLite存储，WAL模式，每次保存在事务中提交后才返回，按标准化URL去重"""
+
+    def __init__(self, config: Dict[str, Any] = None):
+        """
+        初始化SQLite存储
+
+        Args:
+            config: 存储配置信息，可包含db_path和batch_size（每个事务写入的最大条数）
+        """
+        super().__init__(config)
+        self.db_path = self.config.get("db_path", SQLITE_DB_PATH)
+        self.batch_size = max(1, self.config.get("batch_size", SQLITE_BATCH_SIZE))
+
+        os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS news ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "url TEXT NOT NULL UNIQUE, "
+            "source TEXT NOT NULL, "
+            "saved_at TEXT NOT NULL, "
+            "data TEXT NOT NULL)"
+        )
+        # url的唯一约束自带索引；按来源查询时可同时利用saved_at排序和日期范围
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_news_source ON news (source, saved_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_news_saved_at ON news (saved_at)")
+        self._conn.commit()
+        logger.info(f"SQLite存储初始化成功: {self.db_path}")
+
+    def save(self, data: Dict[str, Any]) -> bool:
+        """
+        保存数据，提交后返回
+
+        Args:
+            data: 要保存的数据
+
+        Returns:
+            保存结果
+        """
+        return self.save_many([data]) == 1
+
+    def save_many(self, items: List[Dict[str, Any]]) -> int:
+        """
+        批量保存数据，每batch_size条在一个事务中提交，全部提交后才返回；某个事务失败时回滚该事务，
+        之前已提交的数据保留
+
+        Args:
+            items: 要保存的数据列表
+
+        Returns:
+            已提交的条数
+        """
+        stored = 0
+        try:
+            rows = []
+            for data in items:
+                data["saved_at"] = datetime.now().isoformat()
+                rows.append((
+                    normalize_url(data.get("url", "")),
+                    data.get("source", "unknown"),
+                    data["saved_at"],
+                    json.dumps(data, ensure_ascii=False)
+                ))
+
+            with self._lock:
+                for start in range(0, len(rows), self.batch_size):
+                    batch = rows[start:start + self.batch_size]
+                    self._commit(batch)
+                    stored += len(batch)
+
+            logger.info(f"已保存 {stored} 条数据")
+            return stored
+
+        except Exception as e:
+            logger.error(f"保存数据失败，已提交 {stored} 条: {e}")
+            return stored
+
+    def load(self, query: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+        """
+        查询数据
+
+        Args:
+            query: 查询条件，source、url和date（YYYY-MM-DD或YYYYMMDD）走索引，其余字段按JSON字段比较
+
+        Returns:
+            加载的数据列表，按保存时间排序
+        """
+        conditions = []
+        params = []
+        for key, value in (query or {}).items():
+            if key == "date":
+                day = datetime.strptime(str(value).replace("-", ""), "%Y%m%d")
+                conditions.append("saved_at >= ? AND saved_at < ?")
+                params.extend([day.isoformat(), (day + timedelta(days=1)).isoformat()])
+            elif key == "url":
+                conditions.append("url = ?")
+                params.append(normalize_url(value))
+            elif key in INDEXED_COLUMNS:
+                conditions.append(f"{key} = ?")
+                params.append(value)
+            else:
+                conditions.append("json_extract(data, ?) = ?")
+                params.extend([f'$."{key}"', value])
+
+        sql = "SELECT data FROM news"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY saved_at"
+
+        try:
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+
+            results = [json.loads(row[0]) for row in rows]
+            logger.info(f"已加载 {len(results)} 条数据")
+            return results
+
+        except Exception as e:
+            logger.error(f"加载数据失败: {e}")
+            return []
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+        logger.info("SQLite存储已关闭")
+
+    def _commit(self, rows: List[tuple]):
+        """在一个事务中写入数据，失败时回滚，URL重复时以最新数据为准，调用方需持有锁"""
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO news (url, source, saved_at, data) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET source = excluded.source, "
+                "saved_at = excluded.saved_at, data = excluded.data",
+                rows
+            )
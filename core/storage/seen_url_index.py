@@ -0,0 +1,126 @@
+"""
+已抓取URL索引，持久化记录抓取过的文章，用于增量爬取
+"""
+import os
+import sqlite3
+import logging
+import threading
+from datetime import datetime
+from typing import Dict, Any, Optional, Iterable, Set
+
+from config.settings import SEEN_INDEX_PATH
+from utils.helpers import normalize_url
+
+logger = logging.getLogger(__name__)
+
+
+class SeenUrlIndex:
+    """已抓取URL索引，基于SQLite，记录标准化URL、内容哈希和最后抓取时间"""
+
+    def __init__(self, db_path: str = SEEN_INDEX_PATH):
+        """
+        初始化索引
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+        # 多个爬虫线程共享同一连接，由锁保证串行访问
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS seen_urls ("
+            "url TEXT PRIMARY KEY, "
+            "content_hash TEXT, "
+            "fetched_at TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        logger.info(f"已抓取URL索引初始化成功: {db_path}")
+
+    def contains(self, url: str) -> bool:
+        """
+        判断URL是否已抓取过
+
+        Args:
+            url: 文章URL
+
+        Returns:
+            是否已抓取
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM seen_urls WHERE url = ?", (normalize_url(url),)
+            ).fetchone()
+        return row is not None
+
+    def filter_seen(self, urls: Iterable[str]) -> Set[str]:
+        """
+        批量查询，返回其中已抓取过的URL
+
+        Args:
+            urls: 待查询的URL
+
+        Returns:
+            已抓取过的URL集合（原始形式）
+        """
+        by_key = {normalize_url(url): url for url in urls}
+        if not by_key:
+            return set()
+
+        seen = set()
+        keys = list(by_key)
+        with self._lock:
+            # SQLite单条语句的参数数量有限，分批查询
+            for start in range(0, len(keys), 500):
+                batch = keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT url FROM seen_urls WHERE url IN ({placeholders})", batch
+                ).fetchall()
+                seen.update(by_key[row[0]] for row in rows)
+        return seen
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """
+        获取URL的抓取记录
+
+        Args:
+            url: 文章URL
+
+        Returns:
+            抓取记录，包含url、content_hash和fetched_at，或None（如果未抓取过）
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, content_hash, fetched_at FROM seen_urls WHERE url = ?",
+                (normalize_url(url),)
+            ).fetchone()
+        if not row:
+            return None
+        return {"url": row[0], "content_hash": row[1], "fetched_at": row[2]}
+
+    def add(self, url: str, content_hash: str = None):
+        """
+        记录一次抓取，已存在时更新内容哈希和抓取时间
+
+        Args:
+            url: 文章URL
+            content_hash: 文章内容哈希
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO seen_urls (url, content_hash, fetched_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET content_hash = excluded.content_hash, "
+                "fetched_at = excluded.fetched_at",
+                (normalize_url(url), content_hash, datetime.now().isoformat())
+            )
+            self._conn.commit()
+
+    def close(self):
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+        logger.info("已抓取URL索引已关闭")
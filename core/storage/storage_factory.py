@@ -6,6 +6,8 @@ from typing import Dict, Any
 
 from core.storage.base_storage import BaseStorage
 from core.storage.providers.file_storage import FileStorage
+from core.storage.providers.jsonl_storage import JsonlStorage
+from core.storage.providers.sqlite_storage import SqliteStorage
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +32,11 @@ class StorageFactory:
         # 根据类型创建对应的存储
         if storage_type == "file":
             return FileStorage(config)
+        elif storage_type == "jsonl":
+            return JsonlStorage(config)
+        elif storage_type == "sqlite":
+            return SqliteStorage(config)
         # 可以在这里添加更多存储类型
-        # elif storage_type == "database":
-        #     return DatabaseStorage(config)
         else:
             logger.warning(f"未知存储类型 {storage_type}，使用文件存储")
             return FileStorage(config)
\ No newline at end of file
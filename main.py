@@ -5,13 +5,29 @@ AI新闻摘要系统主入口
 import logging
 import sys
 import os
+from datetime import datetime
 from dotenv import load_dotenv
 
 from utils.logger import setup_logger
 from core.crawler.crawler_factory import CrawlerFactory
+from core.crawler.driver_pool import DriverPool
+from core.crawler.selector_profile import SelectorProfileStore
+from core.crawler.page_state import FrontPageStateStore
+from core.crawler.link_triage import LinkTriage
+from core.crawler.page_cache import PageCache
 from core.ai.ai_factory import AIFactory
 from core.storage.storage_factory import StorageFactory
+from core.storage.seen_url_index import SeenUrlIndex
+from core.storage.near_duplicate_index import NearDuplicateIndex
+from core.pipeline.news_pipeline import NewsPipeline, replay_path
+from core.pipeline.news_daemon import NewsDaemon
+from core.pipeline.work_queue import WorkQueue, STAGE_SUMMARIZED, STAGE_SAVED
+from utils.helpers import normalize_url, get_content_hash
+from utils.metrics import metrics
 from config.site_config import SITES
+from config.settings import (PIPELINE_ENABLED, SEEN_INDEX_ENABLED, STORAGE_TYPE, NEAR_DUP_ENABLED,
+                             WORK_QUEUE_ENABLED, PAGE_CACHE_ENABLED, PAGE_CACHE_REPLAY, REPLAY_DIR,
+                             SELECTOR_PROFILE_PATH, FRONT_PAGE_STATE_PATH, NEAR_DUP_INDEX_PATH)
 
 
 def load_environment():
@@ -25,41 +41,179 @@ def load_environment():
         logging.warning(f"环境变量文件不存在: {env_file}")
 
 
-def main():
-    """主函数"""
+def summarize_and_save(site, news_list, resumed, storage, ai_service, duplicate_index=None, work_queue=None,
+                       seen_index=None):
+    """
+    顺序模式下摘要并存储一个站点的新闻。近似重复的文章等规范文章保存成功后才记录，
+    规范文章摘要或存储失败时移除整个簇，簇内其余文章在下一轮重新判重
+
+    Args:
+        site: 站点名称
+        news_list: 待摘要的新闻
+        resumed: 上次运行已摘要但没有存储的新闻
+        storage: 存储实例
+        ai_service: AI服务实例
+        duplicate_index: 近似重复索引
+        work_queue: 持久化工作队列
+        seen_index: 已抓取URL索引，文章保存后才加入，处理失败的文章下次仍会抓取
+
+    Returns:
+        保存的文章数
+    """
+    def mark_saved(news):
+        if work_queue:
+            work_queue.update(site, STAGE_SAVED, news)
+        if seen_index:
+            seen_index.add(news['url'], get_content_hash(news.get('content', '')))
+
+    total = 0
+    summarized = resumed
+    while news_list or summarized:
+        # 近似重复的文章不再摘要，只记录其指向的规范文章
+        canonicals, waiting = [], {}
+        for news in news_list:
+            canonical_url = duplicate_index.check_and_add(news['url'], news['content']) if duplicate_index else None
+            if not canonical_url:
+                canonicals.append(news)
+            elif duplicate_index.is_pending(canonical_url):
+                waiting.setdefault(canonical_url, []).append(news)
+            elif storage.link_duplicate(canonical_url, news):
+                total += 1
+                mark_saved(news)
+
+        # 使用AI并发进行内容摘要
+        with metrics.timer("summarize_many", site=site, provider=ai_service.name):
+            summaries = ai_service.summarize_many(canonicals)
+
+        # 存储摘要
+        for news, summary in zip(canonicals, summaries):
+            if summary:
+                news['summary'] = summary
+                summarized.append(news)
+                if work_queue:
+                    work_queue.update(site, STAGE_SUMMARIZED, news)
+            elif work_queue:
+                work_queue.record_failure(news['url'], "摘要失败")
+        with metrics.timer("save", site=site):
+            stored = storage.save_many(summarized) if summarized else 0
+        metrics.incr("articles_saved", stored, site=site)
+        total += stored
+        # 批量存储无法区分哪条失败，部分失败时全部留到下次重试
+        all_stored = stored == len(summarized)
+        if all_stored:
+            for news in summarized:
+                mark_saved(news)
+
+        # 规范文章保存成功后记录等待中的重复文章，失败时移除整个簇，其余文章进入下一轮
+        news_list, summarized = [], []
+        for news in canonicals:
+            if not duplicate_index:
+                break
+            members = waiting.pop(normalize_url(news['url']), [])
+            if news.get('summary') and all_stored:
+                duplicate_index.confirm(news['url'])
+                for member in members:
+                    if storage.link_duplicate(news['url'], member):
+                        total += 1
+                        mark_saved(member)
+            else:
+                duplicate_index.discard(news['url'])
+                news_list.extend(members)
+    return total
+
+
+def main(replay: bool = PAGE_CACHE_REPLAY):
+    """
+    主函数
+
+    Args:
+        replay: 是否为重放模式，只从网页缓存读取页面而不访问网络，结果和索引写入REPLAY_DIR下的新目录
+    """
     # 设置日志
     setup_logger()
     logger = logging.getLogger(__name__)
-    logger.info("AI新闻摘要系统启动")
+    logger.info(f"AI新闻摘要系统启动{'（重放模式）' if replay else ''}")
 
     # 加载环境变量
     load_environment()
 
+    storage = None
+    ai_service = None
+    # 每次重放使用新的目录，不与正式输出和之前的重放混在一起
+    replay_dir = os.path.join(REPLAY_DIR, datetime.now().strftime("%Y%m%d_%H%M%S")) if replay else None
     try:
         # 初始化存储
-        storage = StorageFactory.create_storage("file")
+        if replay_dir:
+            logger.info(f"重放结果输出到: {replay_dir}")
+            storage = StorageFactory.create_storage(STORAGE_TYPE, {
+                "output_dir": replay_dir,
+                "db_path": os.path.join(replay_dir, "news.db"),
+            })
+        else:
+            storage = StorageFactory.create_storage(STORAGE_TYPE)
 
         # 初始化AI服务
         ai_service = AIFactory.create_ai_service("openai")
 
-        # 爬取每个站点的新闻
-        for site_config in SITES:
-            logger.info(f"开始处理站点: {site_config['name']}")
+        if PIPELINE_ENABLED:
+            # 并发爬取所有站点，文章流式进入摘要和存储
+            pipeline = NewsPipeline(storage, ai_service, replay_dir=replay_dir)
+            try:
+                pipeline.run(SITES)
+            finally:
+                pipeline.close()
+            logger.info("所有站点处理处理完成")
+            return 0
 
-            # 创建爬虫
-            crawler = CrawlerFactory.create_crawler(site_config)
+        # 按顺序爬取每个站点的新闻，所有站点复用同一个浏览器
+        driver_pool = DriverPool(size=1)
+        # 重放模式重新处理缓存中的页面，不读写已抓取URL索引和工作队列
+        seen_index = SeenUrlIndex() if SEEN_INDEX_ENABLED and not replay else None
+        selector_profiles = SelectorProfileStore(replay_path(SELECTOR_PROFILE_PATH, replay_dir, copy=True))
+        page_state = FrontPageStateStore(replay_path(FRONT_PAGE_STATE_PATH, replay_dir))
+        duplicate_index = NearDuplicateIndex(replay_path(NEAR_DUP_INDEX_PATH, replay_dir)) \
+            if NEAR_DUP_ENABLED else None
+        link_triage = LinkTriage(ai_service)
+        work_queue = WorkQueue() if WORK_QUEUE_ENABLED and not replay else None
+        page_cache = PageCache(replay=replay) if PAGE_CACHE_ENABLED or replay else None
+        try:
+            for site_config in SITES:
+                logger.info(f"开始处理站点: {site_config['name']}")
 
-            # 爬取新闻
-            news_list = crawler.crawl()
+                # 创建爬虫
+                crawler = CrawlerFactory.create_crawler(site_config, driver_pool=driver_pool,
+                                                        seen_index=seen_index,
+                                                        selector_profiles=selector_profiles,
+                                                        page_state=page_state,
+                                                        link_triage=link_triage,
+                                                        work_queue=work_queue,
+                                                        page_cache=page_cache)
 
-            for news in news_list:
-                # 使用AI进行内容摘要
-                summary = ai_service.summarize(news['title'], news['content'])
+                # 上次运行中断时已抓取但没有存储的文章，已摘要的直接存储，其余和本次爬取的文章一起摘要
+                site = site_config['name']
+                pending = work_queue.pending_items(site) if work_queue else []
+                resumed = [item for stage, item in pending if stage == STAGE_SUMMARIZED]
+                if pending:
+                    logger.info(f"继续处理上次未完成的 {len(pending)} 篇文章 - {site}")
 
-                # 存储摘要
-                if summary:
-                    news['summary'] = summary
-                    storage.save(news)
+                # 爬取新闻
+                with metrics.timer("crawl", site=site):
+                    news_list = crawler.crawl() + [item for stage, item in pending if stage != STAGE_SUMMARIZED]
+
+                summarize_and_save(site, news_list, resumed, storage, ai_service, duplicate_index, work_queue,
+                                   seen_index)
+        finally:
+            driver_pool.close()
+            if seen_index:
+                seen_index.close()
+            selector_profiles.close()
+            page_state.close()
+            if duplicate_index:
+                duplicate_index.close()
+            if work_queue:
+                work_queue.close()
+            if page_cache:
+                page_cache.close()
 
         logger.info("所有站点处理处理完成")
 
@@ -69,6 +223,45 @@ def main():
         logger.error(f"系统运行出错: {e}")
         return 1
 
+    finally:
+        if ai_service:
+            ai_service.close()
+        if storage:
+            storage.close()
+        metrics.write_report()
+
+
+def run_daemon():
+    """常驻运行，按站点各自的间隔反复爬取，浏览器池、HTTP会话、缓存和已抓取索引在各次运行之间复用"""
+    setup_logger()
+    logger = logging.getLogger(__name__)
+    logger.info("AI新闻摘要系统以常驻模式启动")
+
+    load_environment()
+
+    storage = None
+    ai_service = None
+    try:
+        storage = StorageFactory.create_storage(STORAGE_TYPE)
+        ai_service = AIFactory.create_ai_service("openai")
+
+        pipeline = NewsPipeline(storage, ai_service)
+        try:
+            NewsDaemon(pipeline, SITES).run_forever()
+        finally:
+            pipeline.close()
+        return 0
+
+    except Exception as e:
+        logger.error(f"系统运行出错: {e}")
+        return 1
+
+    finally:
+        if ai_service:
+            ai_service.close()
+        if storage:
+            storage.close()
+
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+离线重新处理脚本，修改解析规则或摘要提示词后，对网页缓存或已存储的文章重新解析、摘要并存储，不爬取网站
+"""
+import os
+import sys
+import logging
+import argparse
+
+from utils.logger import setup_logger
+from main import load_environment
+from core.ai.ai_factory import AIFactory
+from core.crawler.page_cache import PageCache
+from core.pipeline.reprocessor import Reprocessor, INPUT_CACHE, INPUT_OUTPUT
+from core.storage.storage_factory import StorageFactory
+from utils.helpers import normalize_url
+from utils.metrics import metrics
+from config.site_config import SITES
+from config.settings import OUTPUT_DIR, STORAGE_TYPE, SUMMARY_CONCURRENCY, PAGE_CACHE_DIR
+
+
+def reprocess(options) -> int:
+    """按命令行参数重新处理文章"""
+    logger = logging.getLogger(__name__)
+    sites = [site for site in SITES if not options.site or site["name"] == options.site]
+    if not sites:
+        logger.error(f"未找到站点: {options.site}")
+        return 1
+
+    input_storage = None
+    output_storage = None
+    ai_service = None
+    page_cache = None
+    try:
+        input_storage = StorageFactory.create_storage(STORAGE_TYPE)
+        output_storage = StorageFactory.create_storage(STORAGE_TYPE, {
+            "output_dir": options.output_dir,
+            "db_path": os.path.join(options.output_dir, "news.db"),
+        })
+        ai_service = AIFactory.create_ai_service(options.provider)
+        reprocessor = Reprocessor(sites, ai_service, output_storage, workers=options.workers,
+                                  concurrency=options.concurrency, batch_size=options.batch_size,
+                                  cache_dir=options.cache_dir if options.input == INPUT_CACHE else None)
+
+        if options.input == INPUT_CACHE:
+            # 缓存页面的标题优先使用已存储文章的链接标题
+            titles = {normalize_url(item["url"]): item["title"]
+                      for item in reprocessor.load_from_storage(input_storage, options.date)}
+            page_cache = PageCache(options.cache_dir, replay=True)
+            items = reprocessor.load_from_cache(page_cache, options.date, titles)
+        else:
+            items = reprocessor.load_from_storage(input_storage, options.date)
+
+        reprocessor.run(items)
+        return 0
+
+    except Exception as e:
+        logger.error(f"重新处理出错: {e}")
+        return 1
+
+    finally:
+        if page_cache:
+            page_cache.close()
+        if ai_service:
+            ai_service.close()
+        for storage in (input_storage, output_storage):
+            if storage:
+                storage.close()
+        metrics.write_report()
+
+
+if __name__ == "__main__":
+    # 设置日志
+    setup_logger()
+    load_environment()
+
+    # 命令行参数
+    parser = argparse.ArgumentParser(description='AI新闻摘要系统 - 离线重新处理')
+    parser.add_argument('--input', choices=[INPUT_OUTPUT, INPUT_CACHE], default=INPUT_OUTPUT,
+                        help='输入来源: output 为已存储的文章, cache 为网页缓存中的页面')
+    parser.add_argument('--date', help='只处理该日期（YYYY-MM-DD）的文章，默认全部')
+    parser.add_argument('--site', help='只处理该站点，默认全部站点')
+    parser.add_argument('--output-dir', default=os.path.join(OUTPUT_DIR, 'reprocessed'),
+                        help='结果的存储目录，默认为输出目录下的reprocessed')
+    parser.add_argument('--cache-dir', default=PAGE_CACHE_DIR, help='网页缓存目录')
+    parser.add_argument('--provider', default='openai', help='AI服务类型')
+    parser.add_argument('--workers', type=int, default=None, help='解析进程数，默认为CPU核数')
+    parser.add_argument('--concurrency', type=int, default=SUMMARY_CONCURRENCY, help='同时进行的AI请求数')
+    parser.add_argument('--batch-size', type=int, default=200, help='每批解析和摘要的文章数')
+    args = parser.parse_args()
+
+    try:
+        sys.exit(reprocess(args))
+    except KeyboardInterrupt:
+        logging.getLogger(__name__).info("用户中断，程序退出")
+        sys.exit(0)
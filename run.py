@@ -8,7 +8,7 @@ import schedule
 import logging
 import argparse
 from utils.logger import setup_logger
-from main import main
+from main import main, run_daemon
 
 
 def setup_scheduler(interval):
@@ -30,11 +30,19 @@ if __name__ == "__main__":
 
     # 命令行参数
     parser = argparse.ArgumentParser(description='AI新闻摘要系统')
-    parser.add_argument('--schedule', type=int, help='定时运行间隔（小时）')
+    parser.add_argument('--schedule', type=int, help='定时运行间隔（小时），每次重新初始化所有组件')
+    parser.add_argument('--daemon', action='store_true',
+                        help='常驻运行，按站点配置的refresh_interval爬取，各次运行之间复用浏览器和缓存')
+    parser.add_argument('--replay', action='store_true',
+                        help='重放模式，只从网页缓存读取页面，修改选择器或清洗规则后重新处理而不访问网络')
     args = parser.parse_args()
 
     try:
-        if args.schedule:
+        if args.replay:
+            sys.exit(main(replay=True))
+        elif args.daemon:
+            sys.exit(run_daemon())
+        elif args.schedule:
             setup_scheduler(args.schedule)
         else:
             sys.exit(main())
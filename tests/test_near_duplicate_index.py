@@ -0,0 +1,96 @@
+"""
+近似重复索引测试
+"""
+from core.storage.near_duplicate_index import NearDuplicateIndex, simhash
+from utils.helpers import normalize_content
+
+ARTICLE = ("国家统计局今天发布数据显示，上月全国规模以上工业增加值同比增长百分之五点六，"
+           "比前一个月加快零点三个百分点。分行业看，四十一个大类行业中有三十二个行业增加值保持同比增长，"
+           "其中电子设备制造业和汽车制造业增长较快。统计局新闻发言人表示，工业生产总体平稳，"
+           "新动能持续成长，但外部环境仍然复杂，需求不足的问题依然存在。")
+REPRINT = ARTICLE + "（新华社）"
+OTHER = ("气象台预计，受冷空气影响，本周末北方大部地区气温将下降六到八度，局地降温超过十度，"
+         "并伴有四到五级偏北风。南方地区多阴雨天气，江南和华南北部有中到大雨。"
+         "专家提醒公众及时添加衣物，出行注意交通安全，农业生产需做好防寒防冻准备，"
+         "设施农业要加固大棚，防范大风和低温带来的不利影响。")
+
+
+def open_index(tmp_path):
+    return NearDuplicateIndex(str(tmp_path / "near_duplicates.db"))
+
+
+def distance(first, second):
+    return bin(simhash(normalize_content(first)) ^ simhash(normalize_content(second))).count("1")
+
+
+def test_simhash_is_close_only_for_reprints():
+    assert distance(ARTICLE, ARTICLE) == 0
+    assert distance(ARTICLE, REPRINT) <= 3
+    assert distance(ARTICLE, OTHER) > 3
+
+
+def test_reprint_points_to_first_article(tmp_path):
+    index = open_index(tmp_path)
+    try:
+        assert index.check_and_add("https://a.com/1", ARTICLE) is None
+        assert index.check_and_add("https://b.com/1", REPRINT) == "https://a.com/1"
+        assert index.check_and_add("https://c.com/1", OTHER) is None
+        # 同一篇文章再次处理时沿用原来的簇
+        assert index.check_and_add("https://b.com/1", REPRINT) == "https://a.com/1"
+        assert index.check_and_add("https://a.com/1", ARTICLE) is None
+    finally:
+        index.close()
+
+
+def test_short_text_is_not_indexed(tmp_path):
+    index = open_index(tmp_path)
+    try:
+        assert index.check_and_add("https://a.com/1", "短讯") is None
+        assert "https://a.com/1" not in index
+    finally:
+        index.close()
+
+
+def test_canonical_is_pending_until_confirmed(tmp_path):
+    index = open_index(tmp_path)
+    try:
+        index.check_and_add("https://a.com/1", ARTICLE)
+        assert index.is_pending("https://a.com/1")
+        index.confirm("https://a.com/1")
+        assert not index.is_pending("https://a.com/1")
+    finally:
+        index.close()
+
+
+def test_discard_removes_the_whole_cluster(tmp_path):
+    index = open_index(tmp_path)
+    try:
+        index.check_and_add("https://a.com/1", ARTICLE)
+        index.check_and_add("https://b.com/1", REPRINT)
+        index.discard("https://a.com/1")
+
+        assert "https://a.com/1" not in index
+        assert "https://b.com/1" not in index
+        # 之前的重复文章成为新的规范文章
+        assert index.check_and_add("https://b.com/1", REPRINT) is None
+        assert index.check_and_add("https://a.com/1", ARTICLE) == "https://b.com/1"
+    finally:
+        index.close()
+
+
+def test_unconfirmed_clusters_are_dropped_on_reopen(tmp_path):
+    index = open_index(tmp_path)
+    index.check_and_add("https://a.com/1", ARTICLE)
+    index.check_and_add("https://b.com/1", REPRINT)
+    index.check_and_add("https://c.com/1", OTHER)
+    index.confirm("https://c.com/1")
+    index.close()
+
+    index = open_index(tmp_path)
+    try:
+        assert "https://a.com/1" not in index
+        assert "https://b.com/1" not in index
+        assert "https://c.com/1" in index
+        assert index.check_and_add("https://a.com/1", ARTICLE) is None
+    finally:
+        index.close()
@@ -0,0 +1,71 @@
+"""
+网页缓存测试
+"""
+from core.crawler.page_cache import PageCache
+
+
+def open_cache(tmp_path, **kwargs):
+    return PageCache(str(tmp_path / "page_cache"), compression="gzip", **kwargs)
+
+
+def test_put_and_get_latest_version(tmp_path):
+    cache = open_cache(tmp_path)
+    try:
+        assert cache.get("https://a.com/1") is None
+        cache.put("https://a.com/1?from=home", "<html>旧版本</html>", fetched_at=100)
+        cache.put("https://a.com/1", "<html>新版本</html>", fetched_at=200)
+        assert cache.get("https://a.com/1") == "<html>新版本</html>"
+        assert cache.get("https://a.com/1", before=150) == "<html>旧版本</html>"
+        assert cache.get("https://a.com/1", before=50) is None
+    finally:
+        cache.close()
+
+
+def test_identical_pages_share_one_file(tmp_path):
+    cache = open_cache(tmp_path)
+    try:
+        cache.put("https://a.com/1", "<html>相同内容</html>")
+        cache.put("https://b.com/1", "<html>相同内容</html>")
+        assert len(list((tmp_path / "page_cache").rglob("*.html.gz"))) == 1
+        assert cache.get("https://b.com/1") == "<html>相同内容</html>"
+    finally:
+        cache.close()
+
+
+def test_iter_pages(tmp_path):
+    cache = open_cache(tmp_path)
+    try:
+        cache.put("https://a.com/1", "a1", fetched_at=100)
+        cache.put("https://b.com/1", "b1", fetched_at=150)
+        cache.put("https://a.com/1", "a2", fetched_at=200)
+
+        assert list(cache.iter_pages()) == [("https://b.com/1", 150, "b1"), ("https://a.com/1", 200, "a2")]
+        assert [html for _, _, html in cache.iter_pages(latest_only=False)] == ["a1", "b1", "a2"]
+        assert [html for _, _, html in cache.iter_pages(until=160)] == ["a1", "b1"]
+    finally:
+        cache.close()
+
+
+def test_evict_removes_expired_pages_and_files(tmp_path):
+    cache = open_cache(tmp_path, ttl_days=1)
+    try:
+        cache.put("https://a.com/1", "<html>过期</html>", fetched_at=1)
+        cache.put("https://a.com/2", "<html>新的</html>")
+        cache.evict()
+        assert cache.get("https://a.com/1") is None
+        assert cache.get("https://a.com/2") == "<html>新的</html>"
+        assert len(list((tmp_path / "page_cache").rglob("*.html.gz"))) == 1
+    finally:
+        cache.close()
+
+
+def test_replay_mode_keeps_expired_pages(tmp_path):
+    cache = open_cache(tmp_path, ttl_days=1)
+    cache.put("https://a.com/1", "<html>旧页面</html>", fetched_at=1)
+    cache.close()
+
+    cache = open_cache(tmp_path, ttl_days=1, replay=True)
+    try:
+        assert cache.get("https://a.com/1") == "<html>旧页面</html>"
+    finally:
+        cache.close()
@@ -0,0 +1,87 @@
+"""
+按主机限速器测试
+"""
+import time
+import threading
+from unittest import mock
+
+from core.crawler.rate_limiter import TokenBucket, HostRateLimiter
+
+
+def test_token_bucket_allows_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=2, capacity=2)
+    now = bucket.updated
+    assert bucket.reserve(now) == 0
+    assert bucket.reserve(now) == 0
+    assert bucket.reserve(now) == 0.5
+    assert bucket.reserve(now) == 1.0
+    # 令牌按速率补充
+    assert bucket.reserve(now + 2.0) == 0
+
+
+def test_token_bucket_block_until():
+    bucket = TokenBucket(rate=10, capacity=5)
+    now = bucket.updated
+    bucket.block_until(now + 3)
+    assert bucket.reserve(now) == 3
+    assert bucket.reserve(now) > 3
+
+
+def test_hosts_are_limited_independently():
+    limiter = HostRateLimiter(delay=1, burst=1, respect_robots=False)
+    assert limiter.reserve("https://a.com/1") == 0
+    assert limiter.reserve("https://b.com/1") == 0
+    assert limiter.reserve("https://a.com/2") > 0.9
+
+
+def test_configure_site_slows_only_that_host():
+    limiter = HostRateLimiter(delay=0.1, burst=1, respect_robots=False)
+    limiter.configure_site({"name": "慢站点", "url": "https://slow.com/", "rate_limit": {"delay": 5}})
+    limiter.reserve("https://slow.com/1")
+    assert limiter.reserve("https://slow.com/2") > 4.9
+    limiter.reserve("https://fast.com/1")
+    assert limiter.reserve("https://fast.com/2") < 0.2
+
+
+def test_defer_pauses_host():
+    limiter = HostRateLimiter(delay=0.1, burst=1, respect_robots=False)
+    limiter.defer("https://a.com/1", "30")
+    assert limiter.reserve("https://a.com/2") > 29
+    assert limiter.reserve("https://b.com/1") == 0
+
+
+def test_parse_retry_after():
+    assert HostRateLimiter._parse_retry_after("120") == 120
+    assert HostRateLimiter._parse_retry_after(None) is None
+    assert HostRateLimiter._parse_retry_after("下一次") is None
+    assert HostRateLimiter._parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0
+
+
+def test_concurrent_requests_wait_for_robots_crawl_delay():
+    limiter = HostRateLimiter(delay=0.001, burst=1, respect_robots=True)
+    fetches = []
+
+    def slow_fetch(url):
+        fetches.append(url)
+        time.sleep(0.2)
+        return 2
+
+    waits = []
+    with mock.patch.object(HostRateLimiter, "_fetch_crawl_delay", staticmethod(slow_fetch)):
+        threads = [threading.Thread(target=lambda: waits.append(limiter.reserve("https://a.com/1")))
+                   for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    # robots.txt只下载一次，所有请求都按Crawl-delay间隔
+    assert len(fetches) == 1
+    assert sorted(round(wait) for wait in waits) == [0, 2, 4]
+
+
+def test_robots_failure_falls_back_to_default_rate():
+    limiter = HostRateLimiter(delay=1, burst=1, respect_robots=True)
+    with mock.patch.object(HostRateLimiter, "_fetch_crawl_delay", staticmethod(lambda url: None)):
+        assert limiter.reserve("https://a.com/1") == 0
+        assert 0.9 < limiter.reserve("https://a.com/2") <= 1
@@ -0,0 +1,38 @@
+"""
+正文选择器档案测试
+"""
+from core.crawler.selector_profile import SelectorProfileStore
+
+
+def test_learned_selector_survives_occasional_misses(tmp_path):
+    profiles = SelectorProfileStore(str(tmp_path / "profiles.json"), max_misses=3)
+    profiles.record_success("a.com", ".article")
+
+    for _ in range(2):
+        # 学到的选择器失败后常用选择器成功，不应立即替换
+        profiles.record_miss("a.com")
+        profiles.record_success("a.com", ".content")
+        assert profiles.get("a.com") == ".article"
+
+    profiles.record_miss("a.com")
+    assert profiles.get("a.com") is None
+    profiles.record_success("a.com", ".content")
+    assert profiles.get("a.com") == ".content"
+
+
+def test_success_resets_misses(tmp_path):
+    profiles = SelectorProfileStore(str(tmp_path / "profiles.json"), max_misses=2)
+    profiles.record_success("a.com", ".article")
+    profiles.record_miss("a.com")
+    profiles.record_success("a.com", ".article")
+    profiles.record_miss("a.com")
+    assert profiles.get("a.com") == ".article"
+
+
+def test_profiles_are_saved_on_close(tmp_path):
+    file_path = str(tmp_path / "profiles.json")
+    profiles = SelectorProfileStore(file_path)
+    profiles.record_success("a.com", ".article")
+    profiles.close()
+
+    assert SelectorProfileStore(file_path).get("a.com") == ".article"
@@ -0,0 +1,96 @@
+"""
+存储提供者测试
+"""
+import sqlite3
+from unittest import mock
+
+from core.storage.providers.jsonl_storage import JsonlStorage
+from core.storage.providers.sqlite_storage import SqliteStorage
+
+
+def make_news(index, source="测试站点"):
+    return {"title": f"新闻{index}", "url": f"https://example.com/news/{index}?from=home",
+            "source": source, "content": f"正文{index}"}
+
+
+def test_jsonl_save_many_and_load(tmp_path):
+    storage = JsonlStorage({"output_dir": str(tmp_path)})
+    try:
+        assert storage.save_many([make_news(1), make_news(2), make_news(3, source="其他站点")]) == 3
+        # save_many返回前已刷新到文件，另外打开也能读到
+        assert len(list(JsonlStorage({"output_dir": str(tmp_path)}).load())) == 3
+        assert [item["title"] for item in storage.load({"source": "测试站点"})] == ["新闻1", "新闻2"]
+        assert [item["title"] for item in storage.load({"title": "新闻3"})] == ["新闻3"]
+    finally:
+        storage.close()
+
+
+def test_jsonl_load_skips_truncated_line(tmp_path):
+    storage = JsonlStorage({"output_dir": str(tmp_path), "fsync": False})
+    storage.save(make_news(1))
+    storage.close()
+    file_path = next(tmp_path.glob("*.jsonl"))
+    with open(file_path, "a", encoding="utf-8") as f:
+        f.write('{"title": "不完整')
+
+    assert [item["title"] for item in JsonlStorage({"output_dir": str(tmp_path)}).load()] == ["新闻1"]
+
+
+def test_jsonl_link_duplicate(tmp_path):
+    storage = JsonlStorage({"output_dir": str(tmp_path)})
+    try:
+        assert storage.link_duplicate("https://example.com/news/1", make_news(2))
+        record = next(iter(storage.load()))
+        assert record["duplicate_of"] == "https://example.com/news/1"
+        assert "content" not in record
+    finally:
+        storage.close()
+
+
+def test_sqlite_save_many_commits_before_returning(tmp_path):
+    db_path = str(tmp_path / "news.db")
+    storage = SqliteStorage({"db_path": db_path, "batch_size": 2})
+    try:
+        assert storage.save_many([make_news(i) for i in range(5)]) == 5
+        # 其他连接能看到说明已经提交
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM news").fetchone()[0] == 5
+    finally:
+        storage.close()
+
+
+def test_sqlite_failed_commit_keeps_earlier_batches(tmp_path):
+    storage = SqliteStorage({"db_path": str(tmp_path / "news.db"), "batch_size": 2})
+    commit = storage._commit
+    calls = []
+
+    def failing_commit(rows):
+        calls.append(rows)
+        if len(calls) == 2:
+            raise sqlite3.OperationalError("disk I/O error")
+        commit(rows)
+
+    try:
+        with mock.patch.object(storage, "_commit", side_effect=failing_commit):
+            assert storage.save_many([make_news(i) for i in range(5)]) == 2
+        assert sorted(item["title"] for item in storage.load()) == ["新闻0", "新闻1"]
+        # 失败的事务已回滚，之后的保存不受影响
+        assert storage.save_many([make_news(2)]) == 1
+        assert len(storage.load()) == 3
+    finally:
+        storage.close()
+
+
+def test_sqlite_deduplicates_by_normalized_url(tmp_path):
+    storage = SqliteStorage({"db_path": str(tmp_path / "news.db")})
+    try:
+        storage.save(make_news(1))
+        updated = make_news(1)
+        updated["url"] = "https://example.com/news/1?from=feed"
+        updated["title"] = "新闻1（更新）"
+        storage.save(updated)
+
+        results = storage.load({"url": "https://example.com/news/1"})
+        assert [item["title"] for item in results] == ["新闻1（更新）"]
+    finally:
+        storage.close()
@@ -0,0 +1,65 @@
+"""
+顺序模式摘要和存储测试，规范文章失败时簇内的重复文章不应指向它
+"""
+from typing import Dict, Optional
+
+from core.ai.base_ai import BaseAI
+from core.pipeline.work_queue import WorkQueue, STAGE_SAVED
+from core.storage.near_duplicate_index import NearDuplicateIndex
+from core.storage.providers.jsonl_storage import JsonlStorage
+from main import summarize_and_save
+from tests.test_near_duplicate_index import ARTICLE, REPRINT, OTHER
+
+
+class FailingProvider(BaseAI):
+    """对指定标题的文章摘要失败"""
+
+    def __init__(self, failing_titles):
+        super().__init__()
+        self.failing_titles = set(failing_titles)
+
+    def summarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        if title in self.failing_titles:
+            return None
+        return {"title": f"摘要-{title}", "content": content[:50]}
+
+
+def make_news(title, url, content):
+    return {"title": title, "url": url, "content": content, "source": "测试站点"}
+
+
+def run(tmp_path, failing_titles):
+    storage = JsonlStorage({"output_dir": str(tmp_path / "output")})
+    duplicate_index = NearDuplicateIndex(str(tmp_path / "near_duplicates.db"))
+    work_queue = WorkQueue(str(tmp_path / "work_queue.db"))
+    news_list = [make_news("原文", "https://a.com/1", ARTICLE),
+                 make_news("转载", "https://b.com/1", REPRINT),
+                 make_news("其他", "https://c.com/1", OTHER)]
+    try:
+        total = summarize_and_save("测试站点", news_list, [], storage, FailingProvider(failing_titles),
+                                   duplicate_index=duplicate_index, work_queue=work_queue)
+        records = {item["url"]: item for item in storage.load()}
+        stages = {url: work_queue.get_stage(url) for url in ("https://a.com/1", "https://b.com/1")}
+        return total, records, stages
+    finally:
+        storage.close()
+        duplicate_index.close()
+        work_queue.close()
+
+
+def test_duplicates_link_to_saved_canonical(tmp_path):
+    total, records, stages = run(tmp_path, [])
+    assert total == 3
+    assert records["https://b.com/1"]["duplicate_of"] == "https://a.com/1"
+    assert stages == {"https://a.com/1": STAGE_SAVED, "https://b.com/1": STAGE_SAVED}
+
+
+def test_failed_canonical_promotes_its_duplicate(tmp_path):
+    total, records, stages = run(tmp_path, ["原文"])
+    assert total == 2
+    assert "https://a.com/1" not in records
+    # 原文摘要失败后，转载作为新的规范文章摘要并保存
+    assert records["https://b.com/1"]["summary"]["title"] == "摘要-转载"
+    assert "duplicate_of" not in records["https://b.com/1"]
+    assert stages["https://a.com/1"] != STAGE_SAVED
+    assert stages["https://b.com/1"] == STAGE_SAVED
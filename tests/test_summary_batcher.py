@@ -0,0 +1,58 @@
+"""
+摘要汇总器测试
+"""
+import threading
+from typing import Dict, Any, List, Optional
+
+from core.ai.base_ai import BaseAI
+from core.pipeline.summary_batcher import SummaryBatcher
+
+
+class RecordingProvider(BaseAI):
+    """记录每次asummarize_many收到的文章数"""
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def summarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        return {"title": f"摘要-{title}", "content": content}
+
+    async def asummarize_many(self, articles: List[Dict[str, Any]], concurrency: int = 10):
+        self.batches.append(len(articles))
+        return await super().asummarize_many(articles, concurrency)
+
+
+def test_summaries_from_threads_go_through_asummarize_many():
+    provider = RecordingProvider()
+    batcher = SummaryBatcher(provider, concurrency=4, window=0.2)
+    results = {}
+
+    def summarize(index):
+        results[index] = batcher.summarize(f"新闻{index}", "正文")
+
+    threads = [threading.Thread(target=summarize, args=(i,)) for i in range(8)]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        batcher.close()
+
+    assert results == {i: {"title": f"摘要-新闻{i}", "content": "正文"} for i in range(8)}
+    assert sum(provider.batches) == 8
+    assert max(provider.batches) <= 4
+    assert len(provider.batches) < 8
+
+
+def test_failed_batch_returns_none():
+    class BrokenProvider(RecordingProvider):
+        async def asummarize_many(self, articles, concurrency=10):
+            raise RuntimeError("服务不可用")
+
+    batcher = SummaryBatcher(BrokenProvider())
+    try:
+        assert batcher.summarize("新闻", "正文") is None
+    finally:
+        batcher.close()
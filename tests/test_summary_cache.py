@@ -0,0 +1,92 @@
+"""
+摘要缓存测试
+"""
+import asyncio
+from typing import Dict, Optional
+
+from core.ai.base_ai import BaseAI
+from core.ai.summary_cache import SummaryCache, CachedAIProvider
+
+
+class CountingProvider(BaseAI):
+    """记录调用次数的测试提供者"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def summarize(self, title: str, content: str) -> Optional[Dict[str, str]]:
+        self.calls.append(title)
+        if not content:
+            return None
+        return {"title": f"摘要-{title}", "content": content[:20]}
+
+
+def test_get_and_put(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.db"))
+    try:
+        key = cache.make_key("model", "v1", "正文")
+        assert cache.get(key) is None
+        cache.put(key, {"title": "标题", "content": "内容"})
+        assert cache.get(key) == {"title": "标题", "content": "内容"}
+        assert cache.get_stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+    finally:
+        cache.close()
+
+
+def test_key_ignores_whitespace_and_punctuation_but_not_model():
+    assert SummaryCache.make_key("m", "v1", "今天 天气，很好") == SummaryCache.make_key("m", "v1", "今天天气很好")
+    assert SummaryCache.make_key("m", "v1", "正文") != SummaryCache.make_key("m", "v2", "正文")
+    assert SummaryCache.make_key("m", "v1", "正文") != SummaryCache.make_key("n", "v1", "正文")
+
+
+def test_expired_entries_are_not_returned(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.db"), max_age_days=0)
+    try:
+        key = cache.make_key("model", "v1", "正文")
+        cache.put(key, {"title": "标题", "content": "内容"})
+        assert cache.get(key) is None
+    finally:
+        cache.close()
+
+
+def test_evict_keeps_recently_used_entries(tmp_path):
+    cache = SummaryCache(str(tmp_path / "cache.db"), max_size_mb=0.001)
+    try:
+        keys = [cache.make_key("model", "v1", f"正文{i}") for i in range(20)]
+        for key in keys:
+            cache.put(key, {"title": "标题", "content": "内容" * 10})
+        cache.get(keys[0])
+        cache.evict()
+        assert cache.get(keys[0]) is not None
+        assert cache.get(keys[1]) is None
+    finally:
+        cache.close()
+
+
+def test_cached_provider_calls_provider_once_per_content(tmp_path):
+    provider = CountingProvider()
+    ai_service = CachedAIProvider(provider, SummaryCache(str(tmp_path / "cache.db")))
+    try:
+        first = ai_service.summarize("新闻1", "相同的正文")
+        assert ai_service.summarize("转载", "相同的正文。") == first
+        assert provider.calls == ["新闻1"]
+        # 失败的摘要不缓存
+        assert ai_service.summarize("空", "") is None
+        assert ai_service.summarize("空", "") is None
+        assert provider.calls == ["新闻1", "空", "空"]
+    finally:
+        ai_service.close()
+
+
+def test_cached_provider_summarize_many_only_sends_misses(tmp_path):
+    provider = CountingProvider()
+    ai_service = CachedAIProvider(provider, SummaryCache(str(tmp_path / "cache.db")))
+    try:
+        ai_service.summarize("新闻1", "正文一")
+        articles = [{"title": "新闻1", "content": "正文一"}, {"title": "新闻2", "content": "正文二"}]
+        summaries = asyncio.run(ai_service.asummarize_many(articles))
+        assert [summary["title"] for summary in summaries] == ["摘要-新闻1", "摘要-新闻2"]
+        assert provider.calls == ["新闻1", "新闻2"]
+    finally:
+        ai_service.close()
@@ -0,0 +1,63 @@
+"""
+Token预算测试，使用估算器，结果不依赖是否安装tiktoken
+"""
+import time
+from unittest import mock
+
+import core.ai.token_budget as token_budget
+from core.ai.token_budget import TokenBudget
+
+SENTENCE = "这是一条用于测试的新闻句子。"
+
+
+def estimator(max_tokens):
+    return TokenBudget(max_tokens, encoding_name="")
+
+
+def test_estimator_counts_cjk_and_other_characters():
+    budget = estimator(100)
+    assert budget.count("") == 0
+    assert budget.count("你好") == 3
+    assert budget.count("abcdefg") == 2
+
+
+def test_text_within_budget_is_unchanged():
+    text = SENTENCE * 3
+    assert estimator(1000).fit(text) == (text, estimator(1000).count(text))
+    assert estimator(0).fit(text * 100)[0] == text * 100
+
+
+def test_boilerplate_is_removed_first():
+    text = "\n".join([SENTENCE * 2, "扫码关注我们的公众号", SENTENCE * 2])
+    budget = estimator(estimator(0).count(SENTENCE * 4) + 1)
+    fitted, tokens = budget.fit(text)
+    assert fitted == "\n".join([SENTENCE * 2, SENTENCE * 2])
+    assert tokens <= budget.max_tokens
+
+
+def test_truncates_at_sentence_boundary():
+    budget = estimator(estimator(0).count(SENTENCE) * 3 + 2)
+    fitted, tokens = budget.fit(SENTENCE * 10)
+    assert fitted == SENTENCE * 3
+    assert tokens <= budget.max_tokens
+
+
+def test_long_first_sentence_is_truncated_by_characters():
+    budget = estimator(10)
+    fitted, tokens = budget.fit("很" * 100)
+    assert fitted and tokens <= 10
+
+
+def test_slow_encoding_load_falls_back_to_estimator():
+    class SlowTiktoken:
+        @staticmethod
+        def get_encoding(name):
+            time.sleep(1)
+            raise OSError("无法下载编码文件")
+
+    with mock.patch.object(token_budget, "tiktoken", SlowTiktoken), \
+            mock.patch.dict(token_budget._encoding_loads, clear=True):
+        start = time.monotonic()
+        budget = TokenBudget(100, encoding_name="slow", load_timeout=0.1)
+        assert time.monotonic() - start < 0.5
+        assert budget.count("你好") == 3
@@ -0,0 +1,76 @@
+"""
+持久化工作队列测试
+"""
+from core.pipeline.work_queue import (WorkQueue, STAGE_LINK, STAGE_FETCHED, STAGE_SUMMARIZED, STAGE_SAVED,
+                                      STAGE_FAILED)
+
+
+def test_links_advance_through_stages(tmp_path):
+    queue = WorkQueue(str(tmp_path / "work_queue.db"))
+    try:
+        queue.add_links("站点", [{"title": "新闻1", "url": "https://example.com/1"},
+                                 {"title": "新闻2", "url": "https://example.com/2"}])
+        assert [link["title"] for link in queue.pending_links("站点")] == ["新闻1", "新闻2"]
+
+        queue.update("站点", STAGE_FETCHED, {"title": "新闻1", "url": "https://example.com/1", "content": "正文"})
+        assert queue.get_stage("https://example.com/1") == STAGE_FETCHED
+        assert [link["title"] for link in queue.pending_links("站点")] == ["新闻2"]
+        assert queue.pending_items("站点") == [
+            (STAGE_FETCHED, {"title": "新闻1", "url": "https://example.com/1", "content": "正文"})]
+
+        queue.update("站点", STAGE_SAVED, {"title": "新闻1", "url": "https://example.com/1"})
+        assert queue.pending_items("站点") == []
+        assert queue.pending_links("其他站点") == []
+    finally:
+        queue.close()
+
+
+def test_add_links_keeps_existing_stage(tmp_path):
+    queue = WorkQueue(str(tmp_path / "work_queue.db"))
+    try:
+        queue.update("站点", STAGE_SUMMARIZED, {"title": "新闻1", "url": "https://example.com/1"})
+        queue.add_links("站点", [{"title": "新闻1", "url": "https://example.com/1?utm=x"}])
+        assert queue.get_stage("https://example.com/1") == STAGE_SUMMARIZED
+    finally:
+        queue.close()
+
+
+def test_record_failure_gives_up_after_max_attempts(tmp_path):
+    queue = WorkQueue(str(tmp_path / "work_queue.db"), max_attempts=2)
+    try:
+        queue.add_links("站点", [{"title": "新闻1", "url": "https://example.com/1"}])
+        assert queue.record_failure("https://example.com/1", "抓取失败")
+        assert queue.get_stage("https://example.com/1") == STAGE_LINK
+        assert not queue.record_failure("https://example.com/1", "抓取失败")
+        assert queue.get_stage("https://example.com/1") == STAGE_FAILED
+        assert queue.pending_links("站点") == []
+    finally:
+        queue.close()
+
+
+def test_progress_survives_reopen(tmp_path):
+    db_path = str(tmp_path / "work_queue.db")
+    queue = WorkQueue(db_path)
+    queue.update("站点", STAGE_FETCHED, {"title": "新闻1", "url": "https://example.com/1"})
+    queue.close()
+
+    queue = WorkQueue(db_path)
+    try:
+        assert queue.get_stage("https://example.com/1") == STAGE_FETCHED
+    finally:
+        queue.close()
+
+
+def test_finished_items_expire_on_open(tmp_path):
+    db_path = str(tmp_path / "work_queue.db")
+    queue = WorkQueue(db_path)
+    queue.update("站点", STAGE_SAVED, {"title": "新闻1", "url": "https://example.com/1"})
+    queue.update("站点", STAGE_FETCHED, {"title": "新闻2", "url": "https://example.com/2"})
+    queue.close()
+
+    queue = WorkQueue(db_path, retention_days=0)
+    try:
+        assert queue.get_stage("https://example.com/1") is None
+        assert queue.get_stage("https://example.com/2") == STAGE_FETCHED
+    finally:
+        queue.close()
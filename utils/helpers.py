@@ -4,6 +4,8 @@
 import os
 import re
 import json
+import hashlib
+import tempfile
 from datetime import datetime
 from urllib.parse import urlparse
 
@@ -27,6 +29,22 @@ def clean_text(text):
     return text.strip()
 
 
+def get_content_hash(text):
+    """
+    计算文本内容哈希，忽略空白字符差异
+    """
+    return hashlib.sha1(clean_text(text).encode('utf-8')).hexdigest()
+
+
+def normalize_content(text):
+    """
+    标准化文本内容用于比较，去除空白和标点并转为小写
+    """
+    if not text:
+        return ""
+    return re.sub(r'[\W_]+', '', text).lower()
+
+
 def get_file_path(base_dir, source_name, file_type="json"):
     """
     获取文件保存路径
@@ -45,6 +63,24 @@ def save_json(data, file_path):
         json.dump(data, f, ensure_ascii=False, indent=2)
 
 
+def write_text_atomic(file_path, text):
+    """
+    原子地写入文本文件：先写同目录下的唯一临时文件再替换，读取方不会看到写了一半的文件，
+    多个线程同时写入也不会互相覆盖临时文件
+    """
+    directory = os.path.dirname(file_path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
 def load_json(file_path):
     """
     加载JSON数据
@@ -0,0 +1,71 @@
+"""
+JSON文件记录，内存中的字典由多个线程共享，有变更时定期写入文件
+"""
+import os
+import json
+import time
+import logging
+import threading
+from typing import Dict, Any
+
+from utils.helpers import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+
+class JsonStore:
+    """保存在JSON文件中的字典记录，子类在self._lock内修改self._data后调用_mark_dirty"""
+
+    # 有变更时最多每隔多少秒写一次文件
+    SAVE_INTERVAL = 10
+    # 日志中使用的记录名称
+    DESCRIPTION = "记录"
+
+    def __init__(self, file_path: str):
+        """
+        初始化记录
+
+        Args:
+            file_path: 记录文件路径
+        """
+        self.file_path = file_path
+        self._lock = threading.Lock()
+        # 串行化写文件，保证后取的快照不会被先取的快照覆盖
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+        self._data: Dict[str, Any] = self._load()
+
+    def save(self):
+        """写入记录文件"""
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                data = json.dumps(self._data, ensure_ascii=False, indent=2)
+                self._dirty = False
+                self._last_save = time.monotonic()
+            write_text_atomic(self.file_path, data)
+
+    def close(self):
+        """保存未写入的变更"""
+        self.save()
+
+    def _mark_dirty(self):
+        """标记有未写入的变更，需在持有self._lock时调用"""
+        self._dirty = True
+
+    def _save_if_due(self):
+        """距上次写入超过SAVE_INTERVAL时写入文件，不能在持有self._lock时调用"""
+        if time.monotonic() - self._last_save >= self.SAVE_INTERVAL:
+            self.save()
+
+    def _load(self) -> Dict[str, Any]:
+        if not os.path.exists(self.file_path):
+            return {}
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"读取{self.DESCRIPTION}失败，重新记录: {e}")
+            return {}
@@ -6,9 +6,16 @@ import logging
 from logging.handlers import RotatingFileHandler
 from config.settings import LOG_LEVEL, LOG_FORMAT, LOG_FILE, LOG_DIR
 
+_configured = False
+
 
 def setup_logger():
-    """设置日志"""
+    """设置日志，重复调用时不会重复添加处理器"""
+    global _configured
+    if _configured:
+        return
+    _configured = True
+
     # 创建日志目录
     os.makedirs(LOG_DIR, exist_ok=True)
 
@@ -0,0 +1,226 @@
+"""
+运行指标模块，统计各阶段耗时和计数，运行结束后输出JSON报告和可选的Prometheus文本文件
+"""
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Optional
+
+from config.settings import LOG_DIR, METRICS_ENABLED, METRICS_PROMETHEUS_PATH
+from utils.helpers import write_text_atomic
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """标签转为可哈希的键，忽略值为None的标签"""
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _escape_label(value: str) -> str:
+    """转义Prometheus标签值中的反斜杠、引号和换行"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """最近秩法计算百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, int(len(sorted_values) * percent / 100 + 0.999999) - 1)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+class Metrics:
+    """
+    运行指标，线程安全
+
+    耗时按阶段（fetch、parse、clean、summarize、save等）和标签（site、host、provider等）分组保存样本，
+    输出时计算p50/p95；计数器按名称和标签累加，如抓取字节数、缓存命中数、token数和失败次数。
+    """
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        """
+        初始化运行指标
+
+        Args:
+            enabled: 是否启用，关闭时所有统计操作都是空操作
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._timings: Dict[Tuple[str, LabelKey], List[float]] = {}
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._started_at = datetime.now()
+
+    @contextmanager
+    def timer(self, stage: str, **labels):
+        """
+        统计代码块耗时，代码块抛出异常时同时累加该阶段的失败次数
+
+        Args:
+            stage: 阶段名称
+            **labels: 标签
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.incr(f"{stage}_failures", **labels)
+            raise
+        finally:
+            self.observe(stage, time.perf_counter() - start, **labels)
+
+    def observe(self, stage: str, seconds: float, **labels):
+        """
+        记录一次耗时
+
+        Args:
+            stage: 阶段名称
+            seconds: 耗时（秒）
+            **labels: 标签
+        """
+        if not self.enabled:
+            return
+        key = (stage, _label_key(labels))
+        with self._lock:
+            self._timings.setdefault(key, []).append(seconds)
+
+    def incr(self, name: str, value: float = 1, **labels):
+        """
+        累加计数器
+
+        Args:
+            name: 计数器名称
+            value: 增加的值
+            **labels: 标签
+        """
+        if not self.enabled or not value:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        """清空已有统计，开始新一轮运行"""
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+            self._started_at = datetime.now()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        汇总当前统计
+
+        Returns:
+            包含stages（按阶段汇总）、timings（按阶段和标签）和counters的字典
+        """
+        with self._lock:
+            timings = {key: sorted(values) for key, values in self._timings.items()}
+            counters = dict(self._counters)
+            started_at = self._started_at
+
+        # 不区分标签，按阶段汇总
+        stages: Dict[str, List[float]] = {}
+        for (stage, _), values in timings.items():
+            stages.setdefault(stage, []).extend(values)
+
+        finished_at = datetime.now()
+        return {
+            "started_at": started_at.isoformat(),
+            "finished_at": finished_at.isoformat(),
+            "duration": round((finished_at - started_at).total_seconds(), 3),
+            "stages": {stage: self._summarize(sorted(values)) for stage, values in sorted(stages.items())},
+            "timings": [
+                {"stage": stage, "labels": dict(labels), **self._summarize(values)}
+                for (stage, labels), values in sorted(timings.items())
+            ],
+            "counters": [
+                {"name": name, "labels": dict(labels), "value": value}
+                for (name, labels), value in sorted(counters.items())
+            ],
+        }
+
+    @staticmethod
+    def _summarize(sorted_values: List[float]) -> Dict[str, Any]:
+        """汇总一组已排序的耗时样本"""
+        return {
+            "count": len(sorted_values),
+            "total": round(sum(sorted_values), 6),
+            "p50": round(_percentile(sorted_values, 50), 6),
+            "p95": round(_percentile(sorted_values, 95), 6),
+            "max": round(sorted_values[-1], 6),
+        }
+
+    def write_report(self, directory: str = LOG_DIR,
+                     prometheus_path: Optional[str] = METRICS_PROMETHEUS_PATH) -> Optional[str]:
+        """
+        输出本次运行的JSON报告，设置prometheus_path时同时输出Prometheus文本格式
+
+        Args:
+            directory: 报告目录
+            prometheus_path: Prometheus文本文件路径，None表示不输出
+
+        Returns:
+            报告文件路径，或None（如果未启用或输出失败）
+        """
+        if not self.enabled:
+            return None
+
+        report = self.snapshot()
+        file_name = f"run_report_{datetime.fromisoformat(report['started_at']):%Y%m%d_%H%M%S}.json"
+        file_path = os.path.join(directory, file_name)
+        try:
+            os.makedirs(directory, exist_ok=True)
+            write_text_atomic(file_path, json.dumps(report, ensure_ascii=False, indent=2))
+            if prometheus_path:
+                write_text_atomic(prometheus_path, self.to_prometheus(report))
+        except OSError as e:
+            logger.error(f"输出运行报告失败: {e}")
+            return None
+
+        logger.info(f"运行报告已输出: {file_path}")
+        return file_path
+
+    @staticmethod
+    def to_prometheus(report: Dict[str, Any]) -> str:
+        """
+        把汇总结果转为Prometheus文本格式
+
+        Args:
+            report: snapshot()的结果
+
+        Returns:
+            Prometheus文本
+        """
+        def format_labels(labels: Dict[str, str]) -> str:
+            if not labels:
+                return ""
+            parts = [f'{name}="{_escape_label(value)}"' for name, value in sorted(labels.items())]
+            return "{" + ",".join(parts) + "}"
+
+        lines = ["# TYPE news_stage_seconds summary"]
+        for timing in report["timings"]:
+            labels = {"stage": timing["stage"], **timing["labels"]}
+            for quantile, key in (("0.5", "p50"), ("0.95", "p95")):
+                lines.append(f"news_stage_seconds{format_labels({**labels, 'quantile': quantile})} {timing[key]}")
+            lines.append(f"news_stage_seconds_sum{format_labels(labels)} {timing['total']}")
+            lines.append(f"news_stage_seconds_count{format_labels(labels)} {timing['count']}")
+
+        declared = set()
+        for counter in report["counters"]:
+            metric = f"news_{counter['name']}_total"
+            if metric not in declared:
+                lines.append(f"# TYPE {metric} counter")
+                declared.add(metric)
+            lines.append(f"{metric}{format_labels(counter['labels'])} {counter['value']}")
+
+        return "\n".join(lines) + "\n"
+
+
+# 全局运行指标，各模块直接导入使用
+metrics = Metrics()